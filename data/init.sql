@@ -4,7 +4,9 @@ CREATE TABLE user_data (
     Password VARCHAR(30),
     Elo SMALLINT,
     Winrate SMALLINT,
-    Skin VARCHAR(15)
+    Skin VARCHAR(15),
+    Games_played INTEGER NOT NULL DEFAULT 0,
+    Games_won INTEGER NOT NULL DEFAULT 0
 );
 CREATE TABLE games_1v1 (
     id SERIAL,
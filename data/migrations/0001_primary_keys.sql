@@ -0,0 +1,5 @@
+/* Primary keys on the id columns, the rating updates find the players of a
+   match by id. */
+ALTER TABLE user_data ADD PRIMARY KEY (id);
+ALTER TABLE games_1v1 ADD PRIMARY KEY (id);
+ALTER TABLE games_2v2 ADD PRIMARY KEY (id);
@@ -0,0 +1,4 @@
+/* Every login and profile lookup filters user_data by Name, the leaderboard
+   queries sort it by Elo. */
+CREATE UNIQUE INDEX user_data_name_key ON user_data (Name);
+CREATE INDEX user_data_elo_idx ON user_data (Elo DESC);
@@ -0,0 +1,10 @@
+/* Match history reads the latest games of one player, one index per player
+   column ordered by date serves each branch of the history query. */
+CREATE INDEX games_1v1_player_1_date_idx ON games_1v1 (Player_1_name, Date DESC);
+CREATE INDEX games_1v1_player_2_date_idx ON games_1v1 (Player_2_name, Date DESC);
+CREATE INDEX games_1v1_date_idx ON games_1v1 (Date DESC);
+CREATE INDEX games_2v2_player_1_date_idx ON games_2v2 (Player_1_name, Date DESC);
+CREATE INDEX games_2v2_player_2_date_idx ON games_2v2 (Player_2_name, Date DESC);
+CREATE INDEX games_2v2_player_3_date_idx ON games_2v2 (Player_3_name, Date DESC);
+CREATE INDEX games_2v2_player_4_date_idx ON games_2v2 (Player_4_name, Date DESC);
+CREATE INDEX games_2v2_date_idx ON games_2v2 (Date DESC);
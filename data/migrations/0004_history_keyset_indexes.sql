@@ -0,0 +1,15 @@
+/* Match history pages are chained by (Date, id), the id breaks ties between
+   games of the same date. The player indexes gain the id so every page is a
+   range read of the index whatever its depth. */
+DROP INDEX games_1v1_player_1_date_idx;
+DROP INDEX games_1v1_player_2_date_idx;
+DROP INDEX games_2v2_player_1_date_idx;
+DROP INDEX games_2v2_player_2_date_idx;
+DROP INDEX games_2v2_player_3_date_idx;
+DROP INDEX games_2v2_player_4_date_idx;
+CREATE INDEX games_1v1_player_1_date_id_idx ON games_1v1 (Player_1_name, Date DESC, id DESC);
+CREATE INDEX games_1v1_player_2_date_id_idx ON games_1v1 (Player_2_name, Date DESC, id DESC);
+CREATE INDEX games_2v2_player_1_date_id_idx ON games_2v2 (Player_1_name, Date DESC, id DESC);
+CREATE INDEX games_2v2_player_2_date_id_idx ON games_2v2 (Player_2_name, Date DESC, id DESC);
+CREATE INDEX games_2v2_player_3_date_id_idx ON games_2v2 (Player_3_name, Date DESC, id DESC);
+CREATE INDEX games_2v2_player_4_date_id_idx ON games_2v2 (Player_4_name, Date DESC, id DESC);
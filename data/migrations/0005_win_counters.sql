@@ -0,0 +1,18 @@
+/* Games_played and Games_won counters of user_data, filled from the recorded
+   1v1 games of databases created before init.sql had them. */
+ALTER TABLE user_data ADD COLUMN IF NOT EXISTS Games_played INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE user_data ADD COLUMN IF NOT EXISTS Games_won INTEGER NOT NULL DEFAULT 0;
+UPDATE user_data
+SET Games_played = stats.played,
+    Games_won = stats.won,
+    Winrate = stats.won * 100 / stats.played
+FROM (
+  SELECT name, COUNT(*) AS played, COUNT(*) FILTER (WHERE won) AS won
+  FROM (
+    SELECT Player_1_name AS name, Goals_p1 > Goals_p2 AS won FROM games_1v1
+    UNION ALL
+    SELECT Player_2_name AS name, Goals_p2 > Goals_p1 AS won FROM games_1v1
+  ) AS sides
+  GROUP BY name
+) AS stats
+WHERE user_data.Name = stats.name;
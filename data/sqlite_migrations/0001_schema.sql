@@ -0,0 +1,46 @@
+/* The tables of data/init.sql with the primary keys and the indexes the
+   Postgres migrations 0001 to 0004 add, for the sqlite backend. */
+CREATE TABLE user_data (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Name VARCHAR(30),
+    Password VARCHAR(30),
+    Elo SMALLINT,
+    Winrate SMALLINT,
+    Skin VARCHAR(15),
+    Games_played INTEGER NOT NULL DEFAULT 0,
+    Games_won INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE games_1v1 (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Player_1_name VARCHAR(30),
+    Player_2_name VARCHAR(30),
+    Player_1_elo SMALLINT,
+    Player_2_elo SMALLINT,
+    Goals_p1 SMALLINT,
+    Goals_p2 SMALLINT,
+    Date TIMESTAMP
+);
+CREATE TABLE games_2v2 (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Player_1_name VARCHAR(30),
+    Player_2_name VARCHAR(30),
+    Player_3_name VARCHAR(30),
+    Player_4_name VARCHAR(30),
+    Player_1_elo SMALLINT,
+    Player_2_elo SMALLINT,
+    Player_3_elo SMALLINT,
+    Player_4_elo SMALLINT,
+    Goals_p12 SMALLINT,
+    Goals_p34 SMALLINT,
+    Date TIMESTAMP
+);
+CREATE UNIQUE INDEX user_data_name_key ON user_data (Name);
+CREATE INDEX user_data_elo_idx ON user_data (Elo DESC);
+CREATE INDEX games_1v1_player_1_date_id_idx ON games_1v1 (Player_1_name, Date DESC, id DESC);
+CREATE INDEX games_1v1_player_2_date_id_idx ON games_1v1 (Player_2_name, Date DESC, id DESC);
+CREATE INDEX games_1v1_date_idx ON games_1v1 (Date DESC);
+CREATE INDEX games_2v2_player_1_date_id_idx ON games_2v2 (Player_1_name, Date DESC, id DESC);
+CREATE INDEX games_2v2_player_2_date_id_idx ON games_2v2 (Player_2_name, Date DESC, id DESC);
+CREATE INDEX games_2v2_player_3_date_id_idx ON games_2v2 (Player_3_name, Date DESC, id DESC);
+CREATE INDEX games_2v2_player_4_date_id_idx ON games_2v2 (Player_4_name, Date DESC, id DESC);
+CREATE INDEX games_2v2_date_idx ON games_2v2 (Date DESC);
@@ -0,0 +1,11 @@
+/* The counterpart of the Postgres migration 0005, the columns already come
+   with 0001 so only the counters are filled from the recorded 1v1 games. */
+UPDATE user_data
+SET Games_played = (SELECT COUNT(*) FROM games_1v1
+                    WHERE Player_1_name = user_data.Name OR Player_2_name = user_data.Name),
+    Games_won = (SELECT COUNT(*) FROM games_1v1
+                 WHERE (Player_1_name = user_data.Name AND Goals_p1 > Goals_p2)
+                    OR (Player_2_name = user_data.Name AND Goals_p2 > Goals_p1));
+UPDATE user_data
+SET Winrate = Games_won * 100 / Games_played
+WHERE Games_played > 0;
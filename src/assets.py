@@ -0,0 +1,251 @@
+"""Module with the process-wide cache of the image, font and text resources.
+
+Every image file is decoded and converted for the display once, the scaled and
+rotated variants drawn by the menus are derived once per set of parameters
+and kept as well, so drawing a frame never reads the disk. Fonts are opened
+once per size and the most recently drawn strings are kept rendered.
+
+Classes
+-------
+AssetManager
+    Loads, converts and keeps the image, font and text surfaces.
+
+Attributes
+----------
+ASSETS : AssetManager
+    The cache shared by the whole client.
+
+Raises
+------
+RuntimeError
+    When called as the main script and not imported
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple, Union
+
+import pygame
+
+FONT_PATH = "./../resources/ETHNOCEN.TTF"
+
+
+# pylint: disable=too-many-instance-attributes
+class AssetManager:
+    """
+    Cache of the converted image surfaces and of their variants, of the game
+    font in every size and of the rendered strings.
+
+    The surfaces are converted with `convert_alpha`, so they can only be
+    loaded once the display mode is set. The returned surfaces are shared,
+    callers draw them but must not draw onto them. The rendered strings are
+    kept in a least recently used cache of `text_capacity` surfaces.
+
+    Attributes
+    ----------
+    loads : int
+        Number of image files read from the disk.
+    text_capacity : int
+        Most rendered strings kept.
+    text_hits : int
+        Strings drawn from the cache.
+    text_misses : int
+        Strings rendered.
+
+    Parameters
+    ----------
+    text_capacity : int, optional
+        Most rendered strings kept, by default 1024.
+
+    Methods
+    -------
+    image(path) -> pygame.Surface
+        The converted surface of an image file.
+    variant(path, scale=1.0, angle=0) -> pygame.Surface
+        A scaled and rotated copy of an image file.
+    font(size) -> pygame.font.Font
+        The game font in a size.
+    render(font, text, color) -> pygame.Surface
+        A string rendered with a font.
+    preload(paths)
+        Loads images ahead of their first use.
+    memory_usage() -> int
+        Bytes of pixel data held by the cache.
+    clear()
+        Drops every cached surface.
+    """
+
+    def __init__(self, text_capacity: int = 1024):
+        self.loads = 0
+        self.text_capacity = text_capacity
+        self.text_hits = 0
+        self.text_misses = 0
+        self._images: Dict[str, pygame.Surface] = {}
+        self._variants: Dict[Tuple[str, float, int], pygame.Surface] = {}
+        self._fonts: Dict[int, pygame.font.Font] = {}
+        self._texts: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def image(self, path: str) -> pygame.Surface:
+        """
+        The converted surface of an image file, read from the disk on first use.
+
+        Parameters
+        ----------
+        path : str
+            Path of the image file.
+
+        Returns
+        -------
+        pygame.Surface
+            The shared surface.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the file cannot be loaded.
+        """
+        surface = self._images.get(path)
+        if surface is None:
+            try:
+                surface = pygame.image.load(path).convert_alpha()
+            except (pygame.error, FileNotFoundError) as error:
+                raise FileNotFoundError(f"Failed to load the image {path}") from error
+            with self._lock:
+                surface = self._images.setdefault(path, surface)
+                self.loads += 1
+        return surface
+
+    def variant(self, path: str, scale: float = 1.0, angle: int = 0) -> pygame.Surface:
+        """
+        A scaled and rotated copy of an image file, derived on first use.
+
+        Parameters
+        ----------
+        path : str
+            Path of the image file.
+        scale : float, optional
+            Scale factor, by default 1.0.
+        angle : int, optional
+            Counterclockwise rotation in degrees, by default 0.
+
+        Returns
+        -------
+        pygame.Surface
+            The shared surface.
+        """
+        key = (path, scale, angle)
+        surface = self._variants.get(key)
+        if surface is None:
+            surface = self.image(path)
+            if scale != 1.0:
+                surface = pygame.transform.scale_by(surface, scale)
+            if angle:
+                surface = pygame.transform.rotate(surface, angle)
+            with self._lock:
+                surface = self._variants.setdefault(key, surface)
+        return surface
+
+    def font(self, size: int) -> pygame.font.Font:
+        """
+        The game font in a size, opened on first use.
+
+        Parameters
+        ----------
+        size : int
+            The font size.
+
+        Returns
+        -------
+        pygame.font.Font
+            The shared font.
+
+        Raises
+        ------
+        FileNotFoundError
+            If it fails to load the font file.
+        """
+        font = self._fonts.get(size)
+        if font is None:
+            try:
+                font = pygame.font.Font(FONT_PATH, size)
+            except (pygame.error, OSError) as error:
+                raise FileNotFoundError("Failed to load the font, check the paths") from error
+            with self._lock:
+                font = self._fonts.setdefault(size, font)
+        return font
+
+    def render(self, font: pygame.font.Font, text: str,
+               color: Union[str, Tuple[int, int, int]]) -> pygame.Surface:
+        """
+        A string rendered with a font, antialiased.
+
+        Parameters
+        ----------
+        font : pygame.font.Font
+            The font of the string.
+        text : str
+            The string.
+        color : str or Tuple[int, int, int]
+            The color of the string.
+
+        Returns
+        -------
+        pygame.Surface
+            The shared surface.
+        """
+        key = (font, text, color if isinstance(color, (str, tuple)) else tuple(color))
+        with self._lock:
+            surface = self._texts.get(key)
+            if surface is not None:
+                self._texts.move_to_end(key)
+                self.text_hits += 1
+                return surface
+            self.text_misses += 1
+        surface = font.render(text, True, color)
+        with self._lock:
+            self._texts[key] = surface
+            while len(self._texts) > self.text_capacity:
+                self._texts.popitem(last=False)
+        return surface
+
+    def preload(self, paths: Iterable[str]) -> None:
+        """
+        Load images ahead of their first use.
+
+        Parameters
+        ----------
+        paths : Iterable[str]
+            Paths of the image files.
+        """
+        for path in paths:
+            self.image(path)
+
+    def memory_usage(self) -> int:
+        """
+        Bytes of pixel data held by the cache.
+
+        Returns
+        -------
+        int
+            The size of every cached surface, variant and string.
+        """
+        with self._lock:
+            surfaces = (list(self._images.values()) + list(self._variants.values())
+                        + list(self._texts.values()))
+        return sum(surface.get_pitch() * surface.get_height() for surface in surfaces)
+
+    def clear(self) -> None:
+        """
+        Drop every cached surface.
+        """
+        with self._lock:
+            self._images.clear()
+            self._variants.clear()
+            self._fonts.clear()
+            self._texts.clear()
+
+
+ASSETS = AssetManager()
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
@@ -0,0 +1,110 @@
+"""
+Codec Benchmark
+---------------
+
+Compares the round trip (encode + decode) cost and payload size of the binary
+codec against pickling the packet dictionaries, for the two packets exchanged
+on every frame of a match, and the bandwidth of a simulated match sent as
+keyframes only and as deltas of the acknowledged snapshots.
+
+Run from the src directory:
+    python -m benchmarks.bench_codec
+"""
+import datetime
+import math
+import pickle
+import timeit
+
+from networking.codec import encode_packet, decode_packet, PacketCodec
+from simulation.bodies import Action
+
+ROUNDS = 20000
+# one minute of snapshots at the server frame rate
+MATCH_FRAMES = 60 * 60
+
+
+def game_state_packet():
+    """Create a game_state_1 packet the way the server does."""
+    return {"time": datetime.datetime.now(),
+            "sender": "server",
+            "flag": "game_state_1",
+            "data": [1, 243.51, 2, 1, "User1", "User2",
+                     412.2, 360.0, 880.7, 300.1, 412.2, 360.0,
+                     880.7, 300.1, 3.2, 0, 0, 12.5,
+                     640.3, 359.9, False, True, False, 1041]}
+
+
+def input_packet():
+    """Create an ingame packet the way the client does."""
+    return {"time": datetime.datetime.now(),
+            "sender": 17,
+            "flag": "ingame",
+            "data": [(640, 360), Action.UP, 1042]}
+
+
+def per_call(function):
+    """Average duration of a call in microseconds."""
+    return timeit.timeit(function, number=ROUNDS) / ROUNDS * 1e6
+
+
+def measure(name, packet):
+    """Print size, encode and decode time of both serializations of a packet."""
+    pickled = pickle.dumps(packet)
+    encoded = encode_packet(packet)
+    pickle_times = (per_call(lambda: pickle.dumps(packet)),
+                    per_call(lambda: pickle.loads(pickled)))
+    codec_times = (per_call(lambda: encode_packet(packet)),
+                   per_call(lambda: decode_packet(encoded)))
+    print(f"{name:<14}{len(pickled):>8} B{len(encoded):>8} B"
+          f"{pickle_times[0]:>10.2f}{codec_times[0]:>10.2f}"
+          f"{pickle_times[1]:>10.2f}{codec_times[1]:>10.2f}"
+          f"{sum(pickle_times) / sum(codec_times):>10.1f}x")
+
+
+def match_snapshots():
+    """Yield the snapshot data of a match where only one player and the ball move
+    most of the time, the other player stands still and abilities are rarely used."""
+    data = game_state_packet()["data"]
+    for frame in range(MATCH_FRAMES):
+        data = list(data)
+        data[1] = 300 - frame / 60
+        data[6] = data[10] = 412.2 + 200 * math.sin(frame / 90)
+        data[18] = 640 + 300 * math.sin(frame / 40)
+        data[19] = 360 + 200 * math.cos(frame / 55)
+        # one input of the player is simulated per frame
+        data[23] = frame
+        if frame % 600 == 0:
+            # a dash starts the cooldown counting down for ten seconds
+            data[14] = 10.0
+        else:
+            data[14] = max(0.0, 10.0 - (frame % 600) / 60)
+        if frame % 900 == 450:
+            data[2] += 1
+        yield data
+
+
+def measure_match():
+    """Print the bytes sent for a match as keyframes and as acknowledged deltas."""
+    server_codec, client_codec = PacketCodec(), PacketCodec()
+    ack = input_packet()
+    keyframe_bytes = delta_bytes = 0
+    for data in match_snapshots():
+        packet = {"time": None, "sender": "server", "flag": "game_state_1", "data": data}
+        keyframe_bytes += len(encode_packet(packet))
+        payload = server_codec.encode(packet)
+        delta_bytes += len(payload)
+        client_codec.decode(payload)
+        server_codec.decode(client_codec.encode(ack))
+    print(f"\nsnapshots of a {MATCH_FRAMES // 60} s match at 60 FPS per client")
+    print(f"keyframes {keyframe_bytes:>8} B{keyframe_bytes / MATCH_FRAMES:>8.1f} B/frame")
+    print(f"deltas    {delta_bytes:>8} B{delta_bytes / MATCH_FRAMES:>8.1f} B/frame"
+          f"{keyframe_bytes / delta_bytes:>8.1f}x")
+
+
+if __name__ == "__main__":
+    print("times in microseconds per call")
+    print(f"{'packet':<14}{'pickle':>10}{'codec':>10}{'dumps':>10}{'encode':>10}"
+          f"{'loads':>10}{'decode':>10}{'speedup':>11}")
+    measure("game_state_1", game_state_packet())
+    measure("ingame", input_packet())
+    measure_match()
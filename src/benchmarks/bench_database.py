@@ -0,0 +1,103 @@
+"""
+Database Benchmark
+------------------
+
+Compares the latency of get_history and of a login before and after the
+schema migrations, on 10000 users and 1000000 synthetic 1v1 games. Needs the
+configured Postgres database, everything is created in a scratch schema that
+is dropped at the end, the real tables are not touched.
+
+Run from the src directory:
+    python -m benchmarks.bench_database
+"""
+import random
+import time
+
+from configuration_mod import Config
+from database.database_query import DBQuery
+from database.migrations import MigrationRunner
+
+SCHEMA = "novaglide_bench"
+USERS = 10000
+GAMES = 1000000
+SAMPLES = 200
+
+
+class BenchQuery(DBQuery):
+    """DBQuery whose connections work in the scratch schema."""
+
+    def create_new_connection(self):
+        connection = super().create_new_connection()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET search_path TO {SCHEMA}")
+        connection.commit()
+        return connection
+
+
+def create_tables(db_query):
+    """Create the tables of data/init.sql and fill them with synthetic data."""
+    with open("../data/init.sql", encoding="utf-8") as init:
+        tables = init.read().split("/* TO BE DELETED")[0]
+    with db_query.pool.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(tables)
+            cursor.execute("""
+    INSERT INTO user_data (Name, Password, Elo, Winrate, Skin)
+    SELECT 'User' || i, 'password' || i, 800 + (random() * 800)::int, 0, 'Skin1'
+    FROM generate_series(1, %s) AS i""", (USERS,))
+            cursor.execute("""
+    INSERT INTO games_1v1 (Player_1_name, Player_2_name, Player_1_elo, Player_2_elo,
+                           Goals_p1, Goals_p2, Date)
+    SELECT 'User' || (1 + (random() * (%s - 1))::int), 'User' || (1 + (random() * (%s - 1))::int),
+           1000, 1000, (random() * 5)::int, (random() * 5)::int,
+           now() - random() * interval '365 days'
+    FROM generate_series(1, %s)""", (USERS, USERS, GAMES))
+            cursor.execute("ANALYZE")
+
+
+def latency(function, names):
+    """Median and 99th percentile latency in milliseconds."""
+    durations = []
+    for name in names:
+        start = time.perf_counter()
+        function(name)
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return durations[len(durations) // 2], durations[len(durations) * 99 // 100]
+
+
+def measure(db_query, names):
+    """Latencies of the history and login queries."""
+    return {"get_history": latency(db_query.get_history, names),
+            "login": latency(lambda name: db_query.allow_user_credentials(
+                name, "password" + name[4:]), names)}
+
+
+if __name__ == "__main__":
+    CONFIG = Config().config
+    ADMIN = DBQuery(CONFIG)
+    with ADMIN.pool.connection() as ADMIN_CONNECTION:
+        with ADMIN_CONNECTION.cursor() as ADMIN_CURSOR:
+            ADMIN_CURSOR.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            ADMIN_CURSOR.execute(f"CREATE SCHEMA {SCHEMA}")
+    BENCH = BenchQuery(CONFIG)
+    try:
+        print(f"Creating {USERS} users and {GAMES} games")
+        create_tables(BENCH)
+        NAMES = [f"User{random.randint(1, USERS)}" for _ in range(SAMPLES)]
+        BEFORE = measure(BENCH, NAMES)
+        MigrationRunner(BENCH.pool, CONFIG["database"]["migrations_path"]).migrate()
+        with BENCH.pool.connection() as CONNECTION:
+            with CONNECTION.cursor() as CURSOR:
+                CURSOR.execute("ANALYZE")
+        AFTER = measure(BENCH, NAMES)
+        print(f"{'query':>12}{'before p50/p99 ms':>22}{'after p50/p99 ms':>22}")
+        for QUERY, (P50, P99) in BEFORE.items():
+            print(f"{QUERY:>12}{P50:>12.2f} / {P99:<7.2f}"
+                  f"{AFTER[QUERY][0]:>12.2f} / {AFTER[QUERY][1]:<7.2f}")
+    finally:
+        BENCH.close_connection_to_db()
+        with ADMIN.pool.connection() as ADMIN_CONNECTION:
+            with ADMIN_CONNECTION.cursor() as ADMIN_CURSOR:
+                ADMIN_CURSOR.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        ADMIN.close_connection_to_db()
@@ -0,0 +1,53 @@
+"""
+Matchmaking Benchmark
+---------------------
+
+Queues 50000 players with normally distributed elo, half of them at once and
+the other half spread over a minute, then runs the matchmaking passes every
+half second of simulated time. Reports the enqueue latency, the duration of a
+pass and the queue wait time percentiles.
+
+Run from the src directory:
+    python -m benchmarks.bench_matchmaking
+"""
+import random
+import time
+
+from configuration_mod import Config
+from match.matchmaking import MatchmakingQueue
+
+PLAYERS = 50000
+SPREAD = 60
+
+
+if __name__ == "__main__":
+    CONFIG = Config().config
+    QUEUE = MatchmakingQueue(CONFIG)
+    GENERATOR = random.Random(0)
+    JOINS = sorted((GENERATOR.uniform(0, SPREAD) if player_id % 2 else 0.0, player_id,
+                    int(GENERATOR.gauss(1000, 200))) for player_id in range(PLAYERS))
+
+    ENQUEUE = []
+    PASSES = []
+    NOW = 0.0
+    NEXT = 0
+    while NEXT < len(JOINS) or len(QUEUE) > 1 and NOW < SPREAD + 120:
+        NOW += CONFIG["matchmaking"]["interval"]
+        while NEXT < len(JOINS) and JOINS[NEXT][0] <= NOW:
+            joined, player_id, elo = JOINS[NEXT]
+            start = time.perf_counter()
+            QUEUE.join(player_id, f"P{player_id}", elo, now=joined)
+            ENQUEUE.append(time.perf_counter() - start)
+            NEXT += 1
+        start = time.perf_counter()
+        QUEUE.find_pairs(now=NOW)
+        PASSES.append(time.perf_counter() - start)
+
+    ENQUEUE.sort()
+    print(f"enqueue p50 {ENQUEUE[len(ENQUEUE) // 2] * 1e6:.1f} us, "
+          f"p99 {ENQUEUE[len(ENQUEUE) * 99 // 100] * 1e6:.1f} us, "
+          f"max {ENQUEUE[-1] * 1e6:.1f} us")
+    print(f"pass mean {sum(PASSES) / len(PASSES) * 1e3:.2f} ms, max {max(PASSES) * 1e3:.2f} ms")
+    print("wait time percentiles (s):",
+          {key: round(value, 2) for key, value in QUEUE.wait_time_percentiles().items()})
+    print(f"{len(QUEUE)} players left in the queue")
@@ -0,0 +1,71 @@
+"""
+Menu Frame Benchmark
+--------------------
+
+Compares the frame time of a menu drawing a full match history table and its
+buttons when every string opens the font and renders it again, as draw_text
+used to, and when fonts and rendered strings come from the asset cache, then
+reports the size of the asset cache once every image is preloaded like the
+client does at startup.
+
+Run from the src directory:
+    SDL_VIDEODRIVER=dummy python -m benchmarks.bench_menu
+"""
+import time
+
+import pygame
+
+import utilities
+from assets import ASSETS, FONT_PATH
+from configuration_mod import Config
+from menu_elements.table import Table
+
+FRAMES = 200
+BUTTONS = ["Play 1v1", "Play 2v2", "Match history", "Ranked system", "Settings", "Credits"]
+
+
+# pylint: disable=too-many-arguments
+def uncached_draw_text(text, size, x, y, display, color="white"):
+    """draw_text without the caches."""
+    surface = pygame.font.Font(FONT_PATH, size).render(text, True, color)
+    display.blit(surface, surface.get_rect(center=(x, y)))
+
+
+def history_rows():
+    """Cells of a full history page."""
+    return [str(value) for row in range(10)
+            for value in (f"User{row}", f"User{row + 1}", 1000 + row, 990 - row,
+                          f"{row % 4} - {row % 3}", f"2024-05-{row + 1:02d}")]
+
+
+def frame_time(draw):
+    """Mean frame time in milliseconds."""
+    config = Config().config
+    display = pygame.display.get_surface()
+    table = Table(config, header="Match history", top_left_coords=(100, 100),
+                  cols_sizes=[180, 180, 100, 100, 100, 180])
+    rows = history_rows()
+    original = utilities.draw_text
+    utilities.draw_text = draw
+    try:
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            display.fill((0, 0, 0))
+            table.update(display)
+            table.insert_data(rows, display)
+            for index, label in enumerate(BUTTONS):
+                draw(label, 40, 200, 400 + index * 50, display, color="white")
+        return (time.perf_counter() - start) / FRAMES * 1e3
+    finally:
+        utilities.draw_text = original
+
+
+if __name__ == "__main__":
+    pygame.init()
+    pygame.display.set_mode((1280, 720))
+    UNCACHED = frame_time(uncached_draw_text)
+    CACHED = frame_time(utilities.draw_text)
+    print(f"uncached {UNCACHED:.2f} ms/frame, cached {CACHED:.2f} ms/frame, "
+          f"{UNCACHED / CACHED:.1f}x, {ASSETS.text_hits} hits / {ASSETS.text_misses} renders")
+    utilities.preload_images()
+    print(f"{ASSETS.loads} images preloaded, {ASSETS.memory_usage() / 2 ** 20:.1f} MiB cached")
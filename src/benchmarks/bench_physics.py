@@ -0,0 +1,68 @@
+"""
+Physics Benchmark
+-----------------
+
+Compares the ticks per second of the scalar path, where every match runs its
+own match_loop, with the BatchEngine stepping all the matches at once, for 10,
+100 and 1000 concurrent matches where both players move, hook and dash.
+
+Run from the src directory:
+    python -m benchmarks.bench_physics
+"""
+import random
+import time
+
+from configuration_mod import Config
+from match.match import Match1v1
+from simulation.batch import BatchEngine
+from simulation.bodies import PlayerBody, BallBody
+
+TICKS = 300
+DT = 1 / 60
+
+
+def create_matches(config, count):
+    """Matches with a moving ball and random inputs of both players."""
+    generator = random.Random(count)
+    matches = []
+    for index in range(count):
+        match = Match1v1(config, PlayerBody(f"A{index}", 100, 360, config),
+                         PlayerBody(f"B{index}", 1180, 360, config),
+                         BallBody(config), 2 * index, 2 * index + 1)
+        match.ball.speed.x = generator.uniform(-20, 20)
+        match.ball.speed.y = generator.uniform(-20, 20)
+        for side in (1, 2):
+            match.set_input(side, [(generator.randint(0, 1280), generator.randint(0, 720)),
+                                   generator.randint(0, 63)])
+        matches.append(match)
+    return matches
+
+
+def scalar_ticks_per_second(config, count):
+    """Ticks per second when every match steps its own objects."""
+    matches = create_matches(config, count)
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        for match in matches:
+            match.match_loop(DT)
+    return TICKS / (time.perf_counter() - start)
+
+
+def batch_ticks_per_second(config, count):
+    """Ticks per second when the BatchEngine steps all the matches."""
+    engine = BatchEngine(config)
+    for match in create_matches(config, count):
+        engine.add_match(match)
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        engine.step(DT)
+    return TICKS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    CONFIG = Config().config
+    print(f"{'matches':>8}{'scalar tick/s':>16}{'batch tick/s':>16}{'speedup':>10}")
+    for matches_count in (10, 100, 1000):
+        scalar = scalar_ticks_per_second(CONFIG, matches_count)
+        batch = batch_ticks_per_second(CONFIG, matches_count)
+        print(f"{matches_count:>8}{scalar:>16.0f}{batch:>16.0f}{batch / scalar:>9.1f}x")
@@ -0,0 +1,63 @@
+"""
+Prepared Statements Benchmark
+-----------------------------
+
+Compares the latency of the hot DBQuery statements sent as SQL text and
+executed through their prepared handle. Needs the configured Postgres
+database, the writes run in one transaction that is rolled back at the end.
+
+Run from the src directory:
+    python -m benchmarks.bench_prepared
+"""
+import time
+from datetime import datetime
+
+from configuration_mod import Config
+from database.database_query import DBQuery
+from database.prepared import PreparedStatements
+
+REPEATS = 2000
+
+STATEMENTS = [
+    ("login", "SELECT Name, Password FROM user_data WHERE Name = %s", ("User1",)),
+    ("profile", "SELECT id, Name, Elo, Winrate FROM user_data WHERE Name = %s", ("User1",)),
+    ("elo update", "UPDATE user_data SET elo = %s WHERE id = %s", (1000, 1)),
+    ("history", "(SELECT * FROM games_1v1 WHERE Player_1_name = %s ORDER BY Date DESC LIMIT 10)"
+                " UNION ALL "
+                "(SELECT * FROM games_1v1 WHERE Player_2_name = %s ORDER BY Date DESC LIMIT 10)"
+                " ORDER BY Date DESC LIMIT 10", ("User1", "User1")),
+    ("match insert", "INSERT INTO games_1v1 (player_1_name, player_2_name, player_1_elo, "
+                     "player_2_elo, goals_p1, goals_p2, date) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+     ("User1", "User2", 1000, 1000, 1, 0, datetime.now())),
+]
+
+
+def median_latency(execute, cursor, query, params):
+    """Median latency of a statement in microseconds."""
+    durations = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        execute(cursor, query, params)
+        if cursor.description is not None:
+            cursor.fetchall()
+        durations.append((time.perf_counter() - start) * 1e6)
+    durations.sort()
+    return durations[len(durations) // 2]
+
+
+if __name__ == "__main__":
+    DB_QUERY = DBQuery(Config().config)
+    PREPARED = PreparedStatements()
+    CONNECTION = DB_QUERY.pool.getconn()
+    try:
+        with CONNECTION.cursor() as CURSOR:
+            print(f"{'statement':>14}{'text us':>12}{'prepared us':>14}{'saved':>8}")
+            for LABEL, QUERY, PARAMS in STATEMENTS:
+                TEXT = median_latency(lambda cursor, query, params: cursor.execute(query, params),
+                                      CURSOR, QUERY, PARAMS)
+                HANDLE = median_latency(PREPARED.run, CURSOR, QUERY, PARAMS)
+                print(f"{LABEL:>14}{TEXT:>12.1f}{HANDLE:>14.1f}{1 - HANDLE / TEXT:>8.0%}")
+    finally:
+        CONNECTION.rollback()
+        DB_QUERY.pool.putconn(CONNECTION)
+        DB_QUERY.close_connection_to_db()
@@ -0,0 +1,73 @@
+"""
+Match Render Benchmark
+----------------------
+
+Compares the client CPU time of a match frame drawn the old way, the whole rink,
+goals, border and HUD redrawn and the whole window updated, against the
+layered renderer updating only the dirty rectangles. The ball crosses the rink
+while the timer counts down once per second of frames.
+
+Run from the src directory:
+    SDL_VIDEODRIVER=dummy python -m benchmarks.bench_render
+"""
+import time
+
+import pygame
+
+from assets import ASSETS
+from configuration_mod import Config
+from game import Game
+
+FRAMES = 600
+# pixels sent to the window by every layered frame
+UPDATED_PIXELS = []
+
+
+def full_frame(game, match_data):
+    """Draw a frame the way Game.draw did before the layered renderer."""
+    game.screen.blit(game.display, (0, 0))
+    game.display.fill((150, 150, 150))
+    game.display.blit(game.bg, (0, 0))
+    pygame.draw.rect(game.display, "red", game.goal_1)
+    pygame.draw.rect(game.display, "red", game.goal_2)
+    pygame.draw.rect(game.display, (255, 255, 255), game.border, game.border_width)
+    texts = game.renderer.hud_texts(match_data)
+    for _, text, color, anchor, position in texts:
+        surface = game.font.render(text, True, color)
+        game.display.blit(surface, surface.get_rect(**{anchor: position}))
+    for entity in (game.player_1, game.player_2, game.ball):
+        entity.setRect()
+        game.display.blit(entity.image, entity.rect)
+    pygame.display.update()
+
+
+def layered_frame(game, match_data):
+    """Draw a frame with the layered renderer."""
+    game.renderer.draw(match_data)
+    UPDATED_PIXELS.append(game.renderer.updated_pixels)
+
+
+def frames():
+    """Match data of a ball crossing the rink."""
+    for frame in range(FRAMES):
+        yield [1, 60 - frame // 60, 0, 0, "a", "b", 100, 360, 1180, 360, 0, 0, 0, 0,
+               0, 0, 0, 0, 100 + frame * 1080 // FRAMES, 360, False, False, False]
+
+
+def frame_time(game, draw):
+    """Mean frame time in milliseconds."""
+    start = time.perf_counter()
+    for match_data in frames():
+        game.ball.x, game.ball.y = match_data[18], match_data[19]
+        draw(game, match_data)
+    return (time.perf_counter() - start) / FRAMES * 1e3
+
+
+if __name__ == "__main__":
+    GAME = Game(Config().config)
+    FULL = frame_time(GAME, full_frame)
+    GAME.renderer.reset()
+    LAYERED = frame_time(GAME, layered_frame)
+    print(f"full {FULL:.2f} ms/frame, layered {LAYERED:.2f} ms/frame, {FULL / LAYERED:.1f}x, "
+          f"{sum(UPDATED_PIXELS[1:]) / (FRAMES - 1) / (GAME.WIDTH * GAME.HEIGHT):.1%} of the window "
+          f"updated per frame, {ASSETS.text_misses} texts rendered")
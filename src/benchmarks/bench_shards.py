@@ -0,0 +1,56 @@
+"""
+Shards Benchmark
+----------------
+
+Measures how many match ticks per second a ShardPool simulates with 1, 2, 4
+and one worker per CPU core for the same total number of matches. The workers
+get a tick rate far above what they can keep up with, so every worker ticks
+as fast as it can and the total is bound by the number of cores.
+
+Run from the src directory:
+    python -m benchmarks.bench_shards
+"""
+import os
+import time
+
+from configuration_mod import Config
+from benchmarks.bench_physics import create_matches
+from match.shards import ShardPool
+
+MATCHES = 400
+SECONDS = 3
+
+
+def match_ticks_per_second(config, shards):
+    """Match ticks per second simulated by a pool of the given size."""
+    config["server"]["shards"] = shards
+    config["server"]["shard_capacity"] = MATCHES
+    config["server"]["tick_rate"] = 100000
+    # never skip, every worker runs its ticks back to back
+    config["server"]["max_catch_up_ticks"] = 10 ** 9
+    pool = ShardPool(config)
+    pool.start()
+    try:
+        for match in create_matches(config, MATCHES):
+            match.match_duration = 10 ** 6
+            pool.add_match(match)
+        time.sleep(1)
+        before = [stats["ticks"] for stats in pool.stats()]
+        time.sleep(SECONDS)
+        after = pool.stats()
+    finally:
+        pool.stop()
+    return sum((stats["ticks"] - start) * stats["matches"]
+               for start, stats in zip(before, after)) / SECONDS
+
+
+if __name__ == "__main__":
+    CONFIG = Config().config
+    CORES = os.cpu_count()
+    print(f"{CORES} CPU cores, {MATCHES} matches, {CONFIG['server']['engine']} engine")
+    print(f"{'shards':>8}{'match ticks/s':>16}{'scaling':>10}")
+    BASELINE = None
+    for shard_count in sorted({1, 2, 4, CORES}):
+        result = match_ticks_per_second(CONFIG, shard_count)
+        BASELINE = BASELINE or result
+        print(f"{shard_count:>8}{result:>16.0f}{result / BASELINE:>9.1f}x")
@@ -49,3 +49,61 @@ class InvalidClientException(Exception):
     def __init__(self, message="Incorrect client"):
         self.message = message
         super().__init__(self.message)
+
+
+class InvalidFrameError(Exception):
+    """
+    Exception raised when a network frame violates the wire protocol.
+
+    Parameters
+    ----------
+    message : str, optional
+        Explanation of the error, by default "Invalid network frame".
+    """
+    def __init__(self, message="Invalid network frame"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class MatchCapacityError(Exception):
+    """
+    Exception raised when every match shard of the server is full.
+
+    Parameters
+    ----------
+    message : str, optional
+        Explanation of the error, by default "All match shards are full".
+    """
+    def __init__(self, message="All match shards are full"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class PoolTimeoutError(Exception):
+    """
+    Exception raised when no database connection becomes free in time.
+
+    Parameters
+    ----------
+    message : str, optional
+        Explanation of the error, by default
+        "Timed out waiting for a database connection".
+    """
+    def __init__(self, message="Timed out waiting for a database connection"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class SnapshotReadError(Exception):
+    """
+    Exception raised when a match snapshot stays locked by its writer.
+
+    Parameters
+    ----------
+    message : str, optional
+        Explanation of the error, by default
+        "The match snapshot is still being written".
+    """
+    def __init__(self, message="The match snapshot is still being written"):
+        self.message = message
+        super().__init__(self.message)
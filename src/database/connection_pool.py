@@ -0,0 +1,253 @@
+"""
+Connection Pool Module
+----------------------
+
+Provides the ConnectionPool class keeping database connections open between
+queries, so a query borrows a ready connection instead of paying the TCP and
+authentication handshake of a new one.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from custom_exceptions import PoolTimeoutError
+
+
+# pylint: disable=too-many-instance-attributes
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections.
+
+    At least `min_size` connections are kept open, a broken one is replaced
+    when it is returned unless the database refuses a new connection, and at
+    most `max_size` exist at the same time, a checkout waits up to `checkout_timeout` seconds for a
+    connection to be returned when all of them are in use. A connection that
+    sat idle for longer than `health_check_idle` seconds is checked with a
+    trivial query before it is handed out and replaced if it is broken.
+
+    Attributes
+    ----------
+    min_size : int
+        Number of connections opened up front.
+    max_size : int
+        Maximum number of open connections.
+    checkout_timeout : float
+        Seconds a checkout waits for a free connection.
+    health_check_idle : float
+        Idle seconds after which a connection is checked before reuse.
+    size : int
+        Number of open connections, idle or in use.
+    waits : int
+        Number of checkouts that had to wait for a free connection.
+
+    Parameters
+    ----------
+    connect : callable
+        Opens a new connection.
+    min_size : int
+        Number of connections opened up front.
+    max_size : int
+        Maximum number of open connections.
+    checkout_timeout : float
+        Seconds a checkout waits for a free connection.
+    health_check_idle : float
+        Idle seconds after which a connection is checked before reuse.
+    broken_errors : tuple, optional
+        Exception types meaning the connection itself failed, such a
+        connection is closed instead of returned to the pool. Empty by
+        default.
+
+    Methods
+    -------
+    getconn() -> connection
+        Borrows a connection.
+    putconn(conn, broken=False)
+        Returns a borrowed connection.
+    connection() -> contextmanager
+        Borrows a connection for a transaction.
+    close()
+        Closes every idle connection and refuses new checkouts.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, connect, min_size, max_size, checkout_timeout,
+                 health_check_idle, broken_errors=()):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_idle = health_check_idle
+        self.broken_errors = broken_errors
+        self.size = 0
+        self.waits = 0
+        self._idle = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+        for _ in range(min_size):
+            self._idle.append((self.connect(), time.monotonic()))
+            self.size += 1
+
+    @property
+    def idle(self):
+        """Number of open connections not borrowed."""
+        return len(self._idle)
+
+    def _healthy(self, conn, idle_since):
+        """Whether an idle connection can be handed out."""
+        if getattr(conn, "closed", False):
+            return False
+        if time.monotonic() - idle_since < self.health_check_idle:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+        except Exception:  # pylint: disable=broad-except
+            return False
+        return True
+
+    @staticmethod
+    def _discard(conn):
+        """Close a connection that is not returned to the pool."""
+        try:
+            conn.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    def getconn(self):
+        """
+        Borrow a connection, opening a new one while below `max_size`.
+
+        Returns
+        -------
+        connection
+            An open connection, to be given back with `putconn`.
+
+        Raises
+        ------
+        PoolTimeoutError
+            If no connection is returned within `checkout_timeout` seconds.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise PoolTimeoutError("The connection pool is closed")
+                waited = False
+                while not self._idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError()
+                    if not waited:
+                        self.waits += 1
+                        waited = True
+                    self._condition.wait(remaining)
+                if self._idle:
+                    # most recently used first, the others can stay idle
+                    conn, idle_since = self._idle.pop()
+                else:
+                    conn, idle_since = None, None
+                    self.size += 1
+            if conn is None:
+                try:
+                    return self.connect()
+                except Exception:
+                    self._forget()
+                    raise
+            if self._healthy(conn, idle_since):
+                return conn
+            self._discard(conn)
+            self._forget()
+
+    def _forget(self):
+        """Account for a connection that was closed or never opened."""
+        with self._condition:
+            self.size -= 1
+            self._condition.notify()
+
+    def _refill(self):
+        """Open a connection in place of a broken one while below `min_size`."""
+        with self._condition:
+            if self._closed or self.size >= self.min_size:
+                return
+            self.size += 1
+        try:
+            conn = self.connect()
+        except Exception:  # pylint: disable=broad-except
+            # a later checkout opens it once the database accepts connections
+            self._forget()
+            return
+        with self._condition:
+            if not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                self._condition.notify()
+                return
+        self._discard(conn)
+        self._forget()
+
+    def putconn(self, conn, broken=False):
+        """
+        Return a borrowed connection.
+
+        Parameters
+        ----------
+        conn : connection
+            The connection given by `getconn`.
+        broken : bool, optional
+            True to close the connection instead of keeping it, a new one
+            takes its place while fewer than `min_size` are open.
+        """
+        if broken or self._closed:
+            self._discard(conn)
+            self._forget()
+            self._refill()
+            return
+        with self._condition:
+            self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for one transaction.
+
+        The transaction is committed when the block ends and rolled back when
+        it raises, a connection failing with one of `broken_errors` is closed
+        instead of being returned.
+
+        Yields
+        ------
+        connection
+            The borrowed connection.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except self.broken_errors:
+            self.putconn(conn, broken=True)
+            raise
+        except BaseException:
+            try:
+                conn.rollback()
+            except self.broken_errors:
+                self.putconn(conn, broken=True)
+                raise
+            self.putconn(conn)
+            raise
+        self.putconn(conn)
+
+    def close(self):
+        """
+        Close every idle connection, borrowed ones are closed when returned.
+        """
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+                self.size -= 1
+            self._condition.notify_all()
@@ -3,19 +3,51 @@ DBQuery Module
 --------------
 
 Provides the DBQuery class for database interactions in gaming applications, handling user and match data using psycopg2 for PostgreSQL.
+Every query borrows a connection from a ConnectionPool and gives it back when done,
+and runs as a prepared statement of that connection.
 """
 
 from datetime import datetime
 from typing import Dict
 
 import psycopg2
-
+import psycopg2.errors
+
+from database.connection_pool import ConnectionPool
+from database.prepared import PreparedStatements
+from database.profile_cache import ProfileCache, UserProfile
+from database.result_writer import MatchResult
+
+# columns of the match history, id first and Date last make up the page cursor
+HISTORY_COLUMNS = {
+    "games_1v1": ("id", "Player_1_name", "Player_2_name", "Player_1_elo", "Player_2_elo",
+                  "Goals_p1", "Goals_p2", "Date"),
+    "games_2v2": ("id", "Player_1_name", "Player_2_name", "Player_3_name", "Player_4_name",
+                  "Player_1_elo", "Player_2_elo", "Player_3_elo", "Player_4_elo",
+                  "Goals_p12", "Goals_p34", "Date"),
+}
+HISTORY_PLAYERS_1V1 = ("Player_1_name", "Player_2_name")
+HISTORY_PLAYERS_2V2 = ("Player_1_name", "Player_2_name", "Player_3_name", "Player_4_name")
+
+# the prepared statements of a connection no longer match the bookkeeping,
+# invalid_sql_statement_name and duplicate_prepared_statement
+PREPARED_STATE_ERRORS = (psycopg2.errors.lookup("26000"),
+                         psycopg2.errors.lookup("42P05"))
 
 # pylint: disable=too-many-instance-attributes
 class DBQuery:
     """
     Class for handling database queries related to user and match data.
 
+    Attributes
+    ----------
+    broken_errors : tuple
+        Exception types meaning a pooled connection failed.
+    statements_class : type
+        Runs the statements on the pooled connections.
+    migrations_path : str
+        Directory of the schema migrations of this backend.
+
     Parameters
     ----------
     config : dict
@@ -35,53 +67,69 @@ class DBQuery:
         Get the Elo rating of a user.
     get_user_winrate(name: str)
         Get the win rate of a user.
+    get_user_profile(player_id: int = None, name: str = None)
+        Read the id, name, Elo and win rate of a user in one query.
     insert_1v1_game(match: Match1v1)
         Insert a 1v1 match into the database.
+    record_1v1_match(match: Match1v1, p1_new_elo: int, p2_new_elo: int)
+        Record a finished 1v1 match and its rating changes in one transaction.
+    record_1v1_matches(results: list)
+        Record a batch of finished 1v1 matches in one transaction.
     update_user_winrate(idx: int, name: str)
         Update the win rate of a user.
     update_user_elo(idx: int, new_elo: int)
         Update the Elo rating of a user.
     get_history(name: str, solo: bool = True)
         Get the match history of a user.
+    get_history_page(name: str, solo: bool = True, before: tuple = None)
+        Get one page of the match history of a user.
     query_data(query="user_data")
         Execute a predefined SQL query.
     close_connection_to_db()
-        Close the connection to the database.
-    create_new_connection()
-        Create a new connection to the database.
+        Close the connections of the pool.
     allow_user_credentials(username: str, password: str)
         Validate user credentials and handle user registration.
     """
 
+    broken_errors = (psycopg2.InterfaceError, psycopg2.OperationalError)
+    statements_class = PreparedStatements
+
     def __init__(self, config: Dict) -> None:
         self.config = config
+        self.migrations_path = self.config["database"]["migrations_path"]
         self.database = self.config["database"]["database"]
         self.user = self.config["database"]["user"]
         self.password = self.config["database"]["password"]
         self.host = self.config["database"]["host"]
         self.port = self.config["database"]["port"]
-        # Establishing connection the the database
-        self.connection = psycopg2.connect(database=self.database,
-                                           user=self.user, password=self.password,
-                                           host=self.host, port=self.port)
-        # Opening cursor to the database
-        self.cursor = self.connection.cursor()
+        # Connections kept open between the queries
+        self.pool = ConnectionPool(self.create_new_connection,
+                                   self.config["database"]["pool_min_size"],
+                                   self.config["database"]["pool_max_size"],
+                                   self.config["database"]["pool_checkout_timeout"],
+                                   self.config["database"]["pool_health_check_idle"],
+                                   broken_errors=self.broken_errors)
+        # Statements prepared once per pooled connection and executed by name
+        self.statements = self.statements_class()
+        # Profiles of the recently seen users, dropped when their rating is written
+        self.profiles = ProfileCache(self.get_user_profile,
+                                     self.config["database"]["profile_cache_size"])
         # Basic commands mapping to increase readability
         self.sql_statements = {"user_data": "SELECT * FROM  user_data",
                                "top_elo": """
-(
+SELECT Elo FROM (
   SELECT Elo
   FROM user_data
   ORDER BY Elo DESC
   LIMIT 1 OFFSET 99
-)
+) AS hundredth
 UNION
-(
+SELECT Elo FROM (
   SELECT Elo
   FROM user_data
   ORDER BY Elo ASC
   LIMIT 1
-);
+) AS lowest;
 """,
                                "get_challengers": "SELECT Name, Winrate, Elo FROM user_data ORDER BY Elo DESC LIMIT 100"}
 
@@ -106,17 +154,9 @@ UNION
         """
         if not isinstance(name, str):
             raise TypeError("Name must be string")
-        query = "SELECT COUNT(*) AS games_played FROM games_1v1 WHERE (player_1_name = %s OR player_2_name = %s)"
-        try:
-            self.cursor.execute(query,
-                                (name, name))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(query,
-                                (name, name))
-        result = self.cursor.fetchone()
-        self.close_connection_to_db()
-        return result
+        # counter kept up to date by record_1v1_matches, 0 for unknown users
+        query = "SELECT COALESCE((SELECT games_played FROM user_data WHERE Name = %s), 0)"
+        return self._execute(query, (name,), fetch="one")
 
     def get_user_won_games(self, name: str):
         """
@@ -139,17 +179,9 @@ UNION
         """
         if not isinstance(name, str):
             raise TypeError("Name must be string")
-        query = "SELECT COUNT(*) AS games_won FROM games_1v1 WHERE (player_1_name = %s AND goals_p1 > goals_p2) OR (player_2_name = %s AND goals_p2 > goals_p1)"
-        try:
-            self.cursor.execute(query,
-                                (name, name))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(query,
-                                (name, name))
-        result = self.cursor.fetchone()
-        self.close_connection_to_db()
-        return result
+        # counter kept up to date by record_1v1_matches, 0 for unknown users
+        query = "SELECT COALESCE((SELECT games_won FROM user_data WHERE Name = %s), 0)"
+        return self._execute(query, (name,), fetch="one")
 
     def get_user_id(self, name: str):
         """
@@ -172,17 +204,8 @@ UNION
         """
         if not isinstance(name, str):
             raise TypeError("Name must be string")
-        query = "SELECT id FROM user_data WHERE Name =%s"
-        try:
-            self.cursor.execute(query,
-                                (name,))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(query,
-                                (name,))
-        result = self.cursor.fetchone()
-        self.close_connection_to_db()
-        return result
+        profile = self.profiles.by_name(name)
+        return None if profile is None else (profile.player_id,)
 
     def get_user_name(self, index: int):
         """
@@ -204,17 +227,8 @@ UNION
         """
         if not isinstance(index, int):
             raise TypeError("Index must be integer.")
-        query = "SELECT Name FROM user_data WHERE id =%s"
-        try:
-            self.cursor.execute(query,
-                                (index,))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(query,
-                                (index,))
-        result = self.cursor.fetchone()
-        self.close_connection_to_db()
-        return result
+        profile = self.profiles.by_id(index)
+        return None if profile is None else (profile.name,)
 
     def get_user_elo(self, name: str):
         """
@@ -237,17 +251,8 @@ UNION
         """
         if not isinstance(name, str):
             raise TypeError("Name must be string")
-        query = "SELECT Elo FROM user_data WHERE Name =%s"
-        try:
-            self.cursor.execute(query,
-                                (name,))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(query,
-                                (name,))
-        result = self.cursor.fetchone()
-        self.close_connection_to_db()
-        return result
+        profile = self.profiles.by_name(name)
+        return None if profile is None else (profile.elo,)
 
     def get_user_winrate(self, name: str):
         """
@@ -270,17 +275,45 @@ UNION
         """
         if not isinstance(name, str):
             raise TypeError("Name must be string")
-        query = "SELECT Winrate FROM user_data WHERE Name =%s"
-        try:
-            self.cursor.execute(query,
-                                (name,))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(query,
-                                (name,))
-        result = self.cursor.fetchone()
-        self.close_connection_to_db()
-        return result
+        profile = self.profiles.by_name(name)
+        return None if profile is None else (profile.winrate,)
+
+    def get_user_profile(self, player_id: int = None, name: str = None):
+        """
+        Read the id, name, Elo and win rate of a user in one query, bypassing
+        the profile cache.
+
+        Parameters
+        ----------
+        player_id : int, optional
+            The ID of the user.
+        name : str, optional
+            The name of the user, used when no ID is given.
+
+        Returns
+        -------
+        UserProfile or None
+            None if there is no such user.
+        """
+        if player_id is not None:
+            query = "SELECT id, Name, Elo, Winrate FROM user_data WHERE id = %s"
+            row = self._execute(query, (player_id,), fetch="one")
+        else:
+            query = "SELECT id, Name, Elo, Winrate FROM user_data WHERE Name = %s"
+            row = self._execute(query, (name,), fetch="one")
+        return None if row is None else UserProfile(*row)
+
+    def get_leaderboard_rows(self):
+        """
+        Get the ranking data of every user.
+
+        Returns
+        -------
+        List
+            (id, Name, Elo, Winrate, Games_played, Games_won) rows.
+        """
+        query = "SELECT id, Name, Elo, Winrate, Games_played, Games_won FROM user_data"
+        return self._execute(query, fetch="all")
 
     def insert_1v1_game(self, match):
         """
@@ -296,19 +329,81 @@ UNION
     INSERT INTO games_1v1 (player_1_name, player_2_name, player_1_elo, player_2_elo, goals_p1, goals_p2, date)
     VALUES (%s, %s, %s, %s, %s, %s, %s);
     """
-        try:
-            self.cursor.execute(query,
-                                (match.p1.name, match.p2.name, match.p1.elo, match.p2.elo, match.score[0], match.score[1], datetime.now()))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(query,
-                                (match.p1.name, match.p2.name, match.p1.elo, match.p2.elo, match.score[0], match.score[1], datetime.now()))
-        self.connection.commit()
-        self.close_connection_to_db()
+        self._execute(query, (match.p1.name, match.p2.name, match.p1.elo, match.p2.elo,
+                              match.score[0], match.score[1], datetime.now()))
+
+    def record_1v1_match(self, match, p1_new_elo: int, p2_new_elo: int):
+        """
+        Record a finished 1v1 match and its rating changes in one transaction.
+
+        Parameters
+        ----------
+        match : Match1v1
+            The finished match.
+        p1_new_elo : int
+            The new Elo rating of player 1.
+        p2_new_elo : int
+            The new Elo rating of player 2.
+
+        Raises
+        ------
+        TypeError
+            When inputs of incorrect type are provided
+        """
+        if not isinstance(p1_new_elo, int) or not isinstance(p2_new_elo, int):
+            raise TypeError("New elos must be integers.")
+        self.record_1v1_matches([MatchResult.from_match(match, p1_new_elo, p2_new_elo)])
+
+    def record_1v1_matches(self, results):
+        """
+        Record a batch of finished 1v1 matches in one transaction.
+
+        All the game rows go in one multi-row INSERT, then every player of the
+        batch gets one UPDATE adding up his Elo changes and his game counters,
+        the win rate is derived from the counters in the same statement. A
+        failure rolls the whole batch back.
+
+        Parameters
+        ----------
+        results : list
+            The MatchResult of every match.
+        """
+        if not results:
+            return
+        insert = ("INSERT INTO games_1v1 (player_1_name, player_2_name, player_1_elo, player_2_elo, goals_p1, goals_p2, date) VALUES "
+                  + ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(results)))
+        # the right hand sides all read the row before the update
+        update = """
+    UPDATE user_data
+    SET elo = elo + %s, games_played = games_played + %s, games_won = games_won + %s,
+        winrate = (games_won + %s) * 100 / (games_played + %s)
+    WHERE id = %s;
+    """
+        rows = []
+        changes = {}
+        for result in results:
+            rows.extend((result.p1_name, result.p2_name, result.p1_elo, result.p2_elo,
+                         result.goals_p1, result.goals_p2, result.date))
+            for idx, change, won in ((result.p1_id, result.p1_elo_change,
+                                      result.goals_p1 > result.goals_p2),
+                                     (result.p2_id, result.p2_elo_change,
+                                      result.goals_p2 > result.goals_p1)):
+                total_change, played, wins = changes.get(idx, (0, 0, 0))
+                changes[idx] = (total_change + change, played + 1, wins + int(won))
+
+        def write(cursor):
+            # the text depends on the batch size, it is not prepared
+            cursor.execute(insert, rows)
+            for idx, (change, played, wins) in changes.items():
+                self.statements.run(cursor, update, (change, played, wins, wins, played, idx))
+
+        self._transaction(write)
+        for idx in changes:
+            self.profiles.invalidate(idx)
 
     def update_user_winrate(self, idx: int, name: str):
         """
-        Update the win rate of a user.
+        Update the win rate of a user from his game counters.
 
         Parameters
         ----------
@@ -326,23 +421,13 @@ UNION
             raise TypeError("Name must be string")
         if not isinstance(idx, int):
             raise TypeError("Idx must be integer.")
-        query = "UPDATE user_data SET winrate = %s WHERE id = %s"
-
-        # calculate winrate
-        games_won = self.get_user_won_games(name)[0]
-        games_played = self.get_user_games(name)[0]
-
-        winrate = (games_won // games_played) * 100
-
-        try:
-            self.cursor.execute(query,
-                                (winrate, idx,))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(query,
-                                (winrate, idx,))
-        self.connection.commit()
-        self.close_connection_to_db()
+        query = """
+    UPDATE user_data
+    SET winrate = CASE WHEN games_played = 0 THEN 0 ELSE games_won * 100 / games_played END
+    WHERE id = %s
+    """
+        self._execute(query, (idx,))
+        self.profiles.invalidate(idx)
 
     def update_user_elo(self, idx: int, new_elo: int):
         """
@@ -365,15 +450,8 @@ UNION
         if not isinstance(idx, int):
             raise TypeError("Idx must be integer.")
         query = "UPDATE user_data SET elo = %s WHERE id = %s"
-        try:
-            self.cursor.execute(query,
-                                (new_elo, idx, ))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(query,
-                                (new_elo, idx,))
-        self.connection.commit()
-        self.close_connection_to_db()
+        self._execute(query, (new_elo, idx,))
+        self.profiles.invalidate(idx)
 
     def get_history(self, name: str, solo: bool = True):
         """
@@ -389,7 +467,41 @@ UNION
         Returns
         -------
         List
-            A list containing the result of the query.
+            The 10 latest matches, newest first.
+
+        Raises
+        ------
+        TypeError
+            When inputs of incorrect type are provided
+        """
+        return self.get_history_page(name, solo, page_size=10)[0]
+
+    def get_history_page(self, name: str, solo: bool = True, before: tuple = None,
+                         page_size: int = None):
+        """
+        Get one page of the match history of a user, newest first.
+
+        Pages are chained by the (Date, id) of the last match of the previous
+        page, every page is read from the (player, Date, id) indexes the same
+        way, however deep it is.
+
+        Parameters
+        ----------
+        name : str
+            The name of the user.
+        solo : bool, optional
+            True for solo matches, False for team matches. Defaults to True.
+        before : tuple, optional
+            (Date, id) cursor returned with the previous page, None for the
+            latest matches.
+        page_size : int, optional
+            Number of matches, `history_page_size` of the configuration by default.
+
+        Returns
+        -------
+        Tuple
+            The rows of the page and the cursor of the next page, None when
+            there are no older matches.
 
         Raises
         ------
@@ -400,27 +512,30 @@ UNION
             raise TypeError("Name must be string")
         if not isinstance(solo, bool):
             raise TypeError("Solo must be bool.")
+        if before is not None and len(before) != 2:
+            raise TypeError("Before must be a (date, id) pair.")
+        if page_size is None:
+            page_size = self.config["database"]["history_page_size"]
         if solo:
-            query = "SELECT * FROM games_1v1 WHERE Player_1_name = %s OR Player_2_name = %s ORDER BY Date DESC LIMIT 10"
-            try:
-                self.cursor.execute(query,
-                                    (name, name,))
-            except psycopg2.InterfaceError:
-                self.create_new_connection()
-                self.cursor.execute(query,
-                                    (name, name,))
+            players = HISTORY_PLAYERS_1V1
+            table = "games_1v1"
         else:
-            query = "SELECT * FROM games_2v2 WHERE Player_1_name = %s OR Player_2_name = %s OR Player_3_name = %s OR Player_4_name = %s ORDER BY Date DESC LIMIT 10"
-            try:
-                self.cursor.execute(query,
-                                    (name, name, name, name))
-            except psycopg2.InterfaceError:
-                self.create_new_connection()
-                self.cursor.execute(query,
-                                    (name, name, name, name))
-        result = self.cursor.fetchall()
-        self.close_connection_to_db()
-        return result
+            players = HISTORY_PLAYERS_2V2
+            table = "games_2v2"
+        columns = ", ".join(HISTORY_COLUMNS[table])
+        keyset = "" if before is None else " AND (Date, id) < (%s, %s)"
+        # one branch per player column, each reads the latest games from the
+        # (player, date, id) index, one row more tells if there is a next page
+        query = (" UNION ALL ".join(
+            f"SELECT * FROM (SELECT {columns} FROM {table} WHERE {column} = %s{keyset}"
+            f" ORDER BY Date DESC, id DESC LIMIT %s) AS {column.lower()}_games"
+            for column in players) + " ORDER BY Date DESC, id DESC LIMIT %s")
+        branch = (name,) + (tuple(before) if before is not None else ()) + (page_size + 1,)
+        rows = self._execute(query, branch * len(players) + (page_size + 1,), fetch="all")
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, (rows[-1][-1], rows[-1][0])
 
     def query_data(self, query: str = "user_data"):
         """
@@ -444,39 +559,96 @@ UNION
         if not isinstance(query, str):
             raise TypeError("Query must be string")
 
-        try:
-            self.cursor.execute(self.sql_statements.get(query))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(self.sql_statements.get(query))
-        result = self.cursor.fetchall()
-        self.close_connection_to_db()
-        return result
+        return self._execute(self.sql_statements.get(query), fetch="all")
+
+    def _execute(self, query: str, params: tuple = (), fetch: str = None):
+        """
+        Run one statement in its own transaction on a pooled connection.
+
+        The statement is executed through its prepared handle.
+
+        Parameters
+        ----------
+        query : str
+            The SQL statement.
+        params : tuple, optional
+            Parameters of the statement.
+        fetch : str, optional
+            "one" or "all" to return rows, None for statements without result.
+
+        Returns
+        -------
+        Tuple or List or None
+            The fetched rows.
+        """
+        def statement(cursor):
+            self.statements.run(cursor, query, params)
+            if fetch == "one":
+                return cursor.fetchone()
+            if fetch == "all":
+                return cursor.fetchall()
+            return None
+
+        return self._transaction(statement)
+
+    def _transaction(self, work):
+        """
+        Run `work` with a cursor in one transaction on a pooled connection.
+
+        A connection found closed, or whose prepared statements were lost, is
+        replaced or reset and the transaction retried once, the pool commits
+        on success and rolls back on failure.
+
+        Parameters
+        ----------
+        work : callable
+            Called with the cursor, runs the statements of the transaction.
+
+        Returns
+        -------
+        obj any
+            What `work` returned.
+        """
+        for attempt in range(2):
+            try:
+                with self.pool.connection() as connection:
+                    try:
+                        with connection.cursor() as cursor:
+                            return work(cursor)
+                    except PREPARED_STATE_ERRORS:
+                        self.statements.reset(connection)
+                        raise
+            except (psycopg2.InterfaceError,) + PREPARED_STATE_ERRORS:
+                if attempt:
+                    raise
+        return None
 
     def close_connection_to_db(self):
         """
-        Close the connection to the database.
+        Close the connections of the pool.
         """
-        self.cursor.close()
-        self.connection.close()
+        self.pool.close()
 
     def create_new_connection(self):
         """Establishes a new connection to the database
 
+        Returns
+        -------
+        connection
+            The new psycopg2 connection.
+
         Raises
         ------
         ConnectionError
             When failing to connect to database.
         """
         try:
-            self.connection = psycopg2.connect(database=self.database,
-                                               user=self.user, password=self.password,
-                                               host=self.host, port=self.port)
-            # Opening cursor to the database
-            self.cursor = self.connection.cursor()
-        except:
+            return psycopg2.connect(database=self.database,
+                                    user=self.user, password=self.password,
+                                    host=self.host, port=self.port)
+        except psycopg2.Error as error:
             raise ConnectionError(
-                "Failed to connect to the database make sure it is running")
+                "Failed to connect to the database make sure it is running") from error
 
     def allow_user_credentials(self, username: str, password: str):
         """
@@ -504,26 +676,51 @@ UNION
         if username == "" or password == "":
             return "Make sure to fill both name and password"
 
-        # Execute a query to retrieve user credentials
-        try:
-            self.cursor.execute(
-                "SELECT Name, Password FROM user_data WHERE Name = %s", (username,))
-        except psycopg2.InterfaceError:
-            self.create_new_connection()
-            self.cursor.execute(
-                "SELECT Name, Password FROM user_data WHERE Name = %s", (username,))
-        user_data = self.cursor.fetchone()
-        if user_data is not None and user_data[1] == password:
-            # The username is present and the password is correct ->client will be linked to that existing account
-            self.close_connection_to_db()
-            return "known user"
-        if user_data is not None and user_data[1] != password:
-            # existing username but wrong password
-            self.close_connection_to_db()
-            return "Incorrect password for this username"
-        # Creating new user in the database and inserting him into the database
-        self.cursor.execute("INSERT INTO user_data (Name, Password, Elo, Winrate, Skin) VALUES(%s, %s, %s, %s, %s)",
-                            (username, password, 1000, 0, "Skin1"))
-        self.connection.commit()
-        self.close_connection_to_db()
-        return "registering new user"
+        # Retrieve the credentials and register a new user in one transaction
+        def log_in(cursor):
+            self.statements.run(
+                cursor, "SELECT Name, Password FROM user_data WHERE Name = %s", (username,))
+            user_data = cursor.fetchone()
+            if user_data is not None and user_data[1] == password:
+                # The username is present and the password is correct ->client will be linked to that existing account
+                return "known user"
+            if user_data is not None and user_data[1] != password:
+                # existing username but wrong password
+                return "Incorrect password for this username"
+            # Creating new user in the database and inserting him into the database,
+            # with the same starting elo the leaderboard gives him
+            self.statements.run(
+                cursor, "INSERT INTO user_data (Name, Password, Elo, Winrate, Skin) VALUES(%s, %s, %s, %s, %s)",
+                (username, password, self.config["elo"]["default_elo"], 0, "Skin1"))
+            return "registering new user"
+
+        return self._transaction(log_in)
+
+
+def create_db_query(config: Dict):
+    """
+    Open the database access of the configured backend.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration settings, `database.backend` is "postgres" or "sqlite".
+
+    Returns
+    -------
+    DBQuery
+        A DBQuery, or a SQLiteQuery for the sqlite backend.
+
+    Raises
+    ------
+    ValueError
+        When the backend is unknown.
+    """
+    backend = config["database"]["backend"]
+    if backend == "sqlite":
+        # pylint: disable=import-outside-toplevel, cyclic-import
+        from database.sqlite_query import SQLiteQuery
+        return SQLiteQuery(config)
+    if backend == "postgres":
+        return DBQuery(config)
+    raise ValueError(f"Unknown database backend {backend}")
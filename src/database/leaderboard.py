@@ -0,0 +1,432 @@
+"""
+Leaderboard Module
+------------------
+
+Provides the Leaderboard class answering the ranked menu requests from memory.
+The players are counted per Elo in a Fenwick tree over the SMALLINT range of
+the Elo column, so the rank of a player and the Elo of the n-th best player
+take O(log n) steps, and the players of one Elo are kept together so the top
+of the table is read without sorting everyone. The finished matches update it
+as they are recorded and a periodic reload reconciles it with the database.
+"""
+import threading
+from contextlib import contextmanager
+
+ELO_MIN = -32768
+ELO_MAX = 32767
+
+
+class FenwickTree:
+    """
+    Counts of players per Elo supporting prefix sums and order statistics.
+
+    Parameters
+    ----------
+    size : int
+        Number of counted values, indexed from 0.
+
+    Methods
+    -------
+    add(index, amount)
+        Changes the count of a value.
+    prefix(index) -> int
+        Sum of the counts of the values up to and including `index`.
+    find(rank) -> int
+        Smallest value whose prefix sum reaches `rank`.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.step = 1 << (size.bit_length() - 1)
+
+    def add(self, index, amount):
+        """Change the count of a value."""
+        index += 1
+        while index <= self.size:
+            self.tree[index] += amount
+            index += index & -index
+
+    def prefix(self, index):
+        """Sum of the counts of the values up to and including `index`."""
+        total = 0
+        index += 1
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, rank):
+        """Smallest value whose prefix sum reaches `rank`, rank counts from 1."""
+        position = 0
+        step = self.step
+        while step:
+            following = position + step
+            if following <= self.size and self.tree[following] < rank:
+                position = following
+                rank -= self.tree[following]
+            step >>= 1
+        return position
+
+
+# pylint: disable=too-few-public-methods
+class LeaderboardEntry:
+    """
+    What the leaderboard knows about one player.
+
+    Attributes
+    ----------
+    player_id : int
+        Id of the player.
+    name : str
+        Name of the player.
+    elo : int
+        Elo rating of the player.
+    winrate : int
+        Win rate of the player in percent.
+    games_played : int
+        Number of 1v1 games played.
+    games_won : int
+        Number of 1v1 games won.
+    """
+    __slots__ = ("player_id", "name", "elo", "winrate", "games_played", "games_won")
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, player_id, name, elo, winrate, games_played, games_won):
+        self.player_id = player_id
+        self.name = name
+        self.elo = elo
+        self.winrate = winrate
+        self.games_played = games_played
+        self.games_won = games_won
+
+
+# pylint: disable=too-many-instance-attributes
+class Leaderboard:
+    """
+    In-memory ranking of all the players.
+
+    Results are applied when the match ends, before the background writer
+    stores them, and stay in a list of unwritten results until the writer
+    confirms them. The writer commits every batch inside `writing`, a reload
+    waits for the batch being committed and holds the next one back while it
+    reads the rows, so every result is either in the rows or still unwritten
+    and replayed on top of them, never both.
+
+    Attributes
+    ----------
+    db_query : DBQuery
+        Database access used to reload the table.
+    reconcile_interval : float
+        Seconds between two reloads.
+    size : int
+        Number of players of the challenger table.
+    running : bool
+        Flag keeping the loop in `run` alive.
+
+    Parameters
+    ----------
+    db_query : DBQuery
+        Database access used to reload the table.
+    config : dict
+        Configuration settings, reads the leaderboard section.
+
+    Methods
+    -------
+    reload()
+        Rebuilds the table from the database.
+    add_player(player_id, name, elo)
+        Ranks a newly registered player.
+    record_result(result)
+        Applies the rating changes of a finished match.
+    writing(results)
+        Context manager around the commit of a batch of results.
+    confirm_written(results)
+        Marks results as stored by the database.
+    profile(name) -> LeaderboardEntry or None
+        The entry of a player.
+    rank(player_id) -> int or None
+        Position of a player, 1 for the best one.
+    elo_at(position) -> int or None
+        Elo of the player at a position.
+    top(count) -> list
+        Name, win rate and Elo of the best players.
+    top_elo() -> list
+        The 100th best and the lowest Elo, like the top_elo query.
+    run()
+        Reloads the table periodically until `stop` is called.
+    stop()
+        Ends the reload loop.
+    """
+
+    def __init__(self, db_query, config):
+        self.db_query = db_query
+        self.reconcile_interval = config["leaderboard"]["reconcile_interval"]
+        self.size = config["leaderboard"]["size"]
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._counts = FenwickTree(ELO_MAX - ELO_MIN + 1)
+        self._entries = {}
+        self._names = {}
+        self._by_elo = {}
+        self._unwritten = {}
+        self._batches_writing = 0
+        self._reading = False
+        self._stopping = threading.Event()
+        self.running = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _insert(self, entry):
+        """Add an entry to the indexes, called with the lock held."""
+        entry.elo = min(max(entry.elo, ELO_MIN), ELO_MAX)
+        self._entries[entry.player_id] = entry
+        self._names[entry.name] = entry
+        self._by_elo.setdefault(entry.elo, {})[entry.player_id] = entry
+        self._counts.add(entry.elo - ELO_MIN, 1)
+
+    def _remove(self, entry):
+        """Remove an entry from the indexes, called with the lock held."""
+        bucket = self._by_elo[entry.elo]
+        del bucket[entry.player_id]
+        if not bucket:
+            del self._by_elo[entry.elo]
+        self._counts.add(entry.elo - ELO_MIN, -1)
+
+    def _apply(self, result):
+        """Apply the changes of one result, called with the lock held."""
+        for player_id, change, won in (
+                (result.p1_id, result.p1_elo_change, result.goals_p1 > result.goals_p2),
+                (result.p2_id, result.p2_elo_change, result.goals_p2 > result.goals_p1)):
+            entry = self._entries.get(player_id)
+            if entry is None:
+                # not loaded yet, the next reload brings the player in
+                continue
+            self._remove(entry)
+            entry.elo += change
+            entry.games_played += 1
+            entry.games_won += int(won)
+            entry.winrate = entry.games_won * 100 // entry.games_played
+            self._insert(entry)
+
+    def reload(self):
+        """
+        Rebuild the table from the database rows.
+
+        Waits until the batch being committed is confirmed and keeps the next
+        batch waiting until the rows are read, the results still unwritten
+        are then exactly the ones missing from the rows.
+        """
+        with self._lock:
+            self._reading = True
+            while self._batches_writing:
+                self._idle.wait()
+        try:
+            rows = self.db_query.get_leaderboard_rows()
+            with self._lock:
+                self._counts = FenwickTree(ELO_MAX - ELO_MIN + 1)
+                self._entries = {}
+                self._names = {}
+                self._by_elo = {}
+                for player_id, name, elo, winrate, games_played, games_won in rows:
+                    self._insert(LeaderboardEntry(player_id, name, elo or 0, winrate or 0,
+                                                  games_played or 0, games_won or 0))
+                for result in self._unwritten.values():
+                    self._apply(result)
+        finally:
+            with self._lock:
+                self._reading = False
+                self._idle.notify_all()
+
+    def add_player(self, player_id, name, elo):
+        """
+        Rank a newly registered player, known players are left as they are.
+
+        Parameters
+        ----------
+        player_id : int
+            Id of the player.
+        name : str
+            Name of the player.
+        elo : int
+            Starting Elo rating.
+        """
+        with self._lock:
+            if player_id not in self._entries:
+                self._insert(LeaderboardEntry(player_id, name, elo, 0, 0, 0))
+
+    def record_result(self, result):
+        """
+        Apply the rating changes of a finished match.
+
+        Parameters
+        ----------
+        result : MatchResult
+            The result handed to the background writer.
+        """
+        with self._lock:
+            self._unwritten[id(result)] = result
+            self._apply(result)
+
+    @contextmanager
+    def writing(self, results):
+        """
+        Context manager around the commit of a batch of results.
+
+        Entering waits while a reload reads the rows, leaving without an
+        error confirms the results as written.
+
+        Parameters
+        ----------
+        results : list
+            The MatchResult batch the writer commits.
+        """
+        with self._lock:
+            while self._reading:
+                self._idle.wait()
+            self._batches_writing += 1
+        try:
+            yield
+            self.confirm_written(results)
+        finally:
+            with self._lock:
+                self._batches_writing -= 1
+                self._idle.notify_all()
+
+    def confirm_written(self, results):
+        """
+        Mark results as stored by the database.
+
+        Parameters
+        ----------
+        results : list
+            The MatchResult batch the writer just committed.
+        """
+        with self._lock:
+            for result in results:
+                self._unwritten.pop(id(result), None)
+
+    def profile(self, name):
+        """
+        The entry of a player.
+
+        Parameters
+        ----------
+        name : str
+            Name of the player.
+
+        Returns
+        -------
+        LeaderboardEntry or None
+            None if the player is not loaded yet.
+        """
+        return self._names.get(name)
+
+    def rank(self, player_id):
+        """
+        Position of a player, 1 for the best one, ties share the position.
+
+        Parameters
+        ----------
+        player_id : int
+            Id of the player.
+
+        Returns
+        -------
+        int or None
+            The rank, None if the player is not loaded yet.
+        """
+        with self._lock:
+            entry = self._entries.get(player_id)
+            if entry is None:
+                return None
+            return len(self._entries) - self._counts.prefix(entry.elo - ELO_MIN) + 1
+
+    def _elo_at(self, position):
+        """Elo of the player at a position, called with the lock held."""
+        return self._counts.find(len(self._entries) - position + 1) + ELO_MIN
+
+    def elo_at(self, position):
+        """
+        Elo of the player at a position.
+
+        Parameters
+        ----------
+        position : int
+            Position counted from 1 for the best player.
+
+        Returns
+        -------
+        int or None
+            The Elo, None if fewer players are ranked.
+        """
+        with self._lock:
+            if not 1 <= position <= len(self._entries):
+                return None
+            return self._elo_at(position)
+
+    def top(self, count=None):
+        """
+        Name, win rate and Elo of the best players, like get_challengers.
+
+        Parameters
+        ----------
+        count : int, optional
+            Number of players, the challenger table size by default.
+
+        Returns
+        -------
+        list
+            (name, winrate, elo) tuples, best first.
+        """
+        if count is None:
+            count = self.size
+        rows = []
+        with self._lock:
+            taken = 0
+            while len(rows) < count and taken < len(self._entries):
+                bucket = self._by_elo[self._elo_at(taken + 1)]
+                for entry in sorted(bucket.values(), key=lambda entry: entry.name):
+                    if len(rows) == count:
+                        break
+                    rows.append((entry.name, entry.winrate, entry.elo))
+                taken += len(bucket)
+        return rows
+
+    def top_elo(self):
+        """
+        The Elo of the player at the last challenger position and the lowest
+        Elo, in the shape of the top_elo query.
+
+        Returns
+        -------
+        list
+            One tuple per distinct value.
+        """
+        with self._lock:
+            if not self._entries:
+                return []
+            lowest = self._elo_at(len(self._entries))
+            if len(self._entries) < self.size:
+                return [(lowest,)]
+            threshold = self._elo_at(self.size)
+        return [(threshold,)] if threshold == lowest else [(threshold,), (lowest,)]
+
+    def run(self):
+        """
+        Reload the table every `reconcile_interval` seconds until `stop` is called.
+        """
+        self.running = True
+        while not self._stopping.wait(self.reconcile_interval):
+            try:
+                self.reload()
+            except Exception as error:  # pylint: disable=broad-except
+                print(f"Leaderboard reload failed: {error}")
+        self.running = False
+
+    def stop(self):
+        """
+        End the reload loop.
+        """
+        self._stopping.set()
@@ -0,0 +1,143 @@
+"""
+Migrations Module
+-----------------
+
+Provides the MigrationRunner class bringing the database schema up to date.
+Migrations are the SQL files of the migrations directory named
+`<version>_<name>.sql`, they are applied in version order, each in its own
+transaction together with its row in the schema_migrations table, so every
+migration is applied exactly once.
+
+Run from the src directory to migrate the configured database:
+    python -m database.migrations
+"""
+import os
+import re
+
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+class MigrationRunner:
+    """
+    Applies the pending schema migrations.
+
+    Attributes
+    ----------
+    pool : ConnectionPool
+        Pool giving the connections the migrations run on.
+    path : str
+        Directory holding the migration files.
+
+    Parameters
+    ----------
+    pool : ConnectionPool
+        Pool giving the connections the migrations run on.
+    path : str
+        Directory holding the migration files.
+
+    Methods
+    -------
+    available() -> list
+        Every migration file with its version and name.
+    applied() -> set
+        Versions already applied to the database.
+    pending() -> list
+        Migrations not applied yet, in version order.
+    migrate() -> list
+        Applies the pending migrations.
+    """
+
+    def __init__(self, pool, path):
+        self.pool = pool
+        self.path = path
+
+    def available(self):
+        """
+        Every migration file with its version and name.
+
+        Returns
+        -------
+        list
+            (version, name, file path) tuples in version order.
+
+        Raises
+        ------
+        ValueError
+            If two files share a version.
+        """
+        migrations = {}
+        for file_name in sorted(os.listdir(self.path)):
+            match = MIGRATION_FILE.match(file_name)
+            if match is None:
+                continue
+            version = int(match.group(1))
+            if version in migrations:
+                raise ValueError(f"Duplicate migration version {version}")
+            migrations[version] = (version, match.group(2), os.path.join(self.path, file_name))
+        return [migrations[version] for version in sorted(migrations)]
+
+    def applied(self):
+        """
+        Versions already applied to the database.
+
+        Returns
+        -------
+        set
+            The applied versions, the bookkeeping table is created if needed.
+        """
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )""")
+                cursor.execute("SELECT version FROM schema_migrations")
+                return {row[0] for row in cursor.fetchall()}
+
+    def pending(self):
+        """
+        Migrations not applied yet.
+
+        Returns
+        -------
+        list
+            (version, name, file path) tuples in version order.
+        """
+        applied = self.applied()
+        return [migration for migration in self.available() if migration[0] not in applied]
+
+    def migrate(self):
+        """
+        Apply the pending migrations, each in its own transaction.
+
+        Returns
+        -------
+        list
+            Versions applied by this call.
+        """
+        done = []
+        for version, name, file_path in self.pending():
+            with open(file_path, encoding="utf-8") as migration:
+                statements = migration.read()
+            with self.pool.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(statements)
+                    cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                                   (version, name))
+            print(f"Applied migration {version:04d} {name}")
+            done.append(version)
+        return done
+
+
+if __name__ == "__main__":
+    # pylint: disable=ungrouped-imports
+    from configuration_mod import Config
+    from database.database_query import create_db_query
+
+    CONFIG = Config().config
+    DB_QUERY = create_db_query(CONFIG)
+    APPLIED = MigrationRunner(DB_QUERY.pool, DB_QUERY.migrations_path).migrate()
+    print(f"{len(APPLIED)} migrations applied")
+    DB_QUERY.close_connection_to_db()
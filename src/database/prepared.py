@@ -0,0 +1,108 @@
+"""
+Prepared Statements Module
+--------------------------
+
+Provides the PreparedStatements class running the DBQuery statements as
+server-side prepared statements. Every statement text gets a name the first
+time it is used, it is prepared once on each pooled connection and then only
+executed by that name with its parameters, so Postgres skips parsing and
+planning it again.
+"""
+import re
+import threading
+import weakref
+
+PLACEHOLDER = re.compile(r"%s")
+
+
+class PreparedStatements:
+    """
+    Names of the prepared statements and what each connection has prepared.
+
+    The connections are tracked weakly, a connection replaced by the pool
+    starts with nothing prepared. A connection whose prepared statements no
+    longer match the bookkeeping, e.g. after a `DISCARD ALL`, is reset with
+    `DEALLOCATE ALL` before its next statement.
+
+    Attributes
+    ----------
+    prepares : int
+        Number of PREPARE statements sent.
+
+    Methods
+    -------
+    run(cursor, query, params=())
+        Executes a statement through its prepared handle.
+    reset(connection)
+        Forgets what a connection has prepared.
+    """
+
+    def __init__(self):
+        self.prepares = 0
+        self._statements = {}
+        self._prepared = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _statement(self, query):
+        """Name, PREPARE and EXECUTE texts of a statement."""
+        with self._lock:
+            statement = self._statements.get(query)
+            if statement is None:
+                name = f"novaglide_{len(self._statements) + 1}"
+                count = len(PLACEHOLDER.findall(query))
+                numbers = iter(range(1, count + 1))
+                body = PLACEHOLDER.sub(lambda _: f"${next(numbers)}", query.strip().rstrip(";"))
+                execute = f"EXECUTE {name}"
+                if count:
+                    execute += " (" + ", ".join(["%s"] * count) + ")"
+                statement = (name, f"PREPARE {name} AS {body}", execute)
+                self._statements[query] = statement
+        return statement
+
+    def _connection_statements(self, cursor):
+        """Names prepared on the connection of a cursor, resetting it if needed."""
+        connection = cursor.connection
+        with self._lock:
+            prepared = self._prepared.get(connection)
+            # reset() marks a connection in an unknown state with None
+            stale = prepared is None and connection in self._prepared
+            if prepared is None:
+                prepared = self._prepared[connection] = set()
+        if stale:
+            cursor.execute("DEALLOCATE ALL")
+        return prepared
+
+    def run(self, cursor, query, params=()):
+        """
+        Execute a statement through its prepared handle, preparing it on the
+        connection of the cursor first if needed.
+
+        Parameters
+        ----------
+        cursor : cursor
+            Cursor of a pooled connection.
+        query : str
+            The SQL statement with %s placeholders.
+        params : tuple, optional
+            Parameters of the statement.
+        """
+        name, prepare, execute = self._statement(query)
+        prepared = self._connection_statements(cursor)
+        if name not in prepared:
+            cursor.execute(prepare)
+            self.prepares += 1
+            prepared.add(name)
+        cursor.execute(execute, params)
+
+    def reset(self, connection):
+        """
+        Forget what a connection has prepared, its statements are deallocated
+        and prepared again on the next use.
+
+        Parameters
+        ----------
+        connection : connection
+            The connection whose statement failed.
+        """
+        with self._lock:
+            self._prepared[connection] = None
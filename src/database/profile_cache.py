@@ -0,0 +1,177 @@
+"""
+Profile Cache Module
+--------------------
+
+Provides the ProfileCache class keeping the id, name, Elo and win rate of the
+recently used players in memory. A profile is read with one query the first
+time any of its fields is needed, further lookups by id or by name are served
+from the cache until a rating write invalidates it.
+"""
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class UserProfile(NamedTuple):
+    """
+    The fields of user_data read together by the cache.
+    """
+    player_id: int
+    name: str
+    elo: int
+    winrate: int
+
+
+# pylint: disable=too-many-instance-attributes
+class ProfileCache:
+    """
+    Bounded least recently used cache of user profiles, keyed by id and name.
+
+    Unknown users are not cached, so a user registered later is found by the
+    next lookup. An invalidation during a load keeps the loaded profile out of
+    the cache, the value read may predate the write.
+
+    Attributes
+    ----------
+    capacity : int
+        Most profiles kept, the least recently used one is dropped first.
+    hits : int
+        Lookups served from the cache.
+    misses : int
+        Lookups that read the database.
+
+    Parameters
+    ----------
+    load : callable
+        Reads one profile, called with `player_id` or `name` as keyword and
+        returning a UserProfile or None.
+    capacity : int
+        Most profiles kept.
+
+    Methods
+    -------
+    by_id(player_id) -> UserProfile or None
+        The profile of a user id.
+    by_name(name) -> UserProfile or None
+        The profile of a user name.
+    invalidate(player_id)
+        Drops the profile of a user after a write.
+    clear()
+        Drops every profile.
+    """
+
+    def __init__(self, load, capacity):
+        self.load = load
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._profiles = OrderedDict()
+        self._ids = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._profiles)
+
+    @property
+    def hit_rate(self):
+        """Share of the lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _cached(self, player_id):
+        """Return a cached profile and mark it used, called with the lock held."""
+        profile = self._profiles.get(player_id)
+        if profile is not None:
+            self._profiles.move_to_end(player_id)
+            self.hits += 1
+        return profile
+
+    def _fetch(self, **key):
+        """Load a profile and cache it unless invalidated meanwhile."""
+        with self._lock:
+            self.misses += 1
+            generation = self._generation
+        profile = self.load(**key)
+        if profile is None:
+            return None
+        with self._lock:
+            if generation == self._generation:
+                self._store(profile)
+        return profile
+
+    def _store(self, profile):
+        """Cache a profile, called with the lock held."""
+        previous = self._profiles.pop(profile.player_id, None)
+        if previous is not None:
+            self._ids.pop(previous.name, None)
+        self._profiles[profile.player_id] = profile
+        self._ids[profile.name] = profile.player_id
+        while len(self._profiles) > self.capacity:
+            _, dropped = self._profiles.popitem(last=False)
+            self._ids.pop(dropped.name, None)
+
+    def by_id(self, player_id):
+        """
+        The profile of a user id.
+
+        Parameters
+        ----------
+        player_id : int
+            The ID of the user.
+
+        Returns
+        -------
+        UserProfile or None
+            None if there is no such user.
+        """
+        with self._lock:
+            profile = self._cached(player_id)
+        if profile is not None:
+            return profile
+        return self._fetch(player_id=player_id)
+
+    def by_name(self, name):
+        """
+        The profile of a user name.
+
+        Parameters
+        ----------
+        name : str
+            The name of the user.
+
+        Returns
+        -------
+        UserProfile or None
+            None if there is no such user.
+        """
+        with self._lock:
+            player_id = self._ids.get(name)
+            profile = None if player_id is None else self._cached(player_id)
+        if profile is not None:
+            return profile
+        return self._fetch(name=name)
+
+    def invalidate(self, player_id):
+        """
+        Drop the profile of a user, called after his rating was written.
+
+        Parameters
+        ----------
+        player_id : int
+            The ID of the user.
+        """
+        with self._lock:
+            self._generation += 1
+            profile = self._profiles.pop(player_id, None)
+            if profile is not None:
+                self._ids.pop(profile.name, None)
+
+    def clear(self):
+        """
+        Drop every profile.
+        """
+        with self._lock:
+            self._generation += 1
+            self._profiles.clear()
+            self._ids.clear()
@@ -0,0 +1,273 @@
+"""
+Result Writer Module
+--------------------
+
+Provides the MatchResultWriter class recording finished matches in the
+background. The network threads only put the result of a match on a bounded
+queue, a writer thread drains it in batches into the database, retries failed
+batches, splits the ones that keep failing and keeps the unwritten results in
+a spill file over a shutdown.
+"""
+import json
+import os
+import queue
+import threading
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+from typing import NamedTuple
+
+
+class MatchResult(NamedTuple):
+    """
+    Everything needed to record a finished 1v1 match.
+
+    The ratings are stored as changes, so results written late still add up
+    with the other matches of the same players.
+    """
+    p1_id: int
+    p2_id: int
+    p1_name: str
+    p2_name: str
+    p1_elo: int
+    p2_elo: int
+    goals_p1: int
+    goals_p2: int
+    date: datetime
+    p1_elo_change: int
+    p2_elo_change: int
+
+    @classmethod
+    def from_match(cls, match, p1_new_elo, p2_new_elo):
+        """
+        Build the result of a finished match.
+
+        Parameters
+        ----------
+        match : Match1v1 or RemoteMatch
+            The finished match.
+        p1_new_elo : int
+            The new Elo rating of player 1.
+        p2_new_elo : int
+            The new Elo rating of player 2.
+
+        Returns
+        -------
+        MatchResult
+            The result, dated now.
+        """
+        return cls(int(match.p1_id), int(match.p2_id), match.p1.name, match.p2.name,
+                   match.p1.elo, match.p2.elo, match.score[0], match.score[1],
+                   datetime.now(), p1_new_elo - match.p1.elo, p2_new_elo - match.p2.elo)
+
+    def to_json(self):
+        """The result as one line of the spill file."""
+        fields = dict(zip(MatchResult.__annotations__, self))
+        fields["date"] = self.date.isoformat()
+        return json.dumps(fields)
+
+    @classmethod
+    def from_json(cls, line):
+        """A result read back from the spill file."""
+        fields = json.loads(line)
+        fields["date"] = datetime.fromisoformat(fields["date"])
+        return cls(**fields)
+
+
+# pylint: disable=too-many-instance-attributes
+class MatchResultWriter:
+    """
+    Background writer of the finished matches.
+
+    `submit` only blocks when `queue_size` results are already waiting. A
+    batch that fails is retried with a doubling delay, after `max_attempts`
+    failures it is split in halves so the results that can be written are,
+    and a single result failing as often is moved to the spill file. Results
+    still unwritten when the writer stops are appended to the spill file and
+    written by the next writer before its queue.
+
+    Attributes
+    ----------
+    db_query : DBQuery
+        Database access used to write the batches.
+    batch_size : int
+        Most results written in one transaction.
+    retry_delay : float
+        Seconds before the first retry of a failed batch.
+    max_retry_delay : float
+        Longest wait between two retries.
+    max_attempts : int
+        Failures of a batch before it is split or, for a single result, spilled.
+    spill_path : str
+        File keeping the unwritten results over a shutdown.
+    written : int
+        Number of results written so far.
+    failed_attempts : int
+        Number of batches that failed to be written.
+    rejected : int
+        Number of results moved to the spill file after `max_attempts` failures.
+    write_guard : callable or None
+        Called with every batch, returns the context manager its commit runs
+        in, leaving it without an error means the batch is written.
+
+    Parameters
+    ----------
+    db_query : DBQuery
+        Database access used to write the batches.
+    config : dict
+        Configuration settings, reads the database section.
+    write_guard : callable, optional
+        Called with every batch, returns the context manager its commit runs
+        in. None by default.
+
+    Methods
+    -------
+    submit(result: MatchResult)
+        Queues the result of a finished match.
+    run()
+        Writes the queued results until `stop` is called.
+    start()
+        Runs the writer in a background thread.
+    stop()
+        Writes or spills everything queued and ends the writer.
+    """
+
+    def __init__(self, db_query, config, write_guard=None):
+        self.db_query = db_query
+        self.write_guard = write_guard
+        settings = config["database"]
+        self.batch_size = settings["write_batch_size"]
+        self.retry_delay = settings["write_retry_delay"]
+        self.max_retry_delay = settings["write_max_retry_delay"]
+        self.max_attempts = settings["write_max_attempts"]
+        self.spill_path = settings["write_spill_path"]
+        self.queue = queue.Queue(maxsize=settings["write_queue_size"])
+        self.written = 0
+        self.failed_attempts = 0
+        self.rejected = 0
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def queue_depth(self):
+        """Number of results waiting to be written."""
+        return self.queue.qsize()
+
+    def submit(self, result):
+        """
+        Queue the result of a finished match.
+
+        Parameters
+        ----------
+        result : MatchResult
+            The result to be written.
+        """
+        self.queue.put(result)
+
+    def _next_batch(self):
+        """Wait for a first result and take the ones queued behind it."""
+        try:
+            batch = [self.queue.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        """
+        Write the spilled and the queued results until `stop` is called, then
+        spill the rest.
+        """
+        batches = deque(self._load_spill())
+        attempts = 0
+        delay = self.retry_delay
+        while not self._stopping.is_set() or batches or not self.queue.empty():
+            if not batches:
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                batches.append(batch)
+            batch = batches[0]
+            try:
+                with self._guard(batch):
+                    self.db_query.record_1v1_matches(batch)
+            except Exception as error:  # pylint: disable=broad-except
+                self.failed_attempts += 1
+                attempts += 1
+                print(f"Writing {len(batch)} match results failed: {error}")
+                if attempts >= self.max_attempts:
+                    batches.popleft()
+                    self._reject(batch, batches)
+                    attempts = 0
+                    delay = self.retry_delay
+                    continue
+                if self._stopping.wait(delay):
+                    break
+                delay = min(delay * 2, self.max_retry_delay)
+                continue
+            self.written += len(batch)
+            batches.popleft()
+            attempts = 0
+            delay = self.retry_delay
+        unwritten = [result for batch in batches for result in batch]
+        while not self.queue.empty():
+            unwritten.append(self.queue.get_nowait())
+        self._spill(unwritten)
+
+    def _reject(self, batch, batches):
+        """Split a batch that keeps failing, spill it if it is a single result."""
+        if len(batch) == 1:
+            self.rejected += 1
+            self._spill(batch)
+            return
+        half = len(batch) // 2
+        batches.extendleft((batch[half:], batch[:half]))
+
+    def _guard(self, batch):
+        """Context manager the commit of a batch runs in."""
+        if self.write_guard is None:
+            return nullcontext()
+        return self.write_guard(batch)
+
+    def start(self):
+        """
+        Run the writer in a background thread.
+        """
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Write everything queued and end the writer. When the database still
+        fails the remaining results go to the spill file.
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _spill(self, results):
+        """Append unwritten results to the spill file."""
+        if not results:
+            return
+        with open(self.spill_path, "a", encoding="utf-8") as spill:
+            for result in results:
+                spill.write(result.to_json() + "\n")
+        print(f"{len(results)} match results kept in {self.spill_path}")
+
+    def _load_spill(self):
+        """
+        The results a previous writer could not write, in batches. They are
+        handed to the writer thread directly, the bounded queue could not
+        hold them all.
+        """
+        if not os.path.exists(self.spill_path):
+            return []
+        with open(self.spill_path, encoding="utf-8") as spill:
+            results = [MatchResult.from_json(line) for line in spill if line.strip()]
+        os.remove(self.spill_path)
+        return [results[start:start + self.batch_size]
+                for start in range(0, len(results), self.batch_size)]
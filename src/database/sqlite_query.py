@@ -0,0 +1,207 @@
+"""
+SQLite Query Module
+-------------------
+
+Provides the SQLiteQuery class, the DBQuery API on an embedded SQLite database
+file. It needs no database server, which suits single node deployments and
+tests. The database runs in WAL mode so the pooled connections read while one
+of them writes, its schema comes from the migrations of data/sqlite_migrations.
+"""
+import sqlite3
+from datetime import datetime
+
+from database.database_query import DBQuery
+
+# dates are stored as ISO text, which sorts like the dates themselves
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+
+
+def split_statements(script):
+    """
+    Split an SQL script into its statements.
+
+    Parameters
+    ----------
+    script : str
+        Statements separated by semicolons, semicolons of literals and
+        comments are kept.
+
+    Returns
+    -------
+    list
+        The statements holding more than whitespace.
+    """
+    statements = []
+    current = ""
+    for piece in script.split(";"):
+        current += piece + ";"
+        if sqlite3.complete_statement(current):
+            if current.strip(" \t\r\n;"):
+                statements.append(current)
+            current = ""
+    return statements
+
+
+class SQLiteCursor:
+    """
+    Cursor taking the %s placeholders of the DBQuery statements.
+
+    A statement without parameters may be a script of several statements,
+    they all run in the transaction of the connection.
+
+    Attributes
+    ----------
+    connection : SQLiteConnection
+        The connection of the cursor.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def description(self):
+        """Columns of the last result, None for statements without result."""
+        return self._cursor.description
+
+    def execute(self, query, params=()):
+        """Run a statement, or every statement of a script without parameters."""
+        self.connection.begin()
+        statements = split_statements(query) if not params else [query]
+        for statement in statements:
+            self._cursor.execute(statement.replace("%s", "?"), tuple(params))
+
+    def fetchone(self):
+        """Next row of the result."""
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        """Remaining rows of the result."""
+        return self._cursor.fetchall()
+
+    def close(self):
+        """Close the cursor."""
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Connection to the database file with the transactions of psycopg2.
+
+    A transaction starts with the first statement and lasts until `commit` or
+    `rollback`, schema changes included, so a migration is applied together
+    with its bookkeeping row.
+
+    Attributes
+    ----------
+    raw : sqlite3.Connection
+        The wrapped connection, in autocommit mode.
+    closed : bool
+        Whether the connection was closed.
+
+    Parameters
+    ----------
+    path : str
+        The database file.
+    timeout : float
+        Seconds a write waits for the lock of another connection.
+    """
+
+    def __init__(self, path, timeout):
+        self.raw = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                   check_same_thread=False,
+                                   detect_types=sqlite3.PARSE_DECLTYPES)
+        self.raw.execute("PRAGMA journal_mode=WAL")
+        self.raw.execute("PRAGMA synchronous=NORMAL")
+        self.closed = False
+
+    def begin(self):
+        """Start a transaction unless one is open."""
+        if not self.raw.in_transaction:
+            self.raw.execute("BEGIN")
+
+    def cursor(self):
+        """A new cursor."""
+        return SQLiteCursor(self)
+
+    def commit(self):
+        """Commit the open transaction."""
+        if self.raw.in_transaction:
+            self.raw.execute("COMMIT")
+
+    def rollback(self):
+        """Roll the open transaction back."""
+        if self.raw.in_transaction:
+            self.raw.execute("ROLLBACK")
+
+    def close(self):
+        """Close the connection."""
+        self.closed = True
+        self.raw.close()
+
+
+class CachedStatements:
+    """
+    Runs the statements as they are, sqlite3 keeps the compiled statements of
+    every connection in its own cache.
+
+    Methods
+    -------
+    run(cursor, query, params=())
+        Executes a statement.
+    reset(connection)
+        Does nothing, there is no bookkeeping to lose.
+    """
+
+    @staticmethod
+    def run(cursor, query, params=()):
+        """Execute a statement."""
+        cursor.execute(query, params)
+
+    @staticmethod
+    def reset(connection):
+        """Nothing to forget."""
+
+
+class SQLiteQuery(DBQuery):
+    """
+    The DBQuery API on an embedded SQLite database file.
+
+    Attributes
+    ----------
+    path : str
+        The database file.
+    busy_timeout : float
+        Seconds a write waits for the lock of another connection.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration settings, reads the database section.
+    """
+    broken_errors = (sqlite3.InterfaceError,)
+    statements_class = CachedStatements
+
+    def __init__(self, config):
+        self.path = config["database"]["sqlite_path"]
+        self.busy_timeout = config["database"]["sqlite_busy_timeout"]
+        super().__init__(config)
+        self.migrations_path = config["database"]["sqlite_migrations_path"]
+
+    def create_new_connection(self):
+        """
+        Open a connection to the database file.
+
+        Returns
+        -------
+        SQLiteConnection
+            The new connection.
+        """
+        return SQLiteConnection(self.path, self.busy_timeout)
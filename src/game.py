@@ -10,10 +10,14 @@ import datetime
 import pygame
 import pygame.locals
 import utilities
+from assets import ASSETS
+from renderer import MatchRenderer
 from networking.network import Network
+from networking.match_link import MatchLink
 
 from game_objects.player import Player
 from game_objects.ball import Ball
+from game_objects.prediction import LocalPrediction
 
 from menu.menu import (
     MainMenu,
@@ -75,6 +79,10 @@ class Game():
         Width of the game border.
     border : pygame.Rect
         Rect object representing the game border.
+    renderer : MatchRenderer
+        Layered renderer drawing the frames of a match.
+    prediction : LocalPrediction or None
+        The predicted own player during a match.
 
     Parameters
     ----------
@@ -106,6 +114,8 @@ class Game():
         self.display = pygame.Surface(self.screen_res)
         self.screen = pygame.display.set_mode(
             self.screen_res, pygame.HWSURFACE, 32)
+        # decode every image once, menu frames only blit cached surfaces
+        utilities.preload_images()
         # indicating whether player is ready to play
         self.play_match = False
 
@@ -123,8 +133,8 @@ class Game():
         # start on the login screen
         self.curr_menu = self.login_menu
         # game elements that will be ploted to the screen
-        self.bg = pygame.image.load(  # pylint: disable=invalid-name
-            "./../resources/rink_" + str(self.settings_menu.map_indx + 1) + ".jpg").convert_alpha()
+        self.bg = ASSETS.image(  # pylint: disable=invalid-name
+            "./../resources/rink_" + str(self.settings_menu.map_indx + 1) + ".jpg")
         self.player_1 = Player("unknown", 100, 360, self.config, color="green")
         self.player_2 = Player("unknown", 1180, 360, self.config, color="blue")
         self.ball = Ball(self.config)
@@ -137,6 +147,8 @@ class Game():
         ) - goal_width, (self.display.get_height() - goal_height) // 2, goal_width, goal_height)
         self.border_width = self.config["match"]["border_width"]
         self.border = self.display.get_rect()
+        self.renderer = MatchRenderer(self)
+        self.prediction = None
 
     def start_match(self, match_data):
         """{"time":"datetime.datetime.now()",
@@ -147,22 +159,49 @@ class Game():
         p_2_pos_x, p2_pos_y,p_2_mouse_pos_x,
         p_2_mouse_pos_y, p_2_dash_cooldown,p_2_hook_cooldown,p_2_hooking,ball_x,ball_y]}
         """
-
+        self.renderer.reset()
+        frame_rate = self.config["client"]["frame_rate"]
+        # the own player moves right away, the snapshots only correct it
+        self.prediction = LocalPrediction(self.config, match_data, frame_rate)
+        # the replies are read on their own thread, frames never wait for them
+        link = MatchLink(self.net, self.config["client"]["max_in_flight"])
+        link.start()
+        clock = pygame.time.Clock()
+        seen = 0
         while self.status == "ingame":
-
-            self.draw(match_data)
             self.check_inputs()
-
-            self.response = self.share_inputs()
-
-            if self.response["flag"] == "game_state_1":
-                match_data = self.response["data"]
-
-            elif self.response["flag"] == "end_game_state_1":
+            actions = Player.keys_to_actions(self.keys_pressed, self.settings_menu.controls)
+            seq = self.prediction.step(self.mpos, actions)
+            if not link.send(self.parse_data("ingame", [self.mpos, actions, seq])):
+                # a dropped input is never simulated, it must not be replayed
+                self.prediction.rollback()
+
+            if link.replies.version != seen:
+                seen = link.replies.version
+                self.response = link.replies.get()
+                if not isinstance(self.response, dict):
+                    # the connection failed, the error message is the reply
+                    self.status = "online"
+                    self.curr_menu = self.main_menu
+                elif self.response["flag"] == "game_state_1":
+                    match_data = self.response["data"]
+                    self.prediction.reconcile(match_data)
+                elif self.response["flag"] == "end_game_state_1":
+                    self.status = "online"
+                    self.play_match = False
+                    self.curr_menu = EndScreenMenu(self, self.response["data"])
+            elif not link.is_alive():
+                # sending failed, no reply will come
                 self.status = "online"
-                self.play_match = False
-                self.curr_menu = EndScreenMenu(self, self.response["data"])
+                self.curr_menu = self.main_menu
+
+            if self.status == "ingame":
+                self.draw(match_data)
+            clock.tick(frame_rate)
 
+        link.stop()
+        link.join()
+        self.prediction = None
         self.play_match = False
 
     def reset_keys(self):
@@ -171,16 +210,6 @@ class Game():
         """
         self.UP_KEY, self.DOWN_KEY, self.START_KEY, self.BACK_KEY = False, False, False, False
 
-    def share_inputs(self):
-        """
-        Send the current input states to the server and receive a response.
-        """
-        parsed_data = self.parse_data(
-            "ingame",
-            [self.mpos, self.keys_pressed, self.settings_menu.controls]
-        )
-        return self.net.send(parsed_data)
-
     def check_inputs(self):
         """
         Update mouse position and key states, and handle game quit event.
@@ -196,25 +225,6 @@ class Game():
         """
         Draw the game elements based on the current match data.
         """
-        # draw background
-        self.screen.blit(self.display, (0, 0))
-        self.display.fill((150, 150, 150))
-        self.display.blit(self.bg, (0, 0))
-
-        # draw goals and border
-        pygame.draw.rect(self.display, "red", self.goal_1)  # White goal
-        pygame.draw.rect(self.display, "red", self.goal_2)  # White goal
-        pygame.draw.rect(self.display, (255, 255, 255),
-                         self.border, self.border_width)
-
-        # draw scoreboard
-        score_text = f"{match_data[2]} - {match_data[3]}"
-        score_surface = self.font.render(
-            score_text, True, (255, 255, 255))  # White text
-        score_x = self.display.get_width() // 2 - score_surface.get_width() // 2
-        score_y = 10  # 10 pixels from the top
-        self.display.blit(score_surface, (score_x, score_y))
-
         # update all positions according to the server
         self.player_1.x, self.player_1.y = match_data[6], match_data[7]
         self.player_2.x, self.player_2.y = match_data[8], match_data[9]
@@ -224,54 +234,18 @@ class Game():
             12], match_data[13]
         self.ball.x, self.ball.y = match_data[18], match_data[19]
 
-        # display timer
-        remaining_time = match_data[1]
-        if not match_data[22]:
-            timer_surface = self.font.render(
-                f"Time Left: {int(remaining_time)}s", True, (255, 255, 255))
-        else:
-            timer_surface = self.font.render(
-                f"Tiebreak", True, (255, 255, 255))
-        self.display.blit(timer_surface, (10, 10))
-
-        # if the player is hooking draw the hook
-        if match_data[20]:
-            self.player_1.hook(0, self.display)
-        if match_data[21]:
-            self.player_2.hook(0, self.display)
-
-        # draw cooldowns indicating your side
-        if match_data[0] == 1:
-            cooldown_surace_dash_1 = self.font.render(
-                f"Dash: {int(match_data[14])}s", True, (0, 221, 85))
-            cooldown_surace_hook_1 = self.font.render(
-                f"Hook: {int(match_data[15])}s", True, (0, 221, 85))
-            cooldown_surace_dash_2 = self.font.render(
-                f"Dash: {int(match_data[16])}s", True, (255, 255, 255))
-            cooldown_surace_hook_2 = self.font.render(
-                f"Hook: {int(match_data[17])}s", True, (255, 255, 255))
-        else:
-            cooldown_surace_dash_1 = self.font.render(
-                f"Dash: {int(match_data[14])}s", True, (255, 255, 255))
-            cooldown_surace_hook_1 = self.font.render(
-                f"Hook: {int(match_data[15])}s", True, (255, 255, 255))
-            cooldown_surace_dash_2 = self.font.render(
-                f"Dash: {int(match_data[16])}s", True, (0, 221, 85))
-            cooldown_surace_hook_2 = self.font.render(
-                f"Hook: {int(match_data[17])}s", True, (0, 221, 85))
-        self.display.blit(cooldown_surace_dash_1, (50, 630))
-        self.display.blit(cooldown_surace_hook_1, (50, 680))
-        self.display.blit(cooldown_surace_dash_2, (1000, 630))
-        self.display.blit(cooldown_surace_hook_2, (1000, 680))
-
-        self.player_1.setRect()
-        self.player_2.setRect()
-        self.ball.setRect()
-        # update blocks etc.
-        for entity in (self.player_1, self.player_2, self.ball):
-            self.display.blit(entity.image, entity.rect)
-
-        pygame.display.update()
+        if self.prediction is not None:
+            # the own player is drawn where the prediction has it
+            side = match_data[0]
+            own = self.player_1 if side == 1 else self.player_2
+            own.x, own.y = self.prediction.position()
+            body = self.prediction.body
+            own.hook_coords.x, own.hook_coords.y = body.hook_coords.x, body.hook_coords.y
+            match_data = list(match_data)
+            match_data[19 + side] = body.hooking
+
+        # only the moved sprites and the changed texts are redrawn
+        self.renderer.draw(match_data)
 
     def parse_data(self, flag, data):
         """
@@ -352,9 +326,9 @@ class Game():
         return data["data"]
 
     @staticmethod
-    def unpack_match_history_data(data):
+    def unpack_match_history_page_data(data):
         """
-        Unpack match history data received from the server.
+        Unpack a match history page received from the server.
 
         Parameters
         ----------
@@ -364,7 +338,7 @@ class Game():
         Returns
         -------
         tuple
-            Unpacked match history data.
+            The rows of the page and the cursor of the next page.
         """
         return (data["data"][0], data["data"][1])
 
@@ -0,0 +1,218 @@
+"""
+Prediction Module
+-----------------
+
+Module for the client-side prediction of the own player. The client runs the
+same PlayerBody movement, dash and hook logic as the server on its inputs
+right away, numbers every input and reconciles with each snapshot by taking
+the position the server simulated and replaying the inputs it has not
+simulated yet.
+"""
+from collections import deque
+from typing import Dict, Tuple
+
+from simulation.bodies import PlayerBody
+from simulation.vector import Vector2
+
+# attributes of PlayerBody that change while it is updated
+STATE_FIELDS = ("x", "y", "hook_coords", "hook_initial", "coords_current", "dash_started",
+                "dash_coords", "dash_destination", "hook_cooldown_started", "hook_on_cooldown",
+                "dash_cooldown_started", "dash_on_cooldown", "dashed_already", "hooking",
+                "end_hook", "pull", "dashing")
+# share of the correction still shown after one more frame
+SMOOTHING = 0.8
+# seconds of inputs kept for the replay when the server acknowledges none
+PENDING_SECONDS = 2
+
+
+def save_state(body: PlayerBody) -> tuple:
+    """
+    Copy of the changing state of a body.
+
+    Parameters
+    ----------
+    body : PlayerBody
+        The body.
+
+    Returns
+    -------
+    tuple
+        The values of STATE_FIELDS, vectors copied.
+    """
+    return tuple(Vector2(value.x, value.y) if isinstance(value, Vector2) else value
+                 for value in (getattr(body, field) for field in STATE_FIELDS))
+
+
+def restore_state(body: PlayerBody, state: tuple) -> None:
+    """
+    Put a body back into a saved state.
+
+    Parameters
+    ----------
+    body : PlayerBody
+        The body.
+    state : tuple
+        A state returned by save_state.
+    """
+    for field, value in zip(STATE_FIELDS, state):
+        if isinstance(value, Vector2):
+            value = Vector2(value.x, value.y)
+        setattr(body, field, value)
+
+
+# pylint: disable=too-many-instance-attributes
+class LocalPrediction:
+    """
+    The predicted state of the own player during a match.
+
+    Every frame applies the input of the frame to a local PlayerBody and keeps
+    the input with the state it led to until a snapshot acknowledges it. The
+    correction of a reconciliation is shown gradually, each frame shows
+    `SMOOTHING` of the previous one.
+
+    Attributes
+    ----------
+    body : PlayerBody
+        The predicted player.
+    side : int
+        1 or 2, the side of the own player.
+    dt : float
+        Simulated time of one frame in seconds.
+    max_pending : int
+        Most inputs replayed by a reconciliation.
+    seq : int
+        Sequence number of the last input.
+    time : float
+        Simulated time since the start of the match in seconds.
+    pending : deque
+        The inputs the server has not simulated yet with the state after each.
+    acknowledged_state : tuple
+        The state after the last input the server simulated, corrected.
+    offset : Vector2
+        The part of the last corrections not shown yet.
+
+    Parameters
+    ----------
+    config : Dict
+        Configuration settings of the game.
+    match_data : list
+        The first snapshot of the match.
+    frame_rate : int
+        Frames per second, one input is made every frame.
+
+    Methods
+    -------
+    step(mouse_pos, actions) -> int
+        Applies the input of a frame and numbers it.
+    rollback()
+        Undoes the last step, whose input was not sent.
+    reconcile(match_data)
+        Corrects the prediction with a snapshot.
+    position() -> Tuple[float, float]
+        Where the own player is drawn.
+    """
+
+    def __init__(self, config: Dict, match_data: list, frame_rate: int):
+        self.side = match_data[0]
+        x, y = self._server_position(match_data)
+        self.body = PlayerBody("local", int(x), int(y), config)
+        self.body.x, self.body.y = x, y
+        self.dt = 1 / frame_rate
+        self.max_pending = PENDING_SECONDS * frame_rate
+        self.seq = 0
+        self.time = 0.0
+        self.pending = deque()
+        self.acknowledged_state = save_state(self.body)
+        self.offset = Vector2(0, 0)
+
+    def _server_position(self, match_data: list) -> Tuple[float, float]:
+        """Position of the own player in a snapshot."""
+        index = 6 + 2 * (self.side - 1)
+        return match_data[index], match_data[index + 1]
+
+    def _apply(self, mouse_pos: Tuple[int, int], actions: int, time: float) -> None:
+        """Run one frame of the body."""
+        self.body.update(self.dt, (int(mouse_pos[0]), int(mouse_pos[1])), time, int(actions))
+
+    def step(self, mouse_pos: Tuple[int, int], actions: int) -> int:
+        """
+        Apply the input of a frame and number it.
+
+        Parameters
+        ----------
+        mouse_pos : Tuple[int, int]
+            The mouse coordinates.
+        actions : int
+            Bitmask of the requested Action values.
+
+        Returns
+        -------
+        int
+            The sequence number to send with the input.
+        """
+        self.seq += 1
+        self.time += self.dt
+        self._apply(mouse_pos, actions, self.time)
+        self.pending.append((self.seq, mouse_pos, actions, self.time, save_state(self.body)))
+        if len(self.pending) > self.max_pending:
+            self.acknowledged_state = self.pending.popleft()[4]
+        self.offset = self.offset * SMOOTHING
+        return self.seq
+
+    def rollback(self) -> None:
+        """
+        Undo the last step, whose input was not sent.
+
+        The server never simulates the input, so it is not kept for the
+        replay and its sequence number is given to the next input.
+        """
+        self.pending.pop()
+        self.seq -= 1
+        self.time -= self.dt
+        restore_state(self.body, self.pending[-1][4] if self.pending else self.acknowledged_state)
+
+    def reconcile(self, match_data: list) -> None:
+        """
+        Correct the prediction with a snapshot.
+
+        The state predicted after the acknowledged input takes the position
+        and, if the server agrees the hook is out, the hook position from the
+        snapshot, then the inputs made since are applied again.
+
+        Parameters
+        ----------
+        match_data : list
+            A snapshot of the match, its last element is the acknowledged input.
+        """
+        acknowledged = match_data[23]
+        predicted = (self.body.x, self.body.y)
+        while self.pending and self.pending[0][0] <= acknowledged:
+            self.acknowledged_state = self.pending.popleft()[4]
+        restore_state(self.body, self.acknowledged_state)
+        self.body.x, self.body.y = self._server_position(match_data)
+        index = 10 + 2 * (self.side - 1)
+        if self.body.hooking and match_data[20 + self.side - 1]:
+            self.body.hook_coords = Vector2(match_data[index], match_data[index + 1])
+        self.acknowledged_state = save_state(self.body)
+        replayed = deque()
+        for seq, mouse_pos, actions, time, _ in self.pending:
+            self._apply(mouse_pos, actions, time)
+            replayed.append((seq, mouse_pos, actions, time, save_state(self.body)))
+        self.pending = replayed
+        self.offset += Vector2(predicted[0] - self.body.x, predicted[1] - self.body.y)
+
+    def position(self) -> Tuple[float, float]:
+        """
+        Where the own player is drawn, the prediction with the correction not
+        shown yet.
+
+        Returns
+        -------
+        Tuple[float, float]
+            The coordinates of the center.
+        """
+        return self.body.x + self.offset.x, self.body.y + self.offset.y
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
@@ -2,11 +2,12 @@
 Match Module
 ------------
 
-A module for managing and updating the state of a 1v1 match in a pygame-based game, including player actions, ball dynamics, and match statistics.
+A module for managing and updating the state of a 1v1 match, including player actions, ball dynamics, and match statistics.
+The match is headless, it runs on the simulation bodies and never touches pygame.
 """
-import pygame
-from pygame import Vector2
 from match.match_stats import MatchStats
+from simulation.bodies import Bounds, collide_circle
+from simulation.vector import Vector2
 
 # pylint: disable=too-many-instance-attributes
 # pylint: disable=too-few-public-methods
@@ -22,8 +23,6 @@ class Match():
         Maximum height of the game display.
     max_width : int
         Maximum width of the game display.
-    display : pygame.Surface
-        The main display surface of the game.
     match_duration : int
         Duration of the match in seconds.
     score : tuple
@@ -32,34 +31,24 @@ class Match():
         Flag to indicate if the match is in a tiebreak.
     end_game_in_tiebreak : bool
         Flag to end the game during a tiebreak.
-    entities : pygame.sprite.Group
-        Group containing all game entities.
-    solids : pygame.sprite.Group
-        Group containing all solid objects.
-    border : pygame.Rect
+    entities : list
+        List containing all game entities.
+    border : Bounds
         The border of the play area.
-    clock : pygame.time.Clock
-        Clock object for managing frame rate.
     dt : float
-        Time delta for frame rate management.
-    last_tick : int
-        Timestamp of the last tick.
-    ttime : int
-        Total time passed.
+        Duration of the last simulation step in seconds.
     playing : bool
         Flag indicating if the match is currently playing.
-    goal1 : pygame.Rect
-        Rect object for the first goal.
-    goal2 : pygame.Rect
-        Rect object for the second goal.
+    goal1 : Bounds
+        Area of the first goal.
+    goal2 : Bounds
+        Area of the second goal.
     mpos_1 : tuple
         Mouse position for player 1.
     mpos_2 : tuple
         Mouse position for player 2.
-    start_time : int
-        Start time of the match.
     elapsed_time : float
-        Elapsed time since the start of the match.
+        Simulated time since the start of the match in seconds.
     dash_time_1 : float
         Remaining dash cooldown time for player 1.
     hook_time_1 : float
@@ -78,38 +67,29 @@ class Match():
     """
 
     def __init__(self, config):
-        pygame.init()
         self.config = config
         self.max_height, self.max_width = self.config["resolution"][
             "height"], self.config["resolution"]["width"]
-        # Define borders
-        self.display = pygame.Surface((self.max_width, self.max_height))
         self.match_duration = 5*60
         self.score = (0, 0)
         self.tiebreak = False
         self.end_game_in_tiebreak = False
-        self.entities = pygame.sprite.Group()
-        self.solids = pygame.sprite.Group()
+        self.entities = []
 
-        self.border = self.display.get_rect()
-        self.clock = pygame.time.Clock()
+        # Define borders
+        self.border = Bounds(0, 0, self.max_width, self.max_height)
         self.dt = 0.0
-        self.last_tick = pygame.time.get_ticks()
-        self.ttime = self.clock.tick()
-        self.clock.tick(60)
         self.playing = True
         # Define goals as rectangles
-        goal_width = 20  # Width of the goal, adjust as needed
-        goal_height = 100  # Height of the goal, adjust as needed
-        self.goal1 = pygame.Rect(
+        goal_width = self.config["match"]["goal_width"]
+        goal_height = self.config["match"]["goal_height"]
+        self.goal1 = Bounds(
             0, (self.max_height - goal_height) // 2, goal_width, goal_height)
-        self.goal2 = pygame.Rect(
+        self.goal2 = Bounds(
             self.max_width - goal_width, (self.max_height - goal_height) // 2, goal_width, goal_height)
 
         self.mpos_1 = (0, 0)
         self.mpos_2 = (0, 0)
-        # Get the current time in milliseconds
-        self.start_time = pygame.time.get_ticks()
         self.elapsed_time = 0
         self.dash_time_1 = 0
         self.hook_time_1 = 0
@@ -128,11 +108,11 @@ class Match1v1(Match):
         Identifier for player 1.
     p2_id : str
         Identifier for player 2.
-    p1 : Player
+    p1 : PlayerBody
         Player 1 object.
-    p2 : Player
+    p2 : PlayerBody
         Player 2 object.
-    ball : Ball
+    ball : BallBody
         Ball object in the match.
     match_stats : MatchStats
         Object for tracking match statistics.
@@ -144,16 +124,21 @@ class Match1v1(Match):
         Flag indicating if player 1 has been notified of game end.
     p2_end_game_notified : bool
         Flag indicating if player 2 has been notified of game end.
+    engine : BatchEngine or None
+        The engine simulating the match in batch mode, None when the match
+        advances itself in match_loop.
+    slot : int or None
+        Row of the match in the arrays of the engine.
 
     Parameters
     ----------
     config : dict
         Configuration settings for the match.
-    p1 : Player
+    p1 : PlayerBody
         Player 1 object.
-    p2 : Player
+    p2 : PlayerBody
         Player 2 object.
-    ball : Ball
+    ball : BallBody
         Ball object in the match.
     p1_id : str
         Identifier for player 1.
@@ -169,7 +154,7 @@ class Match1v1(Match):
         self.p1 = p1
         self.p2 = p2
         self.ball = ball
-        self.entities.add(self.ball, self.p1, self.p2)
+        self.entities.extend((self.ball, self.p1, self.p2))
         # Stat class initialized
         self.match_stats = MatchStats(entities=self.entities)
         self.match_stats.set_elo(p1)
@@ -179,6 +164,8 @@ class Match1v1(Match):
 
         self.p1_end_game_notified = False
         self.p2_end_game_notified = False
+        self.engine = None
+        self.slot = None
 
 
     def reset_ball(self):
@@ -192,9 +179,7 @@ class Match1v1(Match):
         self.ball.y = self.max_height // 2
         # Reset the ball's speed
         # You can set this to an initial speed or to zero
-        self.ball.speed = Vector2(0, 0)
-        # Update the ball's rect to reflect the new position
-        self.ball.setRect()
+        self.ball.speed.x, self.ball.speed.y = 0, 0
 
     def end_tiebreak(self):
         """
@@ -208,7 +193,7 @@ class Match1v1(Match):
         Update the game state, including ball-goal collisions, player-ball interactions, and cooldown calculations.
         """
         # Check for ball collision with goals
-        if self.goal1.colliderect(self.ball.rect):
+        if self.goal1.overlaps_circle(self.ball.x, self.ball.y, self.ball.radius):
             # Ball has entered goal 1
             # Update score and reset ball position, etc.
             self.score = (self.score[0], self.score[1] + 1)
@@ -216,22 +201,22 @@ class Match1v1(Match):
             self.reset_ball()
             self.end_tiebreak()
 
-        if self.goal2.colliderect(self.ball.rect):
+        if self.goal2.overlaps_circle(self.ball.x, self.ball.y, self.ball.radius):
             # Ball has entered goal 2, increment score for player 1
             self.score = (self.score[0] + 1, self.score[1])
             self.match_stats.add_goal(self.p1)
             self.reset_ball()
             self.end_tiebreak()
 
-        if pygame.sprite.collide_circle(self.p1, self.ball) or pygame.sprite.collide_circle(self.p2, self.ball):
+        if collide_circle(self.p1, self.ball) or collide_circle(self.p2, self.ball):
             # 1. Calculate the collision normal
-            if pygame.sprite.collide_circle(self.p1, self.ball):
-                collision_normal = self.ball.rect.center - \
-                    Vector2(self.p1.rect.center)
+            if collide_circle(self.p1, self.ball):
+                collision_normal = Vector2(self.ball.x - self.p1.x,
+                                           self.ball.y - self.p1.y)
                 self.match_stats.add_touch(self.p1)
             else:
-                collision_normal = self.ball.rect.center - \
-                    Vector2(self.p2.rect.center)
+                collision_normal = Vector2(self.ball.x - self.p2.x,
+                                           self.ball.y - self.p2.y)
                 self.match_stats.add_touch(self.p2)
 
             collision_normal.normalize_ip()  # Normalize the vector to have a magnitude of 1
@@ -240,9 +225,6 @@ class Match1v1(Match):
             speed_magnitude = 20  # You can adjust this value as needed
             self.ball.speed = collision_normal * speed_magnitude
 
-        self.dt = self.clock.tick(60) / 1000
-
-        self.elapsed_time = (pygame.time.get_ticks() - self.start_time) / 1000
         self.remaining_time = max(self.match_duration - self.elapsed_time, 0)
 
         if self.p_1_update is not None:
@@ -279,6 +261,24 @@ class Match1v1(Match):
         if self.p2.hook_cooldown_started == 0:
             self.hook_time_2 = 0
 
+    def set_input(self, side, inputs):
+        """
+        Store the latest input of a player, applied on every step until replaced.
+
+        Parameters
+        ----------
+        side : int
+            1 or 2.
+        inputs : list
+            Mouse position and the Action bitmask.
+        """
+        if side == 1:
+            self.p_1_update = inputs
+        else:
+            self.p_2_update = inputs
+        if self.engine is not None:
+            self.engine.set_input(self, side, inputs)
+
     def update_player_1(self, inputs):
         """
         Update the state of player 1 based on the given inputs.
@@ -286,10 +286,9 @@ class Match1v1(Match):
         Parameters
         ----------
         inputs : list
-            Input data for updating player 1's state.
+            Input data for updating player 1's state, mouse position and actions.
         """
-        self.p1.update(
-            self.dt, None, inputs[0], self.elapsed_time, inputs[1], inputs[2])
+        self.p1.update(self.dt, inputs[0], self.elapsed_time, inputs[1])
 
     def update_player_2(self, inputs):
         """
@@ -298,10 +297,9 @@ class Match1v1(Match):
         Parameters
         ----------
         inputs : list
-            Input data for updating player 2's state.
+            Input data for updating player 2's state, mouse position and actions.
         """
-        self.p2.update(
-            self.dt, None, inputs[0], self.elapsed_time, inputs[1], inputs[2])
+        self.p2.update(self.dt, inputs[0], self.elapsed_time, inputs[1])
 
     def end_match(self):
         """
@@ -343,6 +341,11 @@ class Match1v1(Match):
         list
             A list containing various elements of the match's current state.
         """
+        engine = self.engine
+        if engine is not None:
+            state = engine.share_state(self)
+            if state is not None:
+                return state
         return [self.remaining_time, self.score[0], self.score[1],
                 self.p1.name, self.p2.name,
                 self.p1.x, self.p1.y, self.p2.x, self.p2.y, self.p1.hook_coords.x,
@@ -351,20 +354,23 @@ class Match1v1(Match):
                 self.hook_time_1, self.dash_time_2, self.hook_time_2,
                 self.ball.x, self.ball.y, self.p1.hooking, self.p2.hooking, self.tiebreak]
 
-    def match_loop(self):
+    def match_loop(self, dt):
         """
-        The main game loop for the match, handling state updates and match termination conditions.
+        Advance the match by one fixed timestep, handling state updates and match termination conditions.
+
+        Parameters
+        ----------
+        dt : float
+            Simulated time of the step in seconds, given by the MatchScheduler.
 
         Returns
         -------
         bool
             False if the match continues, True if the match ends.
         """
-        # main game loop
+        self.dt = dt
+        self.elapsed_time += dt
         self.update_game_state()
-        # Update the timer
-        # Convert milliseconds to seconds
-        self.elapsed_time = (pygame.time.get_ticks() - self.start_time) / 1000
         if self.elapsed_time >= self.match_duration and self.score[0] == self.score[1]:
             self.tiebreak = True
             if self.end_game_in_tiebreak:
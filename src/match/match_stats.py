@@ -4,10 +4,9 @@ MatchStats Module
 
 Module for the MatchStatsData class, encapsulating match statistics and winner information in a game environment.
 """
-import pygame
+from typing import Iterable
 
-from game_objects.ball import Ball
-from game_objects.player import Player
+from simulation.bodies import BallBody, PlayerBody
 
 # pylint: disable=too-few-public-methods
 class MatchStats:
@@ -25,59 +24,59 @@ class MatchStats:
 
     Parameters
     ----------
-    entities : pygame.sprite.Group
-        A group containing Player and Ball entities in the match.
+    entities : Iterable
+        The Player and Ball entities in the match.
 
     Raises
     ------
     TypeError
         If entities in the group are not instances of Player or Ball.
     """
-    def __init__(self, entities: pygame.sprite.Group):
+    def __init__(self, entities: Iterable):
         for entity in entities:
-            if not isinstance(entity, (Player, Ball)):
+            if not isinstance(entity, (PlayerBody, BallBody)):
                 raise TypeError("Entities must be Player or Ball")
 
         # Filter out the ball from the entities
         self.entities = [
-            entity for entity in entities if not isinstance(entity, Ball)]
+            entity for entity in entities if not isinstance(entity, BallBody)]
 
         # Initialize stats only for the filtered entities
         self.stats = {entity.name: {'touches': 0, 'goals': 0,
                                     'possession_time': 0, 'elo': 0} for entity in self.entities}
         self.winner = None
 
-    def set_elo(self, entity: Player):
+    def set_elo(self, entity: PlayerBody):
         """
         Set the Elo rating for a given entity.
 
         Parameters
         ----------
-        entity : Player
+        entity : PlayerBody
             The entity for which to set the Elo rating.
         """
         if entity.name in self.stats:
             self.stats[entity.name]['elo'] = entity.elo
 
-    def add_touch(self, entity: Player):
+    def add_touch(self, entity: PlayerBody):
         """
         Increment the touch count for a given entity.
 
         Parameters
         ----------
-        entity : Player
+        entity : PlayerBody
             The entity for which to increment the touch count.
         """
         if entity.name in self.stats:
             self.stats[entity.name]['touches'] += 1
 
-    def add_goal(self, entity: Player):
+    def add_goal(self, entity: PlayerBody):
         """
         Increment the goal count for a given entity.
 
         Parameters
         ----------
-        entity : Player
+        entity : PlayerBody
             The entity for which to increment the goal count.
         """
         if entity.name in self.stats:
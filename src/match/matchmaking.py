@@ -0,0 +1,312 @@
+"""
+Matchmaking Module
+------------------
+
+Module pairing the players queued for a solo match by elo. The queued players
+are kept in buckets of similar elo, indexed by a sorted list of bucket keys,
+so joining and leaving the queue take constant time no matter how many players
+wait. A periodic pass walks the buckets in elo order and pairs neighbours
+whose elo difference fits the search window of the longer waiting of them,
+the window widens the longer a player waits. A paired player stays marked as
+pairing until his match is started, so he cannot join the queue again in
+between.
+"""
+import bisect
+import math
+import threading
+import time
+from collections import deque
+from operator import attrgetter
+
+
+# pylint: disable=too-few-public-methods
+class QueueEntry:
+    """
+    A queued player with the data needed to start his match.
+
+    Attributes
+    ----------
+    player_id : int
+        Id of the player.
+    name : str
+        Name of the player, cached when he joined the queue.
+    elo : int
+        Elo of the player, cached when he joined the queue.
+    joined : float
+        time.monotonic() value at which he joined the queue.
+    bucket : int
+        Key of the elo bucket holding the entry.
+    """
+    __slots__ = ("player_id", "name", "elo", "joined", "bucket")
+
+    def __init__(self, player_id, name, elo, joined, bucket):
+        self.player_id = player_id
+        self.name = name
+        self.elo = elo
+        self.joined = joined
+        self.bucket = bucket
+
+
+# pylint: disable=too-many-instance-attributes
+class MatchmakingQueue:
+    """
+    Elo bucketed queue of the players waiting for a solo match.
+
+    Attributes
+    ----------
+    interval : float
+        Seconds between two matchmaking passes.
+    initial_window : float
+        Elo difference accepted right after joining the queue.
+    window_growth : float
+        Elo the search window widens by per second of waiting.
+    max_window : float
+        Widest elo difference ever accepted.
+    bucket_width : int
+        Elo range of one bucket.
+    wait_times : collections.deque
+        Queue wait times in seconds of the latest paired players.
+    running : bool
+        Flag keeping the loop in `run` alive.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration settings, reads the matchmaking section.
+
+    Methods
+    -------
+    join(player_id, name, elo, now=None, in_match=None) -> bool
+        Queues a player.
+    leave(player_id) -> bool
+        Removes a player from the queue.
+    window(entry, now) -> float
+        The search window of a queued player.
+    find_pairs(now=None, on_pair=None) -> list
+        Pairs the queued players whose elo is close enough.
+    wait_time_percentiles(percentiles=(50, 90, 99)) -> dict
+        Percentiles of the recent queue wait times.
+    run(on_pair)
+        Runs the matchmaking passes until `stop` is called.
+    stop()
+        Ends the matchmaking loop.
+    """
+
+    def __init__(self, config):
+        settings = config["matchmaking"]
+        self.interval = settings["interval"]
+        self.initial_window = settings["initial_window"]
+        self.window_growth = settings["window_growth"]
+        self.max_window = settings["max_window"]
+        self.bucket_width = settings["bucket_width"]
+        self.wait_times = deque(maxlen=settings["wait_time_samples"])
+        self._entries = {}
+        self._buckets = {}
+        self._bucket_keys = []
+        self._pairing = set()
+        self._lock = threading.Lock()
+        self.running = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, player_id):
+        return player_id in self._entries
+
+    def join(self, player_id, name, elo, now=None, in_match=None):
+        """
+        Queue a player, unless he is queued, being paired or in a match.
+
+        Parameters
+        ----------
+        player_id : int
+            Id of the player.
+        name : str
+            Name of the player.
+        elo : int
+            Elo of the player.
+        now : float, optional
+            time.monotonic() value of the join, the current time by default.
+        in_match : callable, optional
+            Called with the id, truthy if the player is in a match. It is
+            called with the lock held, a pair is only unmarked once its match
+            is started, so a player is always either queued, pairing or in
+            his match.
+
+        Returns
+        -------
+        bool
+            False if the player was already queued, paired or in a match.
+        """
+        if now is None:
+            now = time.monotonic()
+        key = int(elo // self.bucket_width)
+        with self._lock:
+            if (player_id in self._entries or player_id in self._pairing
+                    or (in_match is not None and in_match(player_id))):
+                return False
+            entry = QueueEntry(player_id, name, elo, now, key)
+            self._entries[player_id] = entry
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = {}
+                bisect.insort(self._bucket_keys, key)
+            bucket[player_id] = entry
+        return True
+
+    def leave(self, player_id):
+        """
+        Remove a player from the queue.
+
+        Parameters
+        ----------
+        player_id : int or str
+            Id of the player.
+
+        Returns
+        -------
+        bool
+            False if the player was not queued.
+        """
+        with self._lock:
+            entry = self._entries.pop(player_id, None)
+            if entry is None:
+                return False
+            del self._buckets[entry.bucket][player_id]
+        return True
+
+    def window(self, entry, now):
+        """
+        The search window of a queued player.
+
+        Parameters
+        ----------
+        entry : QueueEntry
+            The queued player.
+        now : float
+            Current time.monotonic() value.
+
+        Returns
+        -------
+        float
+            The largest elo difference the player accepts.
+        """
+        return min(self.initial_window + self.window_growth * (now - entry.joined),
+                   self.max_window)
+
+    def _pair(self, first, second, now):
+        """Dequeue two paired players and mark them as pairing, called with the lock held."""
+        for entry in (first, second):
+            self._pairing.add(entry.player_id)
+            del self._entries[entry.player_id]
+            del self._buckets[entry.bucket][entry.player_id]
+            self.wait_times.append(now - entry.joined)
+
+    def find_pairs(self, now=None, on_pair=None):
+        """
+        Pair the queued players whose elo is close enough.
+
+        The buckets are visited in elo order and the lock is taken for one
+        bucket at a time, so joining players never wait for a whole pass. The
+        last unpaired player of a bucket is carried over to the next bucket.
+        The pairs of a bucket are handed to `on_pair` right after the bucket,
+        the players stay marked as pairing until it returns.
+
+        Parameters
+        ----------
+        now : float, optional
+            time.monotonic() value of the pass, the current time by default.
+        on_pair : callable, optional
+            Called with the two QueueEntry of every pair, starts the match.
+
+        Returns
+        -------
+        list
+            The paired QueueEntry tuples, lower elo first.
+        """
+        if now is None:
+            now = time.monotonic()
+        pairs = []
+        carry = None
+        with self._lock:
+            keys = list(self._bucket_keys)
+        for key in keys:
+            paired = []
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if not bucket:
+                    if bucket is not None:
+                        del self._buckets[key]
+                        del self._bucket_keys[bisect.bisect_left(self._bucket_keys, key)]
+                    continue
+                candidates = sorted(bucket.values(), key=attrgetter("elo"))
+                if carry is not None and self._entries.get(carry.player_id) is carry:
+                    candidates.insert(0, carry)
+                carry = None
+                index = 0
+                while index < len(candidates) - 1:
+                    first, second = candidates[index], candidates[index + 1]
+                    if second.elo - first.elo <= max(self.window(first, now),
+                                                     self.window(second, now)):
+                        self._pair(first, second, now)
+                        paired.append((first, second))
+                        index += 2
+                    else:
+                        index += 1
+                if index == len(candidates) - 1:
+                    carry = candidates[index]
+            for first, second in paired:
+                try:
+                    if on_pair is not None:
+                        on_pair(first, second)
+                finally:
+                    with self._lock:
+                        self._pairing.discard(first.player_id)
+                        self._pairing.discard(second.player_id)
+            pairs.extend(paired)
+        return pairs
+
+    def wait_time_percentiles(self, percentiles=(50, 90, 99)):
+        """
+        Percentiles of the recent queue wait times.
+
+        Parameters
+        ----------
+        percentiles : tuple, optional
+            The percentiles to compute, by default (50, 90, 99).
+
+        Returns
+        -------
+        dict
+            Wait time in seconds by percentile, 0 before anyone was paired.
+        """
+        samples = sorted(self.wait_times)
+        if not samples:
+            return {percentile: 0.0 for percentile in percentiles}
+        # nearest rank, the smallest sample with at least `percentile` % at or below it
+        return {percentile: samples[max(0, math.ceil(len(samples) * percentile / 100) - 1)]
+                for percentile in percentiles}
+
+    def run(self, on_pair):
+        """
+        Run the matchmaking passes until `stop` is called.
+
+        Parameters
+        ----------
+        on_pair : callable
+            Called with the two QueueEntry of every pair.
+        """
+        self.running = True
+        while self.running:
+            time.sleep(self.interval)
+            self.find_pairs(on_pair=on_pair)
+
+    def stop(self):
+        """
+        End the matchmaking loop after the current pass.
+        """
+        self.running = False
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
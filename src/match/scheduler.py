@@ -0,0 +1,190 @@
+"""
+Scheduler Module
+----------------
+
+Module advancing every running match of the server from a single thread on a
+fixed timestep, so the simulation does not depend on how many matches run or
+how the operating system schedules their threads.
+"""
+import threading
+import time
+
+from simulation.batch import BatchEngine
+
+
+# pylint: disable=too-many-instance-attributes
+class MatchScheduler:
+    """
+    Fixed timestep loop shared by all the matches.
+
+    Every tick advances each match by exactly `dt` seconds. When a tick takes
+    longer than its budget the following ticks run back to back to catch up,
+    at most `max_catch_up_ticks` of them, the rest are skipped so an
+    overloaded server slows the matches down instead of falling further and
+    further behind.
+
+    Attributes
+    ----------
+    tick_rate : int
+        Number of ticks per second.
+    dt : float
+        Simulated time of one tick in seconds, also the time budget of a tick.
+    max_catch_up_ticks : int
+        Maximum number of ticks run in a row when the loop is behind.
+    engine : BatchEngine or None
+        Vectorized engine advancing all the matches at once when the server
+        engine is "batch", None when every match runs its own match_loop.
+    matches : list
+        Matches advanced on every tick.
+    next_tick : float
+        time.perf_counter() value at which the next tick is due.
+    running : bool
+        Flag keeping the loop in `run` alive.
+    ticks : int
+        Number of ticks run so far.
+    skipped_ticks : int
+        Number of ticks dropped because the loop could not catch up.
+    overruns : int
+        Number of ticks that took longer than `dt`.
+    last_tick_duration : float
+        Wall time of the last tick in seconds.
+    max_tick_duration : float
+        Longest wall time of a tick in seconds.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration settings, reads the server section.
+
+    Methods
+    -------
+    add_match(match)
+        Starts advancing a match on every tick.
+    remove_match(match)
+        Stops advancing a match.
+    tick()
+        Advances every match by one timestep.
+    advance(now: float) -> int
+        Runs the ticks that are due at the given time.
+    run()
+        Runs the scheduler loop until `stop` is called.
+    stop()
+        Ends the scheduler loop.
+    """
+
+    def __init__(self, config):
+        self.tick_rate = config["server"]["tick_rate"]
+        self.dt = 1 / self.tick_rate
+        self.max_catch_up_ticks = config["server"]["max_catch_up_ticks"]
+        self.engine = BatchEngine(config) if config["server"]["engine"] == "batch" else None
+        self.matches = []
+        self._lock = threading.Lock()
+        self.next_tick = None
+        self.running = False
+        self.ticks = 0
+        self.skipped_ticks = 0
+        self.overruns = 0
+        self.last_tick_duration = 0.0
+        self.max_tick_duration = 0.0
+
+    def add_match(self, match):
+        """
+        Start advancing a match on every tick.
+
+        Parameters
+        ----------
+        match : Match1v1
+            The match to be simulated.
+        """
+        with self._lock:
+            self.matches.append(match)
+            if self.engine is not None:
+                self.engine.add_match(match)
+
+    def remove_match(self, match):
+        """
+        Stop advancing a match, ignored if the match is not scheduled.
+
+        Parameters
+        ----------
+        match : Match1v1
+            The match to be removed.
+        """
+        with self._lock:
+            if match in self.matches:
+                self.matches.remove(match)
+            if self.engine is not None and match.engine is self.engine:
+                self.engine.remove_match(match)
+
+    def tick(self):
+        """
+        Advance every match by one timestep, matches that end are removed.
+        """
+        start = time.perf_counter()
+        if self.engine is not None:
+            with self._lock:
+                ended = self.engine.step(self.dt)
+            for match in ended:
+                self.remove_match(match)
+        else:
+            with self._lock:
+                matches = list(self.matches)
+            for match in matches:
+                if match.match_loop(self.dt):
+                    self.remove_match(match)
+        self.ticks += 1
+        self.last_tick_duration = time.perf_counter() - start
+        self.max_tick_duration = max(self.max_tick_duration, self.last_tick_duration)
+        if self.last_tick_duration > self.dt:
+            self.overruns += 1
+
+    def advance(self, now):
+        """
+        Run the ticks that are due at the given time.
+
+        Parameters
+        ----------
+        now : float
+            Current time.perf_counter() value.
+
+        Returns
+        -------
+        int
+            Number of ticks run.
+        """
+        if self.next_tick is None:
+            self.next_tick = now
+        ran = 0
+        while now >= self.next_tick and ran < self.max_catch_up_ticks:
+            self.tick()
+            self.next_tick += self.dt
+            ran += 1
+        if now >= self.next_tick:
+            # too far behind, drop the missed ticks and continue from now
+            skipped = int((now - self.next_tick) / self.dt) + 1
+            self.skipped_ticks += skipped
+            self.next_tick += skipped * self.dt
+            print(f"Scheduler is behind, skipped {skipped} ticks")
+        return ran
+
+    def run(self):
+        """
+        Run the scheduler loop until `stop` is called.
+        """
+        self.running = True
+        while self.running:
+            now = time.perf_counter()
+            if self.next_tick is not None and now < self.next_tick:
+                time.sleep(self.next_tick - now)
+                continue
+            self.advance(now)
+
+    def stop(self):
+        """
+        End the scheduler loop after the current tick.
+        """
+        self.running = False
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
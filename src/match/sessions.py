@@ -0,0 +1,122 @@
+"""
+Sessions Module
+---------------
+
+Module indexing the running matches of the server by the ids of their players,
+so routing a packet to its match costs one dictionary lookup no matter how
+many matches are running.
+"""
+import threading
+
+
+class SessionRegistry:
+    """
+    Map from player id to the match of the player and the side he plays on.
+
+    Lookups read the dictionary without the lock, a single dictionary read is
+    atomic. The lock keeps both players of a match consistent while a match is
+    added or removed.
+
+    Methods
+    -------
+    add_match(match)
+        Registers both players of a match.
+    remove_player(player_id) -> bool
+        Unregisters one player, after the match or a disconnect.
+    lookup(player_id) -> tuple or None
+        The match and side of a player.
+    record_input(player_id, seq) -> int
+        Numbers the newest input of a player, returns the one it replaces.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._input_seqs = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add_match(self, match):
+        """
+        Register both players of a match.
+
+        Parameters
+        ----------
+        match : Match1v1 or RemoteMatch
+            The match that just started.
+        """
+        with self._lock:
+            self._sessions[int(match.p1_id)] = (match, 1)
+            self._sessions[int(match.p2_id)] = (match, 2)
+            self._input_seqs[int(match.p1_id)] = 0
+            self._input_seqs[int(match.p2_id)] = 0
+
+    def remove_player(self, player_id):
+        """
+        Unregister one player, who got the end of his match or disconnected.
+
+        Parameters
+        ----------
+        player_id : int or str
+            Id of the player.
+
+        Returns
+        -------
+        bool
+            True if the player was the last registered one of his match, so
+            only one of the threads finishing the same match gets to record it.
+        """
+        player_id = int(player_id)
+        with self._lock:
+            session = self._sessions.pop(player_id, None)
+            self._input_seqs.pop(player_id, None)
+            if session is None:
+                return False
+            match = session[0]
+            return all(self._sessions.get(int(other), (None,))[0] is not match
+                       for other in (match.p1_id, match.p2_id))
+
+    def lookup(self, player_id):
+        """
+        The match a player is in and the side he plays on.
+
+        Parameters
+        ----------
+        player_id : int or str
+            Id of the player.
+
+        Returns
+        -------
+        tuple or None
+            The match and 1 or 2, None if the player is not in a match.
+        """
+        return self._sessions.get(int(player_id))
+
+    def record_input(self, player_id, seq):
+        """
+        Number the newest input of a player.
+
+        The match applies an input on every tick until the next one arrives,
+        so the ticks simulated until now ran with the input it replaces.
+
+        Parameters
+        ----------
+        player_id : int or str
+            Id of the player.
+        seq : int
+            Sequence number the client gave the input.
+
+        Returns
+        -------
+        int
+            Sequence number of the replaced input, 0 before the first one.
+        """
+        player_id = int(player_id)
+        previous = self._input_seqs.get(player_id, 0)
+        self._input_seqs[player_id] = seq
+        return previous
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
@@ -0,0 +1,638 @@
+"""
+Shards Module
+-------------
+
+Module spreading the matches of the server over a pool of worker processes,
+one fixed timestep loop per process, so the number of concurrent matches grows
+with the number of CPU cores instead of being bound to the one core the
+interpreter lock allows a single process.
+
+The connection handlers stay in the server process. They hand a new match to
+the least loaded shard through a pipe and afterwards only touch the shared
+memory of that shard: they write the inputs of the players into it and read
+the snapshots the worker publishes after every tick. A worker reports a match
+that ended through a second pipe together with its score and statistics.
+"""
+import threading
+import time
+import multiprocessing
+from multiprocessing import connection
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from custom_exceptions import MatchCapacityError, SnapshotReadError
+from match.scheduler import MatchScheduler
+
+# numeric fields of Match1v1.share_state, the two player names are left out
+STATE_FIELDS = 20
+# mouse x, mouse y, actions and sequence number of the last input of a side
+INPUT_FIELDS = 4
+# ticks, skipped ticks, overruns and duration of the last tick of the worker
+STAT_FIELDS = 4
+# copies of a snapshot tried before the last complete one is used instead
+READ_ATTEMPTS = 100
+
+
+class ShardMemory:
+    """
+    Arrays of a shard living in one shared memory block.
+
+    The snapshots are guarded by a sequence lock: the worker makes the version
+    of a slot odd while it writes the state and even again when it is done, a
+    reader retries until it sees the same even version before and after its
+    copy. A reader gives up after READ_ATTEMPTS copies and returns the last
+    complete snapshot of the slot it has seen, so a worker stopped in the
+    middle of a write never blocks it. Inputs carry a sequence number written
+    after the values, the worker only applies an input when the number
+    changed.
+
+    Attributes
+    ----------
+    capacity : int
+        Number of match slots.
+    memory : SharedMemory
+        The shared memory block backing the arrays.
+    versions : numpy.ndarray
+        Sequence lock version of every slot.
+    states : numpy.ndarray
+        Latest snapshot of every slot.
+    inputs : numpy.ndarray
+        Latest input of both players of every slot.
+    stats : numpy.ndarray
+        Scheduler counters of the worker.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of match slots.
+    name : str, optional
+        Name of an existing block to attach to, a new block is created when
+        omitted.
+
+    Methods
+    -------
+    write_state(slot: int, state: list)
+        Publishes the snapshot of a match.
+    read_state(slot: int) -> list
+        Copies the latest snapshot of a slot.
+    write_input(slot: int, side: int, inputs: list)
+        Stores the input of a player.
+    read_input(slot: int, side: int) -> tuple
+        Reads the input of a player with its sequence number.
+    close()
+        Detaches from the block.
+    unlink()
+        Frees the block, called by its creator.
+    """
+
+    def __init__(self, capacity, name=None):
+        self.capacity = capacity
+        layout = ((np.int64, (capacity,)),
+                  (np.float64, (capacity, STATE_FIELDS)),
+                  (np.int64, (capacity, 2, INPUT_FIELDS)),
+                  (np.float64, (STAT_FIELDS,)))
+        offsets = [0]
+        for dtype, shape in layout:
+            offsets.append(offsets[-1] + np.dtype(dtype).itemsize * int(np.prod(shape)))
+        if name is None:
+            self.memory = SharedMemory(create=True, size=offsets[-1])
+        else:
+            self.memory = SharedMemory(name=name)
+
+        def view(index):
+            dtype, shape = layout[index]
+            return np.ndarray(shape, dtype=dtype, buffer=self.memory.buf, offset=offsets[index])
+
+        self.versions = view(0)
+        self.states = view(1)
+        self.inputs = view(2)
+        self.stats = view(3)
+        # last complete snapshot of every slot seen by this process
+        self._rows = [None] * capacity
+        if name is None:
+            for array in (self.versions, self.states, self.inputs, self.stats):
+                array[...] = 0
+
+    @property
+    def name(self):
+        """Name of the shared memory block."""
+        return self.memory.name
+
+    def write_state(self, slot, state):
+        """
+        Publish the snapshot of a match.
+
+        Parameters
+        ----------
+        slot : int
+            Slot of the match.
+        state : list
+            Output of Match1v1.share_state.
+        """
+        row = state[:3] + state[5:]
+        self.versions[slot] += 1
+        self.states[slot] = row
+        self.versions[slot] += 1
+        self._rows[slot] = row
+
+    def read_state(self, slot):
+        """
+        Copy the latest snapshot of a slot.
+
+        Returns
+        -------
+        list
+            The numeric fields of Match1v1.share_state, without the names.
+
+        Raises
+        ------
+        SnapshotReadError
+            If no complete copy was made and none was seen before.
+        """
+        for _ in range(READ_ATTEMPTS):
+            version = self.versions[slot]
+            if version % 2:
+                # let the writer finish instead of spinning on the version
+                time.sleep(0)
+                continue
+            row = self.states[slot].tolist()
+            if self.versions[slot] == version:
+                self._rows[slot] = row
+                break
+        else:
+            row = self._rows[slot]
+            if row is None:
+                raise SnapshotReadError()
+        return ([row[0], int(row[1]), int(row[2])] + row[3:17] +
+                [bool(flag) for flag in row[17:]])
+
+    def write_input(self, slot, side, inputs):
+        """
+        Store the input of a player, values first and the sequence number last.
+
+        Parameters
+        ----------
+        slot : int
+            Slot of the match.
+        side : int
+            1 or 2, the player the input belongs to.
+        inputs : list
+            Mouse position and action bitmask.
+        """
+        row = self.inputs[slot, side - 1]
+        row[:3] = (inputs[0][0], inputs[0][1], inputs[1])
+        row[3] += 1
+
+    def read_input(self, slot, side):
+        """
+        Read the input of a player.
+
+        Returns
+        -------
+        tuple
+            Sequence number and input list, the sequence number is None when
+            the input was being written and has to be read again later.
+        """
+        row = self.inputs[slot, side - 1]
+        sequence = int(row[3])
+        mouse_x, mouse_y, actions = row[:3].tolist()
+        if int(row[3]) != sequence:
+            return None, None
+        return sequence, [(mouse_x, mouse_y), actions]
+
+    def close(self):
+        """Detach from the shared memory block."""
+        self.versions = self.states = self.inputs = self.stats = None
+        self.memory.close()
+
+    def unlink(self):
+        """Free the shared memory block."""
+        self.memory.unlink()
+
+
+class ShardWorker(MatchScheduler):
+    """
+    Fixed timestep loop of one worker process.
+
+    Before every tick the worker takes the new matches from its command pipe
+    and the new inputs from the shared memory, after the tick it publishes the
+    snapshots and reports the matches that ended.
+
+    Attributes
+    ----------
+    memory : ShardMemory
+        Shared arrays of the shard.
+    commands : multiprocessing.connection.Connection
+        Receiving end of the commands of the server.
+    events : multiprocessing.connection.Connection
+        Sending end of the events of the worker.
+    slots : dict
+        Running matches by slot.
+    input_sequences : dict
+        Sequence numbers of the last applied input of both sides by slot.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration settings, reads the server section.
+    memory : ShardMemory
+        Shared arrays of the shard.
+    commands : multiprocessing.connection.Connection
+        Receiving end of the commands of the server.
+    events : multiprocessing.connection.Connection
+        Sending end of the events of the worker.
+    """
+
+    def __init__(self, config, memory, commands, events):
+        super().__init__(config)
+        self.memory = memory
+        self.commands = commands
+        self.events = events
+        self.slots = {}
+        self.input_sequences = {}
+
+    def receive_commands(self):
+        """
+        Handle the commands sent by the server since the last tick.
+        """
+        while self.commands.poll():
+            command = self.commands.recv()
+            if command[0] == "add":
+                _, slot, match = command
+                self.slots[slot] = match
+                self.input_sequences[slot] = [0, 0]
+                self.add_match(match)
+            elif command[0] == "stop":
+                self.stop()
+
+    def tick(self):
+        """
+        Advance the matches of the shard by one timestep and publish them.
+        """
+        self.receive_commands()
+        for slot, match in self.slots.items():
+            sequences = self.input_sequences[slot]
+            for side in (1, 2):
+                sequence, inputs = self.memory.read_input(slot, side)
+                if sequence is not None and sequence != sequences[side - 1]:
+                    sequences[side - 1] = sequence
+                    match.set_input(side, inputs)
+        super().tick()
+        for slot, match in list(self.slots.items()):
+            self.memory.write_state(slot, match.share_state())
+            if not match.playing:
+                del self.slots[slot]
+                del self.input_sequences[slot]
+                self.events.send(("ended", slot, match.score, match.get_match_stats()))
+        self.memory.stats[:] = (self.ticks, self.skipped_ticks, self.overruns,
+                                self.last_tick_duration)
+
+
+def run_shard(config, capacity, memory_name, commands, events):
+    """
+    Entry point of a worker process.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration settings.
+    capacity : int
+        Number of match slots of the shard.
+    memory_name : str
+        Name of the shared memory block of the shard.
+    commands : multiprocessing.connection.Connection
+        Receiving end of the commands of the server.
+    events : multiprocessing.connection.Connection
+        Sending end of the events of the worker.
+    """
+    memory = ShardMemory(capacity, name=memory_name)
+    try:
+        ShardWorker(config, memory, commands, events).run()
+    finally:
+        memory.close()
+        events.close()
+
+
+# pylint: disable=too-many-instance-attributes
+class RemoteMatch:
+    """
+    Server side stand-in of a match simulated by a shard.
+
+    Offers the part of the Match1v1 interface the server uses, the inputs and
+    snapshots go through the shared memory of the shard.
+
+    Attributes
+    ----------
+    p1_id : int
+        Identifier for player 1.
+    p2_id : int
+        Identifier for player 2.
+    p1 : PlayerBody
+        Player 1 as created by the server, only its name and elo are used.
+    p2 : PlayerBody
+        Player 2 as created by the server, only its name and elo are used.
+    score : tuple
+        Final score, (0, 0) while the match runs.
+    playing : bool
+        Flag indicating if the match is currently playing.
+    p1_end_game_notified : bool
+        Flag indicating if player 1 has been notified of game end.
+    p2_end_game_notified : bool
+        Flag indicating if player 2 has been notified of game end.
+    shard : Shard
+        The shard simulating the match.
+    slot : int
+        Slot of the match in the shard.
+    match_stats : tuple or None
+        Statistics reported by the shard when the match ended.
+    final_state : list or None
+        Last snapshot of the match, kept once the slot is released.
+
+    Parameters
+    ----------
+    match : Match1v1
+        The match sent to the shard.
+    shard : Shard
+        The shard simulating the match.
+    slot : int
+        Slot of the match in the shard.
+    """
+
+    def __init__(self, match, shard, slot):
+        self.p1_id = match.p1_id
+        self.p2_id = match.p2_id
+        self.p1 = match.p1
+        self.p2 = match.p2
+        self.score = match.score
+        self.playing = True
+        self.p1_end_game_notified = False
+        self.p2_end_game_notified = False
+        self.shard = shard
+        self.slot = slot
+        self.match_stats = None
+        self.final_state = None
+
+    def set_input(self, side, inputs):
+        """
+        Store the latest input of a player for the shard to pick up.
+
+        Parameters
+        ----------
+        side : int
+            1 or 2, the player the input belongs to.
+        inputs : list
+            Mouse position and action bitmask.
+        """
+        with self.shard.lock:
+            if self.playing:
+                self.shard.memory.write_input(self.slot, side, inputs)
+
+    def share_state(self):
+        """
+        Latest snapshot published by the shard.
+
+        Returns
+        -------
+        list
+            The same list as Match1v1.share_state.
+        """
+        state = self.final_state
+        if state is None:
+            # read without the lock of the shard, the slot may be released
+            # meanwhile but `finish` keeps the final snapshot before that
+            state = self.shard.memory.read_state(self.slot)
+            if self.final_state is not None:
+                state = self.final_state
+        return state[:3] + [self.p1.name, self.p2.name] + state[3:]
+
+    def finish(self, score, match_stats):
+        """
+        Record the end of the match, called with the lock of the shard held.
+
+        Parameters
+        ----------
+        score : tuple
+            Final score.
+        match_stats : tuple
+            Statistics of the match.
+        """
+        self.final_state = self.shard.memory.read_state(self.slot)
+        self.score = score
+        self.match_stats = match_stats
+        self.playing = False
+
+    def get_match_stats(self):
+        """
+        Retrieve the match statistics.
+
+        Returns
+        -------
+        tuple
+            A tuple containing match statistics.
+        """
+        return self.match_stats
+
+
+# pylint: disable=too-few-public-methods, too-many-instance-attributes
+class Shard:
+    """
+    Server side record of one worker process.
+
+    Attributes
+    ----------
+    index : int
+        Position of the shard in the pool.
+    process : multiprocessing.Process
+        The worker process.
+    memory : ShardMemory
+        Shared arrays of the shard.
+    commands : multiprocessing.connection.Connection
+        Sending end of the commands to the worker.
+    events : multiprocessing.connection.Connection
+        Receiving end of the events of the worker.
+    free_slots : list
+        Slots not used by any match.
+    matches : dict
+        Running matches by slot.
+    lock : threading.Lock
+        Guards the slots, the command pipe and the shared inputs.
+    """
+
+    def __init__(self, index, process, memory, commands, events):
+        self.index = index
+        self.process = process
+        self.memory = memory
+        self.commands = commands
+        self.events = events
+        self.free_slots = list(range(memory.capacity - 1, -1, -1))
+        self.matches = {}
+        self.lock = threading.Lock()
+
+
+# pylint: disable=too-many-instance-attributes
+class ShardPool:
+    """
+    Pool of worker processes simulating the matches of the server.
+
+    Attributes
+    ----------
+    config : dict
+        Configuration settings.
+    shard_count : int
+        Number of worker processes.
+    capacity : int
+        Number of match slots of every shard.
+    shards : list
+        The running shards.
+    running : bool
+        Flag keeping the event thread alive.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration settings, reads the server section.
+
+    Methods
+    -------
+    start()
+        Starts the worker processes and the event thread.
+    add_match(match: Match1v1) -> RemoteMatch
+        Hands a new match to the least loaded shard.
+    receive_events()
+        Handles the events of the workers until `stop` is called.
+    stats() -> list
+        Scheduler counters of every shard.
+    stop()
+        Stops the workers and frees their shared memory.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.shard_count = config["server"]["shards"]
+        self.capacity = config["server"]["shard_capacity"]
+        # spawn, a forked child would inherit the locks held by other threads
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self.shards = []
+        self.running = False
+        self._events_thread = None
+
+    def start(self):
+        """
+        Start the worker processes and the thread receiving their events.
+        """
+        for index in range(self.shard_count):
+            memory = ShardMemory(self.capacity)
+            commands_out, commands_in = self._context.Pipe(duplex=False)
+            events_out, events_in = self._context.Pipe(duplex=False)
+            process = self._context.Process(
+                target=run_shard, name=f"shard-{index}", daemon=True,
+                args=(self.config, self.capacity, memory.name, commands_out, events_in))
+            process.start()
+            commands_out.close()
+            events_in.close()
+            self.shards.append(Shard(index, process, memory, commands_in, events_out))
+        self.running = True
+        self._events_thread = threading.Thread(target=self.receive_events, daemon=True)
+        self._events_thread.start()
+
+    def add_match(self, match):
+        """
+        Hand a new match to the shard running the fewest matches.
+
+        Parameters
+        ----------
+        match : Match1v1
+            The match to be simulated.
+
+        Returns
+        -------
+        RemoteMatch
+            The stand-in the server keeps for the match.
+
+        Raises
+        ------
+        MatchCapacityError
+            If every slot of every shard is taken.
+        """
+        with self._lock:
+            shard = min(self.shards, key=lambda shard: len(shard.matches))
+            with shard.lock:
+                if not shard.free_slots:
+                    raise MatchCapacityError()
+                slot = shard.free_slots.pop()
+                shard.memory.inputs[slot] = 0
+                shard.memory.write_state(slot, match.share_state())
+                remote = RemoteMatch(match, shard, slot)
+                shard.matches[slot] = remote
+                shard.commands.send(("add", slot, match))
+        return remote
+
+    def receive_events(self):
+        """
+        Handle the events of the workers until `stop` is called.
+        """
+        shards = {shard.events: shard for shard in self.shards}
+        while self.running and shards:
+            for ready in connection.wait(list(shards), timeout=0.5):
+                shard = shards[ready]
+                try:
+                    event = ready.recv()
+                except EOFError:
+                    if self.running:
+                        print(f"Shard {shard.index} stopped")
+                    del shards[ready]
+                    continue
+                if event[0] == "ended":
+                    _, slot, score, match_stats = event
+                    with shard.lock:
+                        shard.matches.pop(slot).finish(score, match_stats)
+                        shard.free_slots.append(slot)
+
+    def stats(self):
+        """
+        Scheduler counters of every shard.
+
+        Returns
+        -------
+        list
+            One dict per shard with its number of matches, ticks, skipped
+            ticks, overruns and the duration of its last tick.
+        """
+        result = []
+        for shard in self.shards:
+            ticks, skipped, overruns, last_tick = shard.memory.stats.tolist()
+            result.append({"matches": len(shard.matches), "ticks": int(ticks),
+                           "skipped_ticks": int(skipped), "overruns": int(overruns),
+                           "last_tick_duration": last_tick})
+        return result
+
+    def stop(self):
+        """
+        Stop the workers and free their shared memory.
+        """
+        self.running = False
+        for shard in self.shards:
+            with shard.lock:
+                try:
+                    shard.commands.send(("stop",))
+                except (BrokenPipeError, OSError):
+                    pass
+        for shard in self.shards:
+            shard.process.join(timeout=5)
+            if shard.process.is_alive():
+                shard.process.terminate()
+                shard.process.join()
+        if self._events_thread is not None:
+            self._events_thread.join()
+        for shard in self.shards:
+            shard.commands.close()
+            shard.events.close()
+            shard.memory.close()
+            shard.memory.unlink()
+        self.shards = []
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
@@ -11,6 +11,7 @@ import pygame
 from menu.menu import Menu
 from menu_elements.button import Button
 import utilities
+from assets import ASSETS
 from match.elo import Elo
 
 # pylint: disable=too-many-instance-attributes
@@ -99,16 +100,16 @@ class EndScreenMenu(Menu):
 # Display the winner
             winner_text = ""
             if self.winner is None:
-                winner_text = self.font.render(f"Tie!", True, (255, 255, 255))
+                winner_text = ASSETS.render(self.font, f"Tie!", (255, 255, 255))
             else:
-                winner_text = self.font.render(
-                    f"Winner: {self.winner}", True, (255, 255, 255))
+                winner_text = ASSETS.render(
+                    self.font, f"Winner: {self.winner}", (255, 255, 255))
             self.game.display.blit(winner_text, (first_column_x, 100))
 
             # Display headers
             headers = ["Player", "Touches", "Goals", "Elos"]
             for i, header in enumerate(headers):
-                header_text = stat_font.render(header, True, (255, 255, 255))
+                header_text = ASSETS.render(stat_font, header, (255, 255, 255))
                 x_pos = [first_column_x, second_column_x,
                          third_column_x, fourth_column_x][i]
                 self.game.display.blit(header_text, (x_pos, header_start_y))
@@ -118,24 +119,24 @@ class EndScreenMenu(Menu):
             idx = 0
             for entity, stats in self.stats.items():
                 # Player name
-                entity_text = stat_font.render(
-                    f"{entity}", True, (255, 255, 255))
+                entity_text = ASSETS.render(
+                    stat_font, f"{entity}", (255, 255, 255))
                 self.game.display.blit(entity_text, (first_column_x, y_offset))
 
                 # Touches
-                touches_text = stat_font.render(
-                    f"{stats['touches']}", True, (255, 255, 255))
+                touches_text = ASSETS.render(
+                    stat_font, f"{stats['touches']}", (255, 255, 255))
                 self.game.display.blit(
                     touches_text, (second_column_x, y_offset))
 
                 # Goals
-                goals_text = stat_font.render(
-                    f"{stats['goals']}", True, (255, 255, 255))
+                goals_text = ASSETS.render(
+                    stat_font, f"{stats['goals']}", (255, 255, 255))
                 self.game.display.blit(goals_text, (third_column_x, y_offset))
 
                 # Elos
-                elos_text = stat_font.render(
-                    f"{self.old_elo[idx]} + ({self.new_elos[idx]-self.old_elo[idx]})", True, (255, 255, 255))
+                elos_text = ASSETS.render(
+                    stat_font, f"{self.old_elo[idx]} + ({self.new_elos[idx]-self.old_elo[idx]})", (255, 255, 255))
                 self.game.display.blit(elos_text, (fourth_column_x, y_offset))
                 idx += 1
 
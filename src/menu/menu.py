@@ -16,6 +16,7 @@ import pygame
 import numpy as np
 
 import utilities
+from assets import ASSETS
 from menu_elements.input_box import InputBox
 from menu_elements.button import Button
 from menu_elements.table import Table
@@ -335,9 +336,10 @@ class MainMenu(Menu):
             self.game.display.fill((0, 0, 0))
             self.game.display.blit(
                 utilities.get_image("background_main"), (0, 0))
-            # need to regenerate every time because the name is dynamically changing
-            self.logged_user_text = utilities.get_font(40).render(
-                self.game.user_credentials.get("name"), True, self.game.config["colours"]["aqua"])
+            # the name may change, the text cache renders each name only once
+            self.logged_user_text = ASSETS.render(
+                utilities.get_font(40), self.game.user_credentials.get("name"),
+                self.game.config["colours"]["aqua"])
             self.logged_user_rect = self.logged_user_text.get_rect(
                 topleft=(15, 15))
             # draw texts
@@ -677,10 +679,7 @@ class SettingsMenu(Menu):
             utilities.draw_text(utilities.get_map_names(
                 self.map), 30, 980, 150, self.game.display)
             # map preview
-            self.game.display.blit(
-                pygame.transform.rotate(pygame.image.load(
-                    self.map).convert_alpha(), 90),
-                (840, 170))
+            self.game.display.blit(ASSETS.variant(self.map, angle=90), (840, 170))
             # skin preview
             utilities.draw_text("Your skin", 30, 200, 200, self.game.display)
             # bliting player skin
@@ -867,8 +866,7 @@ class RankedMenu(Menu):
                        ["ranked_background_colour"].values())
             self.game.display.fill((r, g, b))
             # draw trophies on the screen
-            border = pygame.transform.scale_by(
-                utilities.get_image(self.division), 0.4)
+            border = utilities.get_image(self.division, scale=0.4)
             self.game.display.blit(utilities.get_image("ranks"), (0, 400))
             # draw player and his stats
             utilities.draw_text("Your stats", 35, 470, 130,
@@ -983,6 +981,7 @@ class MatchHistoryMenu(Menu):
     A subclass of Menu for displaying the match history in a game.
 
     This menu shows the player's match history, including separate tables for solo and duo games.
+    The history is browsed page by page, the server decides how many matches a page holds.
 
     Attributes
     ----------
@@ -994,6 +993,11 @@ class MatchHistoryMenu(Menu):
         Table to display match history for solo games.
     draw_solo : bool
         Flag to indicate whether to draw the solo games table.
+    page_starts : dict
+        Cursors of the pages shown so far for solo (True) and duo (False) games,
+        the last one is the shown page.
+    pages : dict
+        Rows and next page cursor of the shown solo and duo page.
 
     Parameters
     ----------
@@ -1012,61 +1016,62 @@ class MatchHistoryMenu(Menu):
         self.elements.add(self.match_history_table)
         self.elements.add(self.back_button_hm)
         self.draw_solo = True
+        self.page_starts = {True: [None], False: [None]}
+        self.pages = {}
 
     def display_menu(self):
         """
-        Gets best 100 player in the world.
+        Shows the latest page of the player's match history.
         """
         self.run_display = True
-        data_solo, data_duo = self.get_match_history()
+        self.page_starts = {True: [None], False: [None]}
+        self.pages = {}
+        self.show_page(self.draw_solo)
         while self.run_display:
             self.share_status()
             self.game.check_inputs()
             self.check_events()
             self.game.display.fill((0, 0, 0))
-            if self.draw_solo:
-                utilities.draw_text("Press arrows to change to duo match history",
-                                    18, 640, 700, self.game.display)
-                self.match_history_table.header = "MATCH HISTORY SOLO"
-            else:
-                utilities.draw_text("Press arrows to change to solo match history",
-                                    18, 640, 700, self.game.display)
-                self.match_history_table.header = "MATCH HISTORY DUO"
+            mode = "duo" if self.draw_solo else "solo"
+            utilities.draw_text(f"Press left/right to change to {mode} match history, "
+                                f"down/up for older/newer matches (page {len(self.page_starts[self.draw_solo])})",
+                                18, 640, 700, self.game.display)
+            self.match_history_table.header = "MATCH HISTORY SOLO" if self.draw_solo else "MATCH HISTORY DUO"
             self.elements.update(self.game.display)
-            if self.draw_solo:
-                self.match_history_table.insert_data(
-                    data=data_solo, display=self.game.display)
-            else:
-                self.match_history_table.insert_data(
-                    data=data_duo, display=self.game.display)
+            self.match_history_table.insert_data(
+                data=self.pages[self.draw_solo][0], display=self.game.display)
             self.match_history_table.create_positions = False
             self.blit_screen()
 
-    def get_match_history(self):
+    def show_page(self, solo):
         """
-        Gets players match history.
+        Loads the page starting at the last cursor of `page_starts`.
         """
-        data_solo, data_duo = self.game.unpack_match_history_data(self.game.net.send(
-            self.game.parse_data("get_match_history", [self.game.user_credentials["name"]])))
-        final_data_solo = []
-        final_data_duo = []
-        for row in data_solo:
-            final_data_solo += [str(row[1]), str(row[3]),
-                                str(row[5]), str(row[6]), str(row[4]), str(row[2])]
-        if len(data_solo) < 10:
-            for _ in range(len(data_solo) + 1, 11):
-                final_data_solo += ["NA", "NA", "NA", "NA", "NA", "NA"]
-        for row in data_duo:
-            final_data_duo += [str(row[1]) + "-" + str(row[2]), str(row[5]) + "-" + str(row[6]), str(
-                row[9]), str(row[10]), str(row[7]) + "-" + str(row[8]), str(row[3]) + "-" + str(row[4])]
-        if len(data_duo) < 10:
-            for _ in range(len(data_duo) + 1, 11):
-                final_data_duo += ["NA", "NA", "NA", "NA", "NA", "NA"]
-        return (final_data_solo, final_data_duo)
+        self.pages[solo] = self.get_match_history_page(solo, self.page_starts[solo][-1])
+
+    def get_match_history_page(self, solo, before):
+        """
+        Gets one page of the players match history, formatted for the table.
+        """
+        rows, next_before = self.game.unpack_match_history_page_data(self.game.net.send(
+            self.game.parse_data("get_match_history_page",
+                                 [self.game.user_credentials["name"], solo, before])))
+        final_data = []
+        for row in rows:
+            if solo:
+                final_data += [str(row[1]), str(row[3]),
+                               str(row[5]), str(row[6]), str(row[4]), str(row[2])]
+            else:
+                final_data += [str(row[1]) + "-" + str(row[2]), str(row[5]) + "-" + str(row[6]), str(
+                    row[9]), str(row[10]), str(row[7]) + "-" + str(row[8]), str(row[3]) + "-" + str(row[4])]
+        if len(rows) < 10:
+            for _ in range(len(rows) + 1, 11):
+                final_data += ["NA", "NA", "NA", "NA", "NA", "NA"]
+        return (final_data, next_before)
 
     def check_events(self):
         """
-        Gets players match history.
+        Switches between solo and duo games and between the pages.
         """
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -1077,8 +1082,16 @@ class MatchHistoryMenu(Menu):
                     self.run_display = False
                     self.game.curr_menu = self.game.main_menu
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT or event.key == pygame.K_RIGHT or event.key == pygame.K_UP or event.key == pygame.K_DOWN:
+                if event.key == pygame.K_LEFT or event.key == pygame.K_RIGHT:
                     self.draw_solo = not self.draw_solo
+                    if self.draw_solo not in self.pages:
+                        self.show_page(self.draw_solo)
+                elif event.key == pygame.K_DOWN and self.pages[self.draw_solo][1] is not None:
+                    self.page_starts[self.draw_solo].append(self.pages[self.draw_solo][1])
+                    self.show_page(self.draw_solo)
+                elif event.key == pygame.K_UP and len(self.page_starts[self.draw_solo]) > 1:
+                    self.page_starts[self.draw_solo].pop()
+                    self.show_page(self.draw_solo)
 
 
 class CreditsMenu(Menu):
@@ -8,6 +8,7 @@ RuntimeError
 from typing import Tuple, Union
 import pygame
 import utilities
+from assets import ASSETS
 
  # pylint: disable=too-many-instance-attributes
 class Button(pygame.sprite.Sprite):
@@ -127,7 +128,7 @@ class Button(pygame.sprite.Sprite):
         self.font = font
         self.base_color, self.hovering_color = base_color, hovering_color
         self.text_input = text_input
-        self.text = self.font.render(self.text_input, True, self.base_color)
+        self.text = ASSETS.render(self.font, self.text_input, self.base_color)
         if self.image is None:
             self.image = self.text
         self.rect = self.image.get_rect(center=(self.x_pos, self.y_pos))
@@ -224,12 +225,11 @@ class Button(pygame.sprite.Sprite):
             When the coordinates are outside the window screen bounds
         """
         # the error handling is done by the check_for_input()
+        # both labels are rendered once and then taken from the text cache
         if self.check_for_input(position=position):
-            self.text = self.font.render(self.text_input, True,
-                                         self.hovering_color)
+            self.text = ASSETS.render(self.font, self.text_input, self.hovering_color)
         else:
-            self.text = self.font.render(self.text_input, True,
-                                         self.base_color)
+            self.text = ASSETS.render(self.font, self.text_input, self.base_color)
         return self
 
 
@@ -7,6 +7,7 @@ RuntimeError
 """
 from typing import Dict
 import pygame
+from assets import ASSETS
 pygame.init()
 # initializing basic font for the boxes
 FONT = pygame.font.Font(None, 32)
@@ -104,7 +105,7 @@ class InputBox:
         self.color = self.color_inactive
         self.text = text
         self.font = font
-        self.txt_surface = self.font.render(text, True, self.color)
+        self.txt_surface = ASSETS.render(self.font, text, self.color)
         self.active = False
         self.hide = hide
 
@@ -146,10 +147,10 @@ class InputBox:
                     self.text += event.unicode
         # Re-render the text with either stars or the text itself.
         if not self.hide:
-            self.txt_surface = self.font.render(self.text, True, self.color)
+            self.txt_surface = ASSETS.render(self.font, self.text, self.color)
         else:
             stars = "*" * len(self.text)
-            self.txt_surface = self.font.render(stars, True, self.color)
+            self.txt_surface = ASSETS.render(self.font, stars, self.color)
         return self
 
     def update(self) -> "InputBox":
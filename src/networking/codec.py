@@ -0,0 +1,372 @@
+"""Codec Module
+
+This module serializes packets into frame payloads. The two packets sent on
+every frame of a match, the game_state_1 snapshot and the ingame input, use
+a fixed binary layout, everything else falls back to pickle. The first byte
+of every payload is the MessageType telling the receiver which one it is.
+
+Snapshots are numbered and every input acknowledges the last snapshot the
+client received. Inputs are numbered as well, every snapshot carries the
+number of the input the server simulated it with. The server then sends only the fields that differ from the
+acknowledged snapshot, or a full keyframe when there is no such snapshot
+(start of the connection, snapshot dropped from the history). A delta of a
+snapshot the client no longer has decodes into a stale_snapshot packet and
+the next input acknowledges 0, which makes the server send a keyframe.
+
+Classes:
+    MessageType: Numeric identifier of the payload layout.
+    PacketCodec: Codec of one end of a connection, keeps the snapshot history.
+
+Functions:
+    encode_packet(packet: dict) -> bytes
+    decode_packet(payload: bytes) -> dict
+"""
+import pickle
+import struct
+from enum import IntEnum
+from functools import lru_cache
+
+from custom_exceptions import InvalidFrameError
+
+
+class MessageType(IntEnum):
+    """Identifier stored in the first byte of every payload."""
+    PICKLE = 0
+    GAME_STATE = 1
+    INPUT = 2
+    GAME_STATE_DELTA = 3
+
+
+# sequence number, side, remaining time, score, positions of both players,
+# hooks of both players, dash and hook cooldowns of both players, ball, flags
+# (p1 hooking, p2 hooking, tiebreak), acknowledged input
+GAME_STATE = struct.Struct("!BIBfHH4f4f4f2fBI")
+# sequence number, sequence number of the base snapshot, bitmask of the
+# fields that changed, followed by the changed values in field order
+GAME_STATE_DELTA = struct.Struct("!BIII")
+# sender id, acknowledged snapshot, mouse position, bitmask of the actions,
+# input sequence number
+INPUT = struct.Struct("!BIIhhBI")
+# length of the utf-8 encoded player name
+NAME_LENGTH = struct.Struct("!B")
+# number of elements in the data list of the game_state_1 packet
+GAME_STATE_FIELDS = 24
+# struct format of every element of the data list inside a delta,
+# None marks the names which are sent as a length byte and utf-8 bytes
+FIELD_FORMATS = ("B", "f", "H", "H", None, None) + ("f",) * 14 + ("?",) * 3 + ("I",)
+# snapshots kept on both sides to compute and apply the deltas
+SNAPSHOT_HISTORY = 32
+
+class PacketCodec:
+    """PacketCodec Class
+
+    Codec of one end of a connection. The server side remembers the
+    snapshots it sent and the last one the client acknowledged, the client
+    side remembers the snapshots it received to apply the deltas on them and
+    acknowledges the newest one with every input.
+
+    Attributes
+    ----------
+    history : int
+        Number of snapshots remembered in each direction.
+    sent : dict
+        Snapshots sent to the peer by sequence number, oldest first.
+    acked : int
+        Sequence number of the last snapshot acknowledged by the peer, 0 if none.
+    next_seq : int
+        Sequence number of the next snapshot sent.
+    received : dict
+        Snapshots received from the peer by sequence number, oldest first.
+    last_received : int
+        Sequence number of the newest snapshot received, 0 if none.
+
+    Methods
+    -------
+    encode(packet: dict) -> bytes:
+        Serializes a packet into a frame payload.
+    decode(payload: bytes) -> dict:
+        Deserializes a frame payload into a packet.
+    acknowledge(seq: int):
+        Marks a sent snapshot as received by the peer.
+    """
+
+    def __init__(self, history: int = SNAPSHOT_HISTORY):
+        self.history = history
+        self.sent = {}
+        self.acked = 0
+        self.next_seq = 1
+        self.received = {}
+        self.last_received = 0
+
+    def encode(self, packet) -> bytes:
+        """Serialize a packet into a frame payload.
+
+        Parameters
+        ----------
+        packet : dict or None
+            The packet as created by Server.create_packet or Game.parse_data.
+
+        Returns
+        -------
+        bytes
+            The payload starting with its MessageType.
+        """
+        if _is_snapshot(packet):
+            return self._encode_snapshot(packet["data"])
+        return _encode_message(packet, self.last_received)
+
+    def decode(self, payload):
+        """Deserialize a frame payload into a packet.
+
+        Parameters
+        ----------
+        payload : bytes or memoryview
+            The payload of one frame.
+
+        Returns
+        -------
+        dict or None
+            The packet in the same shape it had before encoding, a
+            stale_snapshot packet for a delta of a snapshot that is no
+            longer remembered.
+
+        Raises
+        ------
+        InvalidFrameError
+            If the payload is empty, truncated or of unknown type.
+        """
+        if len(payload) == 0:
+            raise InvalidFrameError("Empty payload")
+        message_type = payload[0]
+        if message_type == MessageType.PICKLE:
+            return pickle.loads(payload[1:])
+        try:
+            if message_type == MessageType.INPUT:
+                packet, ack = _decode_input(payload)
+                self.acknowledge(ack)
+                return packet
+            if message_type == MessageType.GAME_STATE:
+                seq, data = _decode_keyframe(payload)
+            elif message_type == MessageType.GAME_STATE_DELTA:
+                seq, data = self._decode_delta(payload)
+                if data is None:
+                    # acknowledging 0 makes the server fall back to a keyframe
+                    self.last_received = 0
+                    return _stale_packet()
+            else:
+                raise InvalidFrameError(f"Unknown message type {message_type}")
+        except (IndexError, struct.error, UnicodeDecodeError) as error:
+            raise InvalidFrameError(f"Malformed payload: {error}") from error
+        self.received[seq] = tuple(data)
+        self.last_received = seq
+        if len(self.received) > self.history:
+            del self.received[next(iter(self.received))]
+        return _snapshot_packet(data)
+
+    def acknowledge(self, seq: int):
+        """Mark a sent snapshot as received by the peer.
+
+        Older snapshots are forgotten since the following deltas are based
+        on this one. Unknown numbers, including 0 sent by a client that
+        lost its history, are ignored so the next snapshot is a keyframe.
+
+        Parameters
+        ----------
+        seq : int
+            Sequence number of the snapshot.
+        """
+        if seq not in self.sent:
+            if seq == 0:
+                self.acked = 0
+            return
+        self.acked = seq
+        for old in list(self.sent):
+            if old == seq:
+                break
+            del self.sent[old]
+
+    def _encode_snapshot(self, data) -> bytes:
+        """Encode a snapshot as a delta of the acknowledged one, or as a keyframe."""
+        seq = self.next_seq
+        self.next_seq = seq % 0xFFFFFFFF + 1
+        base = self.sent.get(self.acked)
+        self.sent[seq] = tuple(data)
+        if len(self.sent) > self.history:
+            del self.sent[next(iter(self.sent))]
+        if base is None:
+            return _encode_keyframe(seq, data)
+        return _encode_delta(seq, self.acked, base, data)
+
+    def _decode_delta(self, payload):
+        """Apply a delta on the remembered base snapshot, None if it is unknown."""
+        _, seq, base_seq, mask = GAME_STATE_DELTA.unpack_from(payload)
+        base = self.received.get(base_seq)
+        if base is None:
+            return seq, None
+        if mask >> GAME_STATE_FIELDS:
+            raise struct.error("changed fields out of range")
+        data = list(base)
+        layout = _delta_layout(mask)
+        values = iter(layout.unpack_from(payload, GAME_STATE_DELTA.size))
+        offset = GAME_STATE_DELTA.size + layout.size
+        for index in range(GAME_STATE_FIELDS):
+            if mask >> index & 1:
+                if FIELD_FORMATS[index] is None:
+                    data[index], offset = _read_name(payload, offset)
+                else:
+                    data[index] = next(values)
+        return seq, data
+
+
+def encode_packet(packet) -> bytes:
+    """Serialize a packet without any connection state.
+
+    Snapshots are always encoded as keyframes and inputs acknowledge nothing.
+
+    Parameters
+    ----------
+    packet : dict or None
+        The packet as created by Server.create_packet or Game.parse_data.
+
+    Returns
+    -------
+    bytes
+        The payload starting with its MessageType.
+    """
+    if _is_snapshot(packet):
+        return _encode_keyframe(0, packet["data"])
+    return _encode_message(packet, 0)
+
+
+def decode_packet(payload):
+    """Deserialize a frame payload without any connection state.
+
+    Parameters
+    ----------
+    payload : bytes or memoryview
+        The payload of one frame.
+
+    Returns
+    -------
+    dict or None
+        The packet in the same shape it had before encoding.
+
+    Raises
+    ------
+    InvalidFrameError
+        If the payload is malformed or a delta.
+    """
+    if len(payload) == 0:
+        raise InvalidFrameError("Empty payload")
+    message_type = payload[0]
+    if message_type == MessageType.PICKLE:
+        return pickle.loads(payload[1:])
+    if message_type == MessageType.GAME_STATE_DELTA:
+        raise InvalidFrameError("Delta decoded without the connection state")
+    try:
+        if message_type == MessageType.INPUT:
+            return _decode_input(payload)[0]
+        if message_type == MessageType.GAME_STATE:
+            return _snapshot_packet(_decode_keyframe(payload)[1])
+    except (IndexError, struct.error, UnicodeDecodeError) as error:
+        raise InvalidFrameError(f"Malformed payload: {error}") from error
+    raise InvalidFrameError(f"Unknown message type {message_type}")
+
+
+def _is_snapshot(packet) -> bool:
+    """Whether the packet is a game_state_1 snapshot with the binary layout."""
+    return (isinstance(packet, dict) and packet["flag"] == "game_state_1"
+            and len(packet["data"]) == GAME_STATE_FIELDS)
+
+
+def _snapshot_packet(data) -> dict:
+    """Wrap decoded snapshot data into the packet shape the client expects."""
+    return {"time": None, "sender": "server", "flag": "game_state_1", "data": data}
+
+
+def _stale_packet() -> dict:
+    """Packet replacing a delta that cannot be applied, it carries no data."""
+    return {"time": None, "sender": "server", "flag": "stale_snapshot", "data": None}
+
+
+def _encode_message(packet, ack: int) -> bytes:
+    """Encode every packet but the snapshots, inputs acknowledge `ack`."""
+    if isinstance(packet, dict) and packet["flag"] == "ingame" and len(packet["data"]) == 3:
+        return _encode_input(packet["sender"], ack, packet["data"])
+    return bytes((MessageType.PICKLE,)) + pickle.dumps(packet)
+
+
+@lru_cache(maxsize=1024)
+def _delta_layout(mask: int) -> struct.Struct:
+    """Struct of the fixed size values present in a delta with this mask."""
+    formats = "".join(FIELD_FORMATS[index] for index in range(GAME_STATE_FIELDS)
+                      if mask >> index & 1 and FIELD_FORMATS[index] is not None)
+    return struct.Struct("!" + formats)
+
+
+def _encode_name(name: str) -> bytes:
+    """Length byte followed by the utf-8 encoded name."""
+    encoded = name.encode("utf-8")
+    return NAME_LENGTH.pack(len(encoded)) + encoded
+
+
+def _read_name(payload, offset: int):
+    """Read a name written by _encode_name, returns it with the next offset."""
+    start = offset + NAME_LENGTH.size
+    end = start + payload[offset]
+    if end > len(payload):
+        raise struct.error("name exceeds the payload")
+    return bytes(payload[start:end]).decode("utf-8"), end
+
+
+def _encode_keyframe(seq: int, data) -> bytes:
+    """Pack the full data list of a game_state_1 packet."""
+    flags = (1 if data[20] else 0) | (2 if data[21] else 0) | (4 if data[22] else 0)
+    return b"".join((GAME_STATE.pack(MessageType.GAME_STATE, seq, data[0], data[1],
+                                     data[2], data[3], *data[6:20], flags, data[23]),
+                     _encode_name(data[4]), _encode_name(data[5])))
+
+
+def _decode_keyframe(payload):
+    """Unpack a full game_state_1 packet, returns its sequence number and data."""
+    fields = GAME_STATE.unpack_from(payload)
+    name_1, offset = _read_name(payload, GAME_STATE.size)
+    name_2, _ = _read_name(payload, offset)
+    flags = fields[20]
+    return fields[1], [*fields[2:6], name_1, name_2, *fields[6:20],
+                       bool(flags & 1), bool(flags & 2), bool(flags & 4), fields[21]]
+
+
+def _encode_delta(seq: int, base_seq: int, base, data) -> bytes:
+    """Pack only the elements of the data list that differ from the base."""
+    mask = 0
+    values = []
+    names = []
+    for index in range(GAME_STATE_FIELDS):
+        if data[index] != base[index]:
+            mask |= 1 << index
+            if FIELD_FORMATS[index] is None:
+                names.append(_encode_name(data[index]))
+            else:
+                values.append(data[index])
+    return b"".join((GAME_STATE_DELTA.pack(MessageType.GAME_STATE_DELTA, seq,
+                                           base_seq, mask),
+                     _delta_layout(mask).pack(*values), *names))
+
+
+def _encode_input(sender, ack: int, data) -> bytes:
+    """Pack the data list of an ingame packet."""
+    mouse_pos, actions, seq = data
+    return INPUT.pack(MessageType.INPUT, int(sender), ack, mouse_pos[0],
+                      mouse_pos[1], actions, seq)
+
+
+def _decode_input(payload):
+    """Unpack an ingame packet, returns it with the acknowledged snapshot."""
+    _, sender, ack, mouse_x, mouse_y, actions, seq = INPUT.unpack_from(payload)
+    return ({"time": None, "sender": sender, "flag": "ingame",
+             "data": [(mouse_x, mouse_y), actions, seq]}, ack)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
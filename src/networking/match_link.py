@@ -0,0 +1,176 @@
+"""Match Link Module
+
+This module runs the network exchange of a match on its own thread, so the
+client draws its frames at a fixed rate whatever the round trip time. The
+render loop sends its inputs without waiting, the network thread publishes
+the newest reply of the server into a single value slot.
+
+Classes:
+    LatestSlot: Holds the newest value written into it.
+    MatchLink: Thread receiving the snapshots of a match.
+"""
+import socket
+import threading
+import time
+from collections import deque
+
+
+class LatestSlot:
+    """LatestSlot Class
+
+    Holds the newest value written into it, older values are overwritten.
+    A write replaces one reference, which is atomic, so the slot needs no
+    lock as long as a single thread writes it.
+
+    Attributes
+    ----------
+    version : int
+        Number of values written.
+
+    Methods
+    -------
+    put(value):
+        Replaces the value.
+    get() -> obj any:
+        The newest value, None before the first write.
+    """
+
+    def __init__(self):
+        self._entry = (0, None)
+
+    @property
+    def version(self):
+        """Number of values written."""
+        return self._entry[0]
+
+    def put(self, value):
+        """Replace the value.
+
+        Parameters
+        ----------
+        value : obj any
+            The new value.
+        """
+        self._entry = (self._entry[0] + 1, value)
+
+    def get(self):
+        """The newest value.
+
+        Returns
+        -------
+        obj any
+            None before the first write.
+        """
+        return self._entry[1]
+
+
+# pylint: disable=too-many-instance-attributes
+class MatchLink(threading.Thread):
+    """MatchLink Class
+
+    Sends the inputs of a match as soon as they are made and publishes the
+    replies of the server from its own thread. The packets are pipelined, the
+    server answers them in order, so the inputs reach the server at the rate
+    they are made whatever the round trip time. The thread ends once every
+    sent packet is answered after the match ended, the connection failed or
+    `stop` was called, which leaves the connection ready for the menus.
+
+    Attributes
+    ----------
+    net : Network
+        The connection to the server, only read by this thread while it runs.
+    replies : LatestSlot
+        The newest reply of the server, a packet or the error message.
+    max_in_flight : int
+        Most packets sent and not answered yet, further inputs are dropped.
+    round_trip : float
+        Seconds the last answered packet took.
+
+    Parameters
+    ----------
+    net : Network
+        The connection to the server.
+    max_in_flight : int
+        Most packets sent and not answered yet.
+
+    Methods
+    -------
+    send(packet) -> bool:
+        Sends an input packet without waiting for the reply.
+    run():
+        Reads the replies until the exchange ends.
+    stop():
+        Stops sending, the thread ends once the sent packets are answered.
+    """
+
+    def __init__(self, net, max_in_flight):
+        super().__init__(name="match-link", daemon=True)
+        self.net = net
+        self.replies = LatestSlot()
+        self.max_in_flight = max_in_flight
+        self.round_trip = 0.0
+        self._sent_at = deque()
+        self._stopped = False
+        self._finished = False
+        self._condition = threading.Condition()
+
+    def send(self, packet):
+        """Send an input packet without waiting for the reply.
+
+        Parameters
+        ----------
+        packet : dict
+            The ingame packet.
+
+        Returns
+        -------
+        bool
+            False if the packet was dropped, because the exchange is over or
+            too many packets wait for their reply.
+        """
+        with self._condition:
+            if self._stopped or len(self._sent_at) >= self.max_in_flight:
+                return False
+            try:
+                self.net.post(packet)
+            except socket.error:
+                # the thread ends, the render loop sees it is no longer alive
+                self._stopped = True
+                self._condition.notify()
+                return False
+            self._sent_at.append(time.perf_counter())
+            self._condition.notify()
+        return True
+
+    def run(self):
+        """Read the replies until the exchange ends."""
+        while True:
+            with self._condition:
+                while not self._sent_at and not self._stopped:
+                    self._condition.wait()
+                if not self._sent_at:
+                    return
+            reply = self.net.receive()
+            with self._condition:
+                self.round_trip = time.perf_counter() - self._sent_at.popleft()
+                if isinstance(reply, dict) and reply["flag"] == "stale_snapshot":
+                    # a delta of a lost snapshot, the next input asks for a keyframe
+                    continue
+                if isinstance(reply, str):
+                    # the error message of a failed connection, nothing more will come
+                    self._stopped = True
+                    self._sent_at.clear()
+                elif reply is None or reply["flag"] != "game_state_1":
+                    # None answers the inputs of a player no longer in a match
+                    self._stopped = True
+            # the replies to the inputs sent after the end are only drained
+            if not self._finished:
+                self._finished = reply is None or isinstance(reply, str) \
+                    or reply["flag"] != "game_state_1"
+                self.replies.put(reply)
+
+    def stop(self):
+        """Stop sending, the thread ends once the sent packets are answered."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
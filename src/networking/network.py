@@ -1,13 +1,17 @@
 """Network Module
 
 This module provides a simple Network class for handling socket communication.
+Packets are exchanged as length-prefixed frames, see networking.protocol,
+and serialized by networking.codec.
 
 Classes:
     Network: A class for managing socket communication.
 """
-import pickle
 import socket
 
+from networking.protocol import FrameReader, send_frame
+from networking.codec import PacketCodec
+
 
 class Network:
     """Network Class
@@ -24,6 +28,10 @@ class Network:
         The port number for the connection.
     addr : tuple
         A tuple containing the host and port (host, port).
+    reader : FrameReader
+        Reassembles the frames received from the server.
+    codec : PacketCodec
+        Serializes the packets, remembers the snapshots the deltas are based on.
 
     Methods
     -------
@@ -33,6 +41,10 @@ class Network:
         Connects to the specified host and port.
     send(data: str) -> str:
         Sends data over the socket and receives a response.
+    post(data):
+        Sends data over the socket without waiting for the response.
+    receive() -> str:
+        Receives the response to the oldest unanswered packet.
     """
 
     def __init__(self):
@@ -40,6 +52,8 @@ class Network:
         self.host = "localhost"
         self.port = 5555
         self.addr = (self.host, self.port)
+        self.reader = FrameReader(self.client)
+        self.codec = PacketCodec()
 
     def connect(self):
         """Connect to the specified host and port.
@@ -50,7 +64,7 @@ class Network:
             A message indicating the status of the connection.
         """
         self.client.connect(self.addr)
-        return self.client.recv(2048).decode()
+        return bytes(self.reader.read_frame()).decode()
 
     def send(self, data):
         """Send data over the socket and receive a response.
@@ -71,8 +85,43 @@ class Network:
             If an error occurs during socket communication.
         """
         try:
-            self.client.send(pickle.dumps(data))
-            reply = pickle.loads(self.client.recv(2048))
+            self.post(data)
+        except socket.error as e:
+            return str(e)
+        return self.receive()
+
+    def post(self, data):
+        """Send data over the socket without waiting for the response.
+
+        The server answers the packets in the order they were sent, every
+        response has to be read with `receive`.
+
+        Parameters
+        ----------
+        data : obj any
+            The data to be sent over the socket.
+
+        Raises
+        ------
+        socket.error
+            If an error occurs during socket communication.
+        """
+        send_frame(self.client, self.codec.encode(data))
+
+    def receive(self):
+        """Receive the response to the oldest unanswered packet.
+
+        Returns
+        -------
+        obj any
+            The response received from the server, the error message if the
+            connection failed.
+        """
+        try:
+            payload = self.reader.read_frame()
+            if payload is None:
+                raise ConnectionAbortedError("Server closed the connection")
+            reply = self.codec.decode(payload)
             return reply
         except socket.error as e:
             return str(e)
@@ -0,0 +1,197 @@
+"""Protocol Module
+
+This module provides the length-prefixed framing used on every client-server
+connection. Each frame is a 4 byte big-endian payload length followed by the
+payload itself, so replies of any size arrive in one piece and packets
+coalesced by TCP are split correctly.
+
+Classes:
+    FrameReader: Reassembles frames from a blocking socket.
+
+Functions:
+    encode_frame(payload: bytes) -> bytes
+    send_frame(sock: socket.socket, payload: bytes) -> None
+    read_frame_async(reader: asyncio.StreamReader) -> bytes
+"""
+import struct
+
+from custom_exceptions import InvalidFrameError
+
+# network byte order unsigned int holding the payload length
+HEADER = struct.Struct("!I")
+# upper bound protecting the receiver from allocating garbage lengths
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+def encode_frame(payload: bytes) -> bytes:
+    """Prefix the payload with its length header.
+
+    Parameters
+    ----------
+    payload : bytes
+        The serialized packet.
+
+    Returns
+    -------
+    bytes
+        The frame ready to be written to the socket.
+
+    Raises
+    ------
+    InvalidFrameError
+        If the payload exceeds MAX_FRAME_SIZE.
+    """
+    if len(payload) > MAX_FRAME_SIZE:
+        raise InvalidFrameError(f"Frame of {len(payload)} bytes is too large")
+    return HEADER.pack(len(payload)) + payload
+
+
+def send_frame(sock, payload: bytes):
+    """Send a single frame over a blocking socket.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The connected socket.
+    payload : bytes
+        The serialized packet.
+    """
+    sock.sendall(encode_frame(payload))
+
+
+async def read_frame_async(reader):
+    """Read a single frame from an asyncio stream.
+
+    Parameters
+    ----------
+    reader : asyncio.StreamReader
+        The stream of the connection.
+
+    Returns
+    -------
+    bytes or None
+        The payload, None if the peer closed the connection between frames.
+
+    Raises
+    ------
+    asyncio.IncompleteReadError
+        If the peer closed the connection in the middle of a frame.
+    InvalidFrameError
+        If the announced length exceeds MAX_FRAME_SIZE.
+    """
+    header = await reader.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        header += await reader.readexactly(HEADER.size - len(header))
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise InvalidFrameError(f"Frame of {length} bytes is too large")
+    return await reader.readexactly(length)
+
+
+# pylint: disable=too-few-public-methods
+class FrameReader:
+    """FrameReader Class
+
+    Reassembles frames from a blocking socket. Data is received with
+    recv_into into a single reusable buffer, so several small frames that
+    arrive together cost one system call and no intermediate copies.
+
+    Attributes
+    ----------
+    sock : socket.socket
+        The socket the frames are read from.
+    buffer : bytearray
+        The receive buffer, grown only when a frame does not fit.
+    start : int
+        Offset of the first unread byte in the buffer.
+    end : int
+        Offset one past the last received byte in the buffer.
+
+    Methods
+    -------
+    read_frame() -> memoryview or None:
+        Returns the payload of the next frame.
+    """
+
+    def __init__(self, sock, buffer_size: int = 65536):
+        self.sock = sock
+        self.buffer = bytearray(buffer_size)
+        self._view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
+
+    def read_frame(self):
+        """Return the payload of the next frame.
+
+        The returned memoryview points into the receive buffer and is only
+        valid until the next call, callers decode it straight away.
+
+        Returns
+        -------
+        memoryview or None
+            The payload, None if the peer closed the connection between
+            frames.
+
+        Raises
+        ------
+        ConnectionAbortedError
+            If the peer closed the connection in the middle of a frame.
+        InvalidFrameError
+            If the announced length exceeds MAX_FRAME_SIZE.
+        """
+        if not self._fill(HEADER.size):
+            if self.start == self.end:
+                return None
+            raise ConnectionAbortedError("Connection closed inside a frame")
+        (length,) = HEADER.unpack_from(self.buffer, self.start)
+        if length > MAX_FRAME_SIZE:
+            raise InvalidFrameError(f"Frame of {length} bytes is too large")
+        if not self._fill(HEADER.size + length):
+            raise ConnectionAbortedError("Connection closed inside a frame")
+        payload_start = self.start + HEADER.size
+        payload = self._view[payload_start:payload_start + length]
+        self.start = payload_start + length
+        if self.start == self.end:
+            # everything consumed, next receive starts at the beginning
+            self.start = self.end = 0
+        return payload
+
+    def _fill(self, needed: int) -> bool:
+        """Receive until at least `needed` unread bytes are buffered.
+
+        Returns
+        -------
+        bool
+            False if the peer closed the connection before that.
+        """
+        if self.end - self.start >= needed:
+            return True
+        if self.start + needed > len(self.buffer):
+            self._make_room(needed)
+        while self.end - self.start < needed:
+            received = self.sock.recv_into(self._view[self.end:])
+            if received == 0:
+                return False
+            self.end += received
+        return True
+
+    def _make_room(self, needed: int):
+        """Move unread data to the front, growing the buffer if it is too small."""
+        unread = self.end - self.start
+        if needed > len(self.buffer):
+            size = len(self.buffer)
+            while size < needed:
+                size *= 2
+            buffer = bytearray(size)
+            buffer[:unread] = self._view[self.start:self.end]
+            self.buffer = buffer
+            self._view = memoryview(self.buffer)
+        else:
+            self.buffer[:unread] = self.buffer[self.start:self.end]
+        self.start, self.end = 0, unread
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
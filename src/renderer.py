@@ -0,0 +1,188 @@
+"""Module containing the layered renderer of a match.
+
+The rink, its goals and its border never change during a match, they are
+drawn once into a background layer. The texts of the HUD are drawn onto a copy
+of it, the base layer, only when the value they show changes. A frame then
+only restores the base under the previous positions of the moving sprites,
+draws them at their new positions and sends these rectangles to the window.
+
+Classes
+-------
+MatchRenderer
+    Draws the frames of a match from the match data.
+
+Raises
+------
+RuntimeError
+    When called as the main script and not imported
+"""
+from typing import List
+
+import pygame
+from assets import ASSETS
+
+WHITE = (255, 255, 255)
+OWN_SIDE = (0, 221, 85)
+
+
+class MatchRenderer:
+    """
+    Layered renderer drawing a match onto the game display and the window.
+
+    The layers are built by `reset` at the start of every match, the first
+    frame after it updates the whole window, the next ones only their dirty
+    rectangles.
+
+    Attributes
+    ----------
+    game : Game
+        The main game instance, owner of the surfaces and of the sprites.
+    background : pygame.Surface or None
+        The rink with its goals and border.
+    base : pygame.Surface or None
+        The background with the current HUD texts.
+    hud : dict
+        The text, color and rectangle last drawn for every HUD element.
+    sprite_rects : List[pygame.Rect]
+        Where the sprites and hooks were drawn by the last frame.
+    updated_pixels : int
+        Pixels sent to the window by the last frame.
+
+    Parameters
+    ----------
+    game : Game
+        The main game instance.
+
+    Methods
+    -------
+    reset()
+        Builds the layers for a new match.
+    draw(match_data) -> List[pygame.Rect]
+        Draws a frame and updates the changed parts of the window.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.background = None
+        self.base = None
+        self.hud = {}
+        self.sprite_rects = []
+        self.updated_pixels = 0
+        self._full_redraw = True
+
+    def reset(self) -> None:
+        """
+        Build the background and base layers and draw them onto the display.
+        """
+        display = self.game.display
+        self.background = pygame.Surface(display.get_size()).convert()
+        self.background.fill((150, 150, 150))
+        self.background.blit(self.game.bg, (0, 0))
+        pygame.draw.rect(self.background, "red", self.game.goal_1)
+        pygame.draw.rect(self.background, "red", self.game.goal_2)
+        pygame.draw.rect(self.background, WHITE,
+                         self.game.border, self.game.border_width)
+        self.base = self.background.copy()
+        display.blit(self.base, (0, 0))
+        self.hud = {}
+        self.sprite_rects = []
+        self._full_redraw = True
+
+    def hud_texts(self, match_data) -> list:
+        """
+        The HUD elements of a frame.
+
+        Parameters
+        ----------
+        match_data : list
+            The match data received from the server.
+
+        Returns
+        -------
+        list
+            Name, text, color and anchor (rectangle attribute and position)
+            of every element.
+        """
+        width = self.game.display.get_width()
+        own_1, own_2 = (OWN_SIDE, WHITE) if match_data[0] == 1 else (WHITE, OWN_SIDE)
+        timer = "Tiebreak" if match_data[22] else f"Time Left: {int(match_data[1])}s"
+        return [("score", f"{match_data[2]} - {match_data[3]}", WHITE, "midtop", (width // 2, 10)),
+                ("timer", timer, WHITE, "topleft", (10, 10)),
+                ("dash_1", f"Dash: {int(match_data[14])}s", own_1, "topleft", (50, 630)),
+                ("hook_1", f"Hook: {int(match_data[15])}s", own_1, "topleft", (50, 680)),
+                ("dash_2", f"Dash: {int(match_data[16])}s", own_2, "topleft", (1000, 630)),
+                ("hook_2", f"Hook: {int(match_data[17])}s", own_2, "topleft", (1000, 680))]
+
+    def _update_hud(self, match_data) -> List[pygame.Rect]:
+        """Redraw the changed HUD texts on the base layer, return the changed areas."""
+        changed = []
+        for name, text, color, anchor, position in self.hud_texts(match_data):
+            previous = self.hud.get(name)
+            if previous is not None and previous[:2] == (text, color):
+                continue
+            surface = ASSETS.render(self.game.font, text, color)
+            rect = surface.get_rect(**{anchor: position})
+            if previous is not None:
+                self.base.blit(self.background, previous[2], previous[2])
+                changed.append(previous[2])
+            self.base.blit(surface, rect)
+            changed.append(rect)
+            self.hud[name] = (text, color, rect)
+        return changed
+
+    def draw(self, match_data) -> List[pygame.Rect]:
+        """
+        Draw a frame and update the changed parts of the window.
+
+        The sprites and hooks must already be at the positions of the frame.
+
+        Parameters
+        ----------
+        match_data : list
+            The match data received from the server.
+
+        Returns
+        -------
+        List[pygame.Rect]
+            The updated rectangles of the window.
+        """
+        if self.base is None:
+            self.reset()
+        display = self.game.display
+        game = self.game
+        # restore the base under the previous sprites and the changed texts
+        dirty = self.sprite_rects + self._update_hud(match_data)
+        for rect in dirty:
+            display.blit(self.base, rect, rect)
+
+        sprite_rects = []
+        for player, hooking in ((game.player_1, match_data[20]), (game.player_2, match_data[21])):
+            if hooking:
+                hook_rect = player.draw_hook(display)
+                if hook_rect is not None:
+                    sprite_rects.append(hook_rect)
+        for entity in (game.player_1, game.player_2, game.ball):
+            entity.setRect()
+            sprite_rects.append(display.blit(entity.image, entity.rect))
+        self.sprite_rects = sprite_rects
+        dirty.extend(sprite_rects)
+
+        if self._full_redraw:
+            self._full_redraw = False
+            dirty = [display.get_rect()]
+        dirty = self._clip(dirty)
+        for rect in dirty:
+            game.screen.blit(display, rect, rect)
+        pygame.display.update(dirty)
+        self.updated_pixels = sum(rect.width * rect.height for rect in dirty)
+        return dirty
+
+    def _clip(self, rects: List[pygame.Rect]) -> List[pygame.Rect]:
+        """Clip rectangles to the display, dropping the empty ones."""
+        bounds = self.game.display.get_rect()
+        clipped = (rect.clip(bounds) for rect in rects)
+        return [rect for rect in clipped if rect.width and rect.height]
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
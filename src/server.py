@@ -4,25 +4,35 @@ Server Module
 
 This module contains the Server class, which is responsible for managing a game server. It handles player connections, queues for solo and duo matches, and ongoing matches. The server facilitates communication between clients, processes game states, and manages match lifecycles.
 
-The Server class uses threading to handle multiple client connections and match processes simultaneously, ensuring smooth gameplay and real-time updates for all connected clients.
+The Server class can either handle every client connection in its own thread or multiplex all connections on a single asyncio event loop, ensuring smooth gameplay and real-time updates for all connected clients.
 """
 
 import socket
 import pickle
 import datetime
-import pygame
-from database.database_query import DBQuery
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from _thread import start_new_thread
+from database.database_query import create_db_query
+from database.leaderboard import Leaderboard
+from database.result_writer import MatchResult, MatchResultWriter
+from database.migrations import MigrationRunner
 from configuration_mod import Config
-from custom_exceptions import InvalidClientException
+from custom_exceptions import InvalidClientException, InvalidFrameError
+from networking.protocol import FrameReader, send_frame, encode_frame, read_frame_async
+from networking.codec import PacketCodec
 
-from game_objects.player import Player
-from game_objects.ball import Ball
+from simulation.bodies import PlayerBody, BallBody
 
 from match.elo import Elo
 from match.match import Match1v1
+from match.scheduler import MatchScheduler
+from match.shards import ShardPool
+from match.sessions import SessionRegistry
+from match.matchmaking import MatchmakingQueue
 
 
+# pylint: disable=too-many-instance-attributes
 class Server:
     """
     Represents a game server for handling player connections and matches.
@@ -36,57 +46,124 @@ class Server:
     ----------
     online_players : set
         Set of ID values of all online players.
-    queued_solo_players : set
-        Set of ID values of players queued for solo matches.
+    matchmaking : MatchmakingQueue
+        Players queued for solo matches, paired by elo.
+    player_names : dict
+        Names of the online players by ID, recorded at login.
     queued_duo_players : set
         Set of ID values of players queued for duo matches.
     notify_playing : set
         Set of player IDs to be notified during gameplay.
-    matches : list
-        List of all ongoing matches.
+    sessions : SessionRegistry
+        The ongoing matches by the ids of their players.
+    scheduler : MatchScheduler
+        Advances all the running matches on a fixed timestep.
+    shards : ShardPool or None
+        Worker processes simulating the matches when the server is sharded,
+        None when the scheduler runs them in the server process.
+    result_writer : MatchResultWriter
+        Writes the finished matches to the database in the background.
+    leaderboard : Leaderboard
+        Ranking of all the players answering the ranked menu requests.
+    mode : str
+        Connection handling mode, "threaded" or "asyncio".
+    message_handlers : dict
+        The method handling the packets of every flag, by flag.
 
     Methods
     -------
     __init__(configuration)
         Initializes the Server instance.
 
-    threaded_match()
-        Thread function for handling ongoing matches.
-
     threaded_client(conn)
         Thread function for handling individual client connections.
 
+    async_client(reader, writer)
+        Coroutine handling an individual client connection on the event loop.
+
+    process_packet(decoded_data)
+        Produces the reply for a single decoded client packet.
+
+    disconnect_client(client_id)
+        Removes a disconnected client from all the subscriber sets and its match.
+
     create_packet(flag, data)
         Creates a communication packet.
 
     read_client_message(message)
         Handles client messages and returns a response packet.
 
+    handle_log_in_data(message)
+        Logs a client in.
+
+    handle_get_elo(message)
+        Replies with the Elo of a player and of the challenger threshold.
+
+    handle_get_challengers(message)
+        Replies with the challenger table.
+
+    handle_get_winrate(message)
+        Replies with the win rate of a player.
+
+    handle_get_match_history(message)
+        Replies with the match history of a player.
+
+    handle_get_match_history_page(message)
+        Replies with one page of the match history of a player.
+
+    handle_queued_solo(message)
+        Queues a player for a solo match.
+
+    create_match(first, second)
+        Starts the match of two players paired by the matchmaking.
+
     stream_match(message)
         Streams updates during a match to the clients.
 
+    record_match(match)
+        Rates the players of a finished match and records it.
+
     handle_login(d)
         Handles the login process for clients.
 
     start_server()
-        Starts the server and waits for incoming connections.
+        Starts the server in the configured mode and waits for incoming connections.
+
+    start_async_server()
+        Starts the asyncio event loop serving all the clients.
     """
     online_players = set()       # list of id values of all online players
-    queued_solo_players = set()
+    player_names = {}
     queued_duo_players = set()
     notify_playing = set()
-    matches = []  # list of all the matches
+    sessions = SessionRegistry()  # ongoing matches by player id
 
     def __init__(self, configuration) -> None:
         # TODO: split seperate config for server and client
         self.config = configuration
         # initiate adress
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server = "localhost"
-        self.port = 5555
+        self.server = self.config["server"]["host"]
+        self.port = self.config["server"]["port"]
+        self.mode = self.config["server"]["mode"]
+        # one fixed timestep loop simulating every match
+        self.scheduler = MatchScheduler(self.config)
+        # pairs the queued players in periodic passes
+        self.matchmaking = MatchmakingQueue(self.config)
+        # worker processes taking over the matches from the scheduler
+        self.shards = ShardPool(self.config) if self.config["server"]["shards"] > 0 else None
+        # thread pool for the packet handlers, only used in asyncio mode
+        self.executor = None
         self.server_ip = socket.gethostbyname(self.server)
         # databse connector
-        self.db_query = DBQuery(self.config)
+        self.db_query = create_db_query(self.config)
+        if self.config["database"]["migrate_on_start"]:
+            MigrationRunner(self.db_query.pool, self.db_query.migrations_path).migrate()
+        # ranked menu requests are answered from memory
+        self.leaderboard = Leaderboard(self.db_query, self.config)
+        # records the finished matches in the background
+        self.result_writer = MatchResultWriter(self.db_query, self.config,
+                                               write_guard=self.leaderboard.writing)
 
         # bind server to the stream
         try:
@@ -96,72 +173,134 @@ class Server:
         self.socket.listen(10)
         print("Waiting for a connection")
 
-    @staticmethod
-    def threaded_match(match):
-        """
-        Continuously run the match loop in a separate thread until the match ends.
-        """
-
-        while True:
-            end = match.match_loop()
-            if end:
-                break
-
     def handle_game_state(self, client_id):
         """
         Handle the game state for a client based on their ID.
         """
-        reply = ""
-        for match in self.matches:
-            if int(client_id) == int(match.p1_id):
-                reply = self.create_packet(
-                    "game_state_1", [1] + match.share_state())
-                self.notify_playing.remove(client_id)
-            if int(client_id) == int(match.p2_id):
-                reply = self.create_packet(
-                    "game_state_1", [2] + match.share_state())
-                self.notify_playing.remove(client_id)
-        return reply
+        session = self.sessions.lookup(client_id)
+        if session is None:
+            return ""
+        match, side = session
+        self.notify_playing.discard(client_id)
+        # no input of the player was simulated yet
+        return self.create_packet("game_state_1", [side] + match.share_state() + [0])
 
     def threaded_client(self, conn):
         """
         Manage client-server communication in a separate thread.
         """
-        # send client his id
-        conn.send(str.encode(str("Welcome, please fill the credentials!")))
+        reader = FrameReader(conn)
+        # snapshots are delta encoded against the ones this client acknowledged
+        codec = PacketCodec()
         reply = ""
         client_id = "unknown"
         try:
+            # greet the client
+            send_frame(conn, str.encode(str("Welcome, please fill the credentials!")))
             while True:
                 # communication with the client
                 # closes when no data is received
-                data = conn.recv(2048)
-                decoded_data = pickle.loads(data)
-                if not data:
-                    conn.send(str.encode("Disconnected"))
+                data = reader.read_frame()
+                if data is None:
                     break
+                decoded_data = codec.decode(data)
 
                 client_id = decoded_data["sender"]
-
-                if client_id in self.notify_playing:
-                    reply = self.handle_game_state(client_id)
-
-                else:
-                    reply = self.read_client_message(decoded_data)
-                conn.sendall(pickle.dumps(reply))
-        except (socket.error, pickle.UnpicklingError, EOFError) as exception:
+                reply = self.process_packet(decoded_data)
+                send_frame(conn, codec.encode(reply))
+        except (socket.error, pickle.UnpicklingError, EOFError,
+                InvalidFrameError) as exception:
             print(f"Error: {exception}")
         finally:
             # removing client from subscribers after breaking communication
-            if client_id in self.online_players:
-                self.online_players.remove(client_id)
-            if client_id in self.queued_solo_players:
-                self.queued_solo_players.remove(client_id)
-            if client_id in self.queued_duo_players:
-                self.queued_duo_players.remove(client_id)
+            self.disconnect_client(client_id)
         print("Connection Closed")
         conn.close()
 
+    async def async_client(self, reader, writer):
+        """
+        Manage client-server communication as a coroutine on the event loop.
+
+        The packet handlers may query the database, so they are run in the
+        handler thread pool while the connection itself only costs a socket
+        and a suspended coroutine.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            Stream the client packets are read from.
+        writer : asyncio.StreamWriter
+            Stream the replies are written to.
+        """
+        loop = asyncio.get_running_loop()
+        print("Connected to: ", writer.get_extra_info("peername"))
+        writer.write(encode_frame(str.encode(str("Welcome, please fill the credentials!"))))
+        codec = PacketCodec()
+        client_id = "unknown"
+        try:
+            await writer.drain()
+            while True:
+                data = await read_frame_async(reader)
+                if data is None:
+                    break
+                decoded_data = codec.decode(data)
+
+                client_id = decoded_data["sender"]
+                reply = await loop.run_in_executor(self.executor,
+                                                   self.process_packet,
+                                                   decoded_data)
+                writer.write(encode_frame(codec.encode(reply)))
+                await writer.drain()
+        except (ConnectionError, pickle.UnpicklingError, EOFError,
+                asyncio.IncompleteReadError, InvalidFrameError) as exception:
+            print(f"Error: {exception}")
+        finally:
+            self.disconnect_client(client_id)
+            print("Connection Closed")
+            writer.close()
+
+    def process_packet(self, decoded_data):
+        """
+        Produce the reply for a single decoded client packet.
+
+        Parameters
+        ----------
+        decoded_data : dict
+            The decoded packet received from the client.
+
+        Returns
+        -------
+        dict or None
+            The packet to be sent back to the client.
+        """
+        client_id = decoded_data["sender"]
+        if client_id in self.notify_playing:
+            return self.handle_game_state(client_id)
+        return self.read_client_message(decoded_data)
+
+    def disconnect_client(self, client_id):
+        """
+        Remove a client from all the subscriber sets and from the session
+        registry after the connection ends, the match keeps running for the
+        opponent.
+
+        Parameters
+        ----------
+        client_id : int or str
+            The id of the client, "unknown" if he never logged in.
+        """
+        self.online_players.discard(client_id)
+        self.player_names.pop(client_id, None)
+        self.matchmaking.leave(client_id)
+        self.queued_duo_players.discard(client_id)
+        self.notify_playing.discard(client_id)
+        # ids are integers once the client logged in
+        session = self.sessions.lookup(client_id) if isinstance(client_id, int) else None
+        # a finished match is recorded by the last of its players leaving it
+        if (session is not None and self.sessions.remove_player(client_id)
+                and session[0].playing is False):
+            self.record_match(session[0])
+
     @staticmethod
     def create_packet(flag, data):
         """
@@ -177,126 +316,166 @@ class Server:
         """
         Process and respond to a client's message based on its flag.
         """
-        #default result
-        result = None
         # handles the logic of the different packet type
-        if message["flag"] == "log_in_data":
-            allowed = self.handle_login(message["data"])
-
-            if allowed in ("known user", "registering new user"):
-                client_id = self.db_query.get_user_id(message["data"][0])
-                if client_id[0] in self.online_players:
-                    raise InvalidClientException(
-                        "This player is already logged in!")
-                self.online_players.add(client_id[0])
-                result = self.create_packet("change_of_status", ["online",
-                                                                 allowed, client_id[0]])
-            else:
-                result = self.create_packet("change_of_status",
-                                            ["waiting_for_approval", allowed, "uknown"])
+        handler = self.message_handlers.get(message["flag"])
+        if handler is None:
+            return None
+        return handler(self, message)
 
-        elif message["flag"] == "get_elo":
+    def handle_log_in_data(self, message):
+        """
+        Log a client in, registering him if the name is new.
+        """
+        allowed = self.handle_login(message["data"])
+
+        if allowed in ("known user", "registering new user"):
+            client_id = self.db_query.get_user_id(message["data"][0])
+            if client_id[0] in self.online_players:
+                raise InvalidClientException(
+                    "This player is already logged in!")
+            self.online_players.add(client_id[0])
+            self.player_names[client_id[0]] = message["data"][0]
+            if allowed == "registering new user":
+                self.leaderboard.add_player(client_id[0], message["data"][0],
+                                            self.config["elo"]["default_elo"])
+            return self.create_packet("change_of_status", ["online",
+                                                           allowed, client_id[0]])
+        return self.create_packet("change_of_status",
+                                  ["waiting_for_approval", allowed, "uknown"])
+
+    def handle_get_elo(self, message):
+        """
+        Reply with the Elo of a player and the Elo of the challenger threshold.
+        """
+        profile = self.leaderboard.profile(message["data"][0])
+        if profile is None:
             user_elo = self.db_query.get_user_elo(message["data"][0])[0]
-            top_elo = self.db_query.query_data("top_elo")
-            result = self.create_packet("client_elo", [user_elo, top_elo])
-
-        elif message["flag"] == "get_challengers":
-            result = self.create_packet("challengers",
-                                        self.db_query.query_data("get_challengers"))
-
-        elif message["flag"] == "get_winrate":
-            result = self.create_packet("winrate", [
-                self.db_query.get_user_winrate(message["data"][0])[0]])
-
-        elif message["flag"] == "get_match_history":
-            result = self.create_packet("match_history", [self.db_query.
-                                                          get_history(
-                                                              message["data"][0]),
-                                                          self.db_query.
-                                                          get_history(message["data"][0],
-                                                                      solo=False)])
-
-        elif message["flag"] == "queued_solo":
-            if (len(self.queued_solo_players) >= 1 and
-                    (message["sender"]) not in self.queued_solo_players):
-
-                p_1_id = message["sender"]
-                p_2_id = self.queued_solo_players.pop()
-                p1_name = self.db_query.get_user_name(int(p_1_id))[0]
-                p2_name = self.db_query.get_user_name(int(p_2_id))[0]
-                player_1 = Player(p1_name, 100, 360, self.config, elo=self.db_query.get_user_elo(
-                    p1_name)[0], color="green", server=True)
-                player_2 = Player(p2_name, 1180, 360, self.config, elo=self.db_query.get_user_elo(
-                    p2_name)[0], color="green", server=True)
-                ball = Ball(self.config, server=True)
-                new_match = Match1v1(self.config, player_1,
-                                     player_2, ball, p_1_id, p_2_id)
-                self.matches.append(new_match)
-                start_new_thread(self.threaded_match, (new_match, ))
-                self.notify_playing.add(int(p_1_id))
-                self.notify_playing.add(int(p_2_id))
-                result = self.create_packet("Waiting_for_opponent", ["no_data"])
-            else:
-                self.queued_solo_players.add(int(message["sender"]))
-                result = self.create_packet("Waiting_for_opponent", ["no_data"])
+        else:
+            user_elo = profile.elo
+        top_elo = self.leaderboard.top_elo() or self.db_query.query_data("top_elo")
+        return self.create_packet("client_elo", [user_elo, top_elo])
+
+    def handle_get_challengers(self, _message):
+        """
+        Reply with the challenger table.
+        """
+        return self.create_packet("challengers", self.leaderboard.top())
 
-        elif message["flag"] == "ingame":
-            result = self.stream_match(message)
+    def handle_get_winrate(self, message):
+        """
+        Reply with the win rate of a player.
+        """
+        profile = self.leaderboard.profile(message["data"][0])
+        if profile is None:
+            winrate = self.db_query.get_user_winrate(message["data"][0])[0]
+        else:
+            winrate = profile.winrate
+        return self.create_packet("winrate", [winrate])
+
+    def handle_get_match_history(self, message):
+        """
+        Reply with the 1v1 and 2v2 match history of a player.
+        """
+        return self.create_packet("match_history", [self.db_query.
+                                                    get_history(
+                                                        message["data"][0]),
+                                                    self.db_query.
+                                                    get_history(message["data"][0],
+                                                                solo=False)])
+
+    def handle_get_match_history_page(self, message):
+        """
+        Reply with one page of the match history of a player.
+        """
+        name, solo, before = message["data"]
+        return self.create_packet("match_history_page",
+                                  list(self.db_query.get_history_page(name, solo, before)))
 
-        return result
+    def handle_queued_solo(self, message):
+        """
+        Queue a player for a solo match.
+        """
+        player_id = int(message["sender"])
+        # the client keeps polling until its match starts
+        if player_id not in self.matchmaking and self.sessions.lookup(player_id) is None:
+            # name and elo are read once here, not when the match starts
+            name = self.player_names.get(player_id)
+            if name is None:
+                name = self.db_query.get_user_name(player_id)[0]
+            profile = self.leaderboard.profile(name)
+            elo = profile.elo if profile is not None else self.db_query.get_user_elo(name)[0]
+            self.matchmaking.join(player_id, name, elo, in_match=self.sessions.lookup)
+        return self.create_packet("Waiting_for_opponent", ["no_data"])
+
+    def create_match(self, first, second):
+        """
+        Start the match of two players paired by the matchmaking.
+
+        Parameters
+        ----------
+        first : QueueEntry
+            The player on the left side.
+        second : QueueEntry
+            The player on the right side.
+        """
+        player_1 = PlayerBody(first.name, 100, 360, self.config, elo=first.elo)
+        player_2 = PlayerBody(second.name, 1180, 360, self.config, elo=second.elo)
+        new_match = Match1v1(self.config, player_1, player_2, BallBody(self.config),
+                             first.player_id, second.player_id)
+        if self.shards is not None:
+            new_match = self.shards.add_match(new_match)
+        else:
+            self.scheduler.add_match(new_match)
+        self.sessions.add_match(new_match)
+        self.notify_playing.add(first.player_id)
+        self.notify_playing.add(second.player_id)
 
     def stream_match(self, message):
         """
         Stream match updates to a client and handle end-game scenarios.
         """
-        reply = None
-        client_id = message["sender"]
-
-        for match in self.matches:
-            if match.playing is False:
-
-                if int(client_id) == int(match.p1_id):
-                    reply = self.create_packet(
-                        "end_game_state_1", match.get_match_stats())
-                    match.p1_end_game_notified = True
-
-                if int(client_id) == int(match.p2_id):
-                    reply = self.create_packet(
-                        "end_game_state_1", match.get_match_stats())
-                    match.p2_end_game_notified = True
-
-                if (match.p2_end_game_notified and match.p1_end_game_notified):
-                    # insert match data into db
-                    self.db_query.insert_1v1_game(match)
-
-                    # calculate new elo for p1 & p2
-                    (p1_new_elo, p2_new_elo) = Elo.calculate_elo(
-                        match.p1.elo, match.p2.elo, match.score[0] > match.score[1])
+        session = self.sessions.lookup(message["sender"])
+        if session is None:
+            return None
+        match, side = session
+
+        if match.playing is False:
+            reply = self.create_packet("end_game_state_1", match.get_match_stats())
+            if side == 1:
+                match.p1_end_game_notified = True
+            else:
+                match.p2_end_game_notified = True
 
-                    # update elo in db for each player
-                    self.db_query.update_user_elo(match.p1_id, p1_new_elo)
-                    self.db_query.update_user_elo(match.p2_id, p2_new_elo)
+            # only the thread removing the last player of the match records it
+            if self.sessions.remove_player(message["sender"]):
+                self.record_match(match)
 
-                    # update winrate
-                    self.db_query.update_user_winrate(
-                        match.p1_id, match.p1.name)
-                    self.db_query.update_user_winrate(
-                        match.p2_id, match.p2.name)
-                    self.matches.remove(match)
+            return reply
 
-                return reply
+        mouse_pos, actions, seq = message["data"]
+        match.set_input(side, [mouse_pos, actions])
+        # the snapshot tells the client which of its inputs it already contains
+        acknowledged = self.sessions.record_input(message["sender"], seq)
+        return self.create_packet("game_state_1",
+                                  [side] + match.share_state() + [acknowledged])
 
-            if int(message["sender"]) == match.p1_id:
-                match.p_1_update = message["data"]
-                reply = self.create_packet("game_state_1", [1] + match.share_state())
-                return reply
+    def record_match(self, match):
+        """
+        Rate the players of a finished match and record it.
 
-            if int(message["sender"]) == match.p2_id:
-                match.p_2_update = message["data"]
-                reply = self.create_packet("game_state_1", [2] + match.share_state())
-                return reply
+        Parameters
+        ----------
+        match : Match1v1 or RemoteMatch
+            The finished match.
+        """
+        # calculate new elo for p1 & p2
+        (p1_new_elo, p2_new_elo) = Elo.calculate_elo(
+            match.p1.elo, match.p2.elo, match.score[0] > match.score[1])
 
-            return reply
+        # written in the background, the reply does not wait for the database
+        match_result = MatchResult.from_match(match, p1_new_elo, p2_new_elo)
+        self.leaderboard.record_result(match_result)
+        self.result_writer.submit(match_result)
 
     def handle_login(self, credentials):
         """
@@ -307,15 +486,58 @@ class Server:
 
     def start_server(self):
         """
-        Start the server and handle incoming client connections.
+        Start the server in the configured mode and handle incoming client connections.
         """
-        pygame.init()
-        while True:
-            conn, addr = self.socket.accept()
-            print("Connected to: ", addr)
+        if self.shards is not None:
+            self.shards.start()
+        else:
+            start_new_thread(self.scheduler.run, ())
+        start_new_thread(self.matchmaking.run, (self.create_match,))
+        self.leaderboard.reload()
+        start_new_thread(self.leaderboard.run, ())
+        self.result_writer.start()
+        try:
+            if self.mode == "asyncio":
+                self.start_async_server()
+                return
+            while True:
+                conn, addr = self.socket.accept()
+                print("Connected to: ", addr)
 
-            start_new_thread(self.threaded_client, (conn,))
+                start_new_thread(self.threaded_client, (conn,))
+        finally:
+            if self.shards is not None:
+                self.shards.stop()
+            self.leaderboard.stop()
+            self.result_writer.stop()
 
+    def start_async_server(self):
+        """
+        Serve all the client connections from a single asyncio event loop.
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config["server"]["handler_threads"])
+
+        async def serve():
+            server = await asyncio.start_server(self.async_client,
+                                                sock=self.socket)
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(serve())
+        finally:
+            self.executor.shutdown(wait=False)
+
+    # the handler of every packet flag a client sends outside the game state updates
+    message_handlers = {"log_in_data": handle_log_in_data,
+                        "get_elo": handle_get_elo,
+                        "get_challengers": handle_get_challengers,
+                        "get_winrate": handle_get_winrate,
+                        "get_match_history": handle_get_match_history,
+                        "get_match_history_page": handle_get_match_history_page,
+                        "queued_solo": handle_queued_solo,
+                        "ingame": stream_match}
 
 if __name__ == "__main__":
     CONFIG = Config()
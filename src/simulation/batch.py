@@ -0,0 +1,576 @@
+"""
+Batch Module
+------------
+
+Module for the batch engine, which keeps the state of every running match in
+NumPy arrays (one array per quantity, one row per match) and advances all of
+them in a single vectorized step. It follows the scalar path of Match1v1,
+PlayerBody and BallBody operation by operation, so both produce the same
+results up to floating point rounding.
+
+Player quantities have the shape (matches, 2), column 0 is player 1 and
+column 1 is player 2, match and ball quantities have the shape (matches,).
+"""
+import threading
+
+import numpy as np
+
+from simulation.bodies import Action
+
+# the hook target is computed against the reference resolution,
+# like PlayerBody.intersect_vector_rectangle
+HOOK_WIDTH, HOOK_HEIGHT = 1280, 720
+HOOK_SPEED = 1200
+DASH_SPEED = 1600
+MOVE_SPEED = 500
+BALL_FRICTION = 1.003
+KICK_SPEED = 20
+DASH_COOLDOWN = 10
+HOOK_COOLDOWN = 20
+
+# every per-match array of the engine, see BatchEngine.__init__ for their shapes
+ARRAYS = ("x", "y", "radius", "hook_x", "hook_y", "hook_initial_x", "hook_initial_y",
+          "current_x", "current_y", "dash_started_x", "dash_started_y",
+          "dash_destination_x", "dash_destination_y", "hook_cooldown_started",
+          "dash_cooldown_started", "mouse_x", "mouse_y", "dash_time", "hook_time",
+          "hook_on_cooldown", "dash_on_cooldown", "hooking", "end_hook", "pull", "dashing",
+          "has_input", "dashed_already", "dash_length", "actions", "score", "touches",
+          "ball_x", "ball_y", "ball_vx", "ball_vy", "ball_radius", "elapsed", "remaining",
+          "duration", "tiebreak", "end_in_tiebreak")
+
+# (array name, body attribute, vector component or None) of the players
+PLAYER_FIELDS = (("x", "x", None), ("y", "y", None), ("radius", "radius", None),
+                 ("hook_x", "hook_coords", "x"), ("hook_y", "hook_coords", "y"),
+                 ("hook_initial_x", "hook_initial", "x"),
+                 ("hook_initial_y", "hook_initial", "y"),
+                 ("current_x", "coords_current", "x"),
+                 ("current_y", "coords_current", "y"),
+                 ("dash_started_x", "dash_started", "x"),
+                 ("dash_started_y", "dash_started", "y"),
+                 ("dash_destination_x", "dash_destination", "x"),
+                 ("dash_destination_y", "dash_destination", "y"),
+                 ("hook_cooldown_started", "hook_cooldown_started", None),
+                 ("dash_cooldown_started", "dash_cooldown_started", None),
+                 ("hook_on_cooldown", "hook_on_cooldown", None),
+                 ("dash_on_cooldown", "dash_on_cooldown", None),
+                 ("hooking", "hooking", None), ("end_hook", "end_hook", None),
+                 ("pull", "pull", None), ("dashing", "dashing", None),
+                 ("dashed_already", "dashed_already", None),
+                 ("dash_length", "dash_length", None))
+
+
+def _normalized(dx, dy):
+    """Unit vectors of the given components, zero vectors stay zero like Vector2.normalize."""
+    length = np.hypot(dx, dy)
+    zero = length == 0
+    length[zero] = 1.0
+    return np.where(zero, 0.0, dx / length), np.where(zero, 0.0, dy / length)
+
+
+# pylint: disable=too-many-instance-attributes
+class BatchEngine:
+    """
+    Advances many matches at once on NumPy arrays.
+
+    The rows 0 to count - 1 of every array hold the live matches, a removed
+    match is replaced by the last one so the step always works on plain
+    slices.
+
+    Attributes
+    ----------
+    config : dict
+        Configuration settings of the matches.
+    capacity : int
+        Number of rows allocated in every array, doubled when full.
+    count : int
+        Number of live matches.
+    matches : list
+        The Match1v1 object of every live row.
+    lock : threading.RLock
+        Guards the rows, the inputs and states are accessed from the client
+        threads while the scheduler steps and moves the rows.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration settings of the matches.
+    capacity : int, optional
+        Initial number of rows, by default 64.
+
+    Methods
+    -------
+    add_match(match)
+        Copies the state of a match into a new row and attaches it.
+    remove_match(match)
+        Copies the state back into the match objects and frees its row.
+    set_input(match, side, inputs)
+        Stores the latest input of a player.
+    step(dt) -> list
+        Advances every match by one timestep, returns the finished ones.
+    share_state(match) -> list
+        The state of a match in the format of Match1v1.share_state.
+    sync(match)
+        Copies the state of a row back into the match objects.
+    """
+
+    def __init__(self, config, capacity: int = 64):
+        self.config = config
+        self.width = config["resolution"]["width"]
+        self.height = config["resolution"]["height"]
+        self.border_width = config["match"]["border_width"]
+        self.capacity = capacity
+        self.count = 0
+        self.matches = []
+        self.lock = threading.RLock()
+        # player quantities, column 0 is player 1 and column 1 is player 2
+        self.x = np.zeros((capacity, 2))
+        self.y = np.zeros((capacity, 2))
+        self.radius = np.zeros((capacity, 2))
+        self.hook_x = np.zeros((capacity, 2))
+        self.hook_y = np.zeros((capacity, 2))
+        self.hook_initial_x = np.zeros((capacity, 2))
+        self.hook_initial_y = np.zeros((capacity, 2))
+        self.current_x = np.zeros((capacity, 2))
+        self.current_y = np.zeros((capacity, 2))
+        self.dash_started_x = np.zeros((capacity, 2))
+        self.dash_started_y = np.zeros((capacity, 2))
+        self.dash_destination_x = np.zeros((capacity, 2))
+        self.dash_destination_y = np.zeros((capacity, 2))
+        self.hook_cooldown_started = np.zeros((capacity, 2))
+        self.dash_cooldown_started = np.zeros((capacity, 2))
+        self.mouse_x = np.zeros((capacity, 2))
+        self.mouse_y = np.zeros((capacity, 2))
+        self.dash_time = np.zeros((capacity, 2))
+        self.hook_time = np.zeros((capacity, 2))
+        self.hook_on_cooldown = np.zeros((capacity, 2), dtype=bool)
+        self.dash_on_cooldown = np.zeros((capacity, 2), dtype=bool)
+        self.hooking = np.zeros((capacity, 2), dtype=bool)
+        self.end_hook = np.zeros((capacity, 2), dtype=bool)
+        self.pull = np.zeros((capacity, 2), dtype=bool)
+        self.dashing = np.zeros((capacity, 2), dtype=bool)
+        self.has_input = np.zeros((capacity, 2), dtype=bool)
+        self.dashed_already = np.zeros((capacity, 2), dtype=np.int64)
+        self.dash_length = np.zeros((capacity, 2), dtype=np.int64)
+        self.actions = np.zeros((capacity, 2), dtype=np.int64)
+        self.score = np.zeros((capacity, 2), dtype=np.int64)
+        self.touches = np.zeros((capacity, 2), dtype=np.int64)
+        # match and ball quantities
+        self.ball_x = np.zeros(capacity)
+        self.ball_y = np.zeros(capacity)
+        self.ball_vx = np.zeros(capacity)
+        self.ball_vy = np.zeros(capacity)
+        self.ball_radius = np.zeros(capacity)
+        self.elapsed = np.zeros(capacity)
+        self.remaining = np.zeros(capacity)
+        self.duration = np.zeros(capacity)
+        self.tiebreak = np.zeros(capacity, dtype=bool)
+        self.end_in_tiebreak = np.zeros(capacity, dtype=bool)
+
+    def add_match(self, match):
+        """
+        Copy the state of a match into a new row and attach the match to the engine.
+
+        Parameters
+        ----------
+        match : Match1v1
+            The match to be simulated.
+        """
+        with self.lock:
+            if self.count == self.capacity:
+                self._grow()
+            row = self.count
+            self.count += 1
+            self.matches.append(match)
+            match.engine, match.slot = self, row
+            # the row may still hold the values of a removed match
+            for name in ARRAYS:
+                getattr(self, name)[row] = 0
+            for side, player in enumerate((match.p1, match.p2)):
+                for name, attribute, component in PLAYER_FIELDS:
+                    value = getattr(player, attribute)
+                    getattr(self, name)[row, side] = (value if component is None
+                                                      else getattr(value, component))
+                self.touches[row, side] = match.match_stats.stats.get(
+                    player.name, {"touches": 0})["touches"]
+                update = match.p_1_update if side == 0 else match.p_2_update
+                if update is not None:
+                    self.set_input(match, side + 1, update)
+            self.score[row] = match.score
+            self.ball_x[row], self.ball_y[row] = match.ball.x, match.ball.y
+            self.ball_vx[row], self.ball_vy[row] = match.ball.speed.x, match.ball.speed.y
+            self.ball_radius[row] = match.ball.radius
+            self.elapsed[row] = match.elapsed_time
+            self.remaining[row] = match.remaining_time
+            self.duration[row] = match.match_duration
+            self.tiebreak[row] = match.tiebreak
+            self.end_in_tiebreak[row] = match.end_game_in_tiebreak
+
+    def remove_match(self, match):
+        """
+        Copy the state back into the match objects and free its row.
+
+        Parameters
+        ----------
+        match : Match1v1
+            The match to be removed.
+        """
+        with self.lock:
+            self.sync(match)
+            row, last = match.slot, self.count - 1
+            if row != last:
+                moved = self.matches[last]
+                for name in ARRAYS:
+                    array = getattr(self, name)
+                    array[row] = array[last]
+                self.matches[row] = moved
+                moved.slot = row
+            self.matches.pop()
+            self.count -= 1
+            match.engine, match.slot = None, None
+
+    def set_input(self, match, side, inputs):
+        """
+        Store the latest input of a player, it is applied on every tick until replaced.
+
+        Parameters
+        ----------
+        match : Match1v1
+            The match of the player.
+        side : int
+            1 or 2.
+        inputs : list
+            Mouse position and the Action bitmask.
+        """
+        with self.lock:
+            if match.engine is not self:
+                return
+            row, column = match.slot, side - 1
+            mouse_pos, actions = inputs
+            self.mouse_x[row, column], self.mouse_y[row, column] = mouse_pos
+            self.actions[row, column] = actions
+            self.has_input[row, column] = True
+
+    def share_state(self, match):
+        """
+        The state of a match in the format of Match1v1.share_state.
+
+        Parameters
+        ----------
+        match : Match1v1
+            The match.
+
+        Returns
+        -------
+        list or None
+            A list containing various elements of the match's current state,
+            None if the match left the engine in the meantime.
+        """
+        with self.lock:
+            if match.engine is not self:
+                return None
+            row = match.slot
+            return [float(self.remaining[row]), int(self.score[row, 0]), int(self.score[row, 1]),
+                    match.p1.name, match.p2.name,
+                    float(self.x[row, 0]), float(self.y[row, 0]),
+                    float(self.x[row, 1]), float(self.y[row, 1]),
+                    float(self.hook_x[row, 0]), float(self.hook_y[row, 0]),
+                    float(self.hook_x[row, 1]), float(self.hook_y[row, 1]),
+                    float(self.dash_time[row, 0]), float(self.hook_time[row, 0]),
+                    float(self.dash_time[row, 1]), float(self.hook_time[row, 1]),
+                    float(self.ball_x[row]), float(self.ball_y[row]),
+                    bool(self.hooking[row, 0]), bool(self.hooking[row, 1]),
+                    bool(self.tiebreak[row])]
+
+    def sync(self, match):
+        """
+        Copy the state of a row back into the match objects.
+
+        Parameters
+        ----------
+        match : Match1v1
+            The match.
+        """
+        row = match.slot
+        for side, player in enumerate((match.p1, match.p2)):
+            for name, attribute, component in PLAYER_FIELDS:
+                value = getattr(self, name)[row, side].item()
+                if component is None:
+                    setattr(player, attribute, value)
+                else:
+                    setattr(getattr(player, attribute), component, value)
+            if player.name in match.match_stats.stats:
+                match.match_stats.stats[player.name]["touches"] = int(self.touches[row, side])
+                match.match_stats.stats[player.name]["goals"] = int(self.score[row, side])
+        match.dash_time_1, match.dash_time_2 = self.dash_time[row].tolist()
+        match.hook_time_1, match.hook_time_2 = self.hook_time[row].tolist()
+        match.score = tuple(self.score[row].tolist())
+        match.ball.x, match.ball.y = self.ball_x[row].item(), self.ball_y[row].item()
+        match.ball.speed.x = self.ball_vx[row].item()
+        match.ball.speed.y = self.ball_vy[row].item()
+        match.elapsed_time = self.elapsed[row].item()
+        match.remaining_time = self.remaining[row].item()
+        match.tiebreak = bool(self.tiebreak[row])
+        match.end_game_in_tiebreak = bool(self.end_in_tiebreak[row])
+
+    def step(self, dt):
+        """
+        Advance every match by one timestep, the vectorized Match1v1.match_loop.
+
+        Finished matches are synced, ended and removed from the engine.
+
+        Parameters
+        ----------
+        dt : float
+            Simulated time of the step in seconds.
+
+        Returns
+        -------
+        list
+            The matches that ended in this step.
+        """
+        with self.lock:
+            n = self.count
+            if n == 0:
+                return []
+            elapsed = self.elapsed[:n]
+            elapsed += dt
+            self._check_goal(n, 0, scorer=1)
+            self._check_goal(n, self.width - self.config["match"]["goal_width"], scorer=0)
+            self._kick_ball(n)
+            np.maximum(self.duration[:n] - elapsed, 0, out=self.remaining[:n])
+            self._update_players(n, dt)
+            self._update_ball(n)
+            self._update_cooldown_times(n)
+
+            # end of the match, like Match1v1.match_loop
+            score = self.score[:n]
+            over = elapsed >= self.duration[:n]
+            tie = score[:, 0] == score[:, 1]
+            self.tiebreak[:n] |= over & tie
+            finished = over & ((tie & self.end_in_tiebreak[:n]) | ~tie)
+            ended = [self.matches[row] for row in np.flatnonzero(finished)]
+            for match in ended:
+                self.remove_match(match)
+                match.end_match()
+            return ended
+
+    def _grow(self):
+        """Double the number of rows of every array."""
+        for name in ARRAYS:
+            array = getattr(self, name)
+            grown = np.zeros((self.capacity * 2,) + array.shape[1:], dtype=array.dtype)
+            grown[:self.capacity] = array
+            setattr(self, name, grown)
+        self.capacity *= 2
+
+    def _check_goal(self, n, goal_left, scorer):
+        """Score the goals whose area the ball overlaps and reset the ball."""
+        goal_height = self.config["match"]["goal_height"]
+        goal_top = (self.height - goal_height) // 2
+        ball_x, ball_y = self.ball_x[:n], self.ball_y[:n]
+        radius = self.ball_radius[:n]
+        scored = ((ball_x - radius < goal_left + self.config["match"]["goal_width"])
+                  & (ball_x + radius > goal_left)
+                  & (ball_y - radius < goal_top + goal_height)
+                  & (ball_y + radius > goal_top))
+        if not scored.any():
+            return
+        self.score[:n, scorer] += scored
+        ball_x[scored] = self.width // 2
+        ball_y[scored] = self.height // 2
+        self.ball_vx[:n][scored] = 0
+        self.ball_vy[:n][scored] = 0
+        self.end_in_tiebreak[:n] |= scored & self.tiebreak[:n]
+
+    def _kick_ball(self, n):
+        """Push the ball away from the player touching it, player 1 first."""
+        ball_x, ball_y = self.ball_x[:n], self.ball_y[:n]
+        dx = ball_x[:, None] - self.x[:n]
+        dy = ball_y[:, None] - self.y[:n]
+        reach = self.radius[:n] + self.ball_radius[:n, None]
+        touching = dx * dx + dy * dy <= reach * reach
+        hit = touching[:, 0] | touching[:, 1]
+        if not hit.any():
+            return
+        first = touching[:, 0]
+        normal_x, normal_y = _normalized(np.where(first, dx[:, 0], dx[:, 1]),
+                                         np.where(first, dy[:, 0], dy[:, 1]))
+        self.touches[:n, 0] += first
+        self.touches[:n, 1] += hit & ~first
+        np.copyto(self.ball_vx[:n], normal_x * KICK_SPEED, where=hit)
+        np.copyto(self.ball_vy[:n], normal_y * KICK_SPEED, where=hit)
+
+    def _update_ball(self, n):
+        """Move the ball, slow it down and rebound it from the border."""
+        ball_x, ball_y = self.ball_x[:n], self.ball_y[:n]
+        speed_x, speed_y = self.ball_vx[:n], self.ball_vy[:n]
+        radius = self.ball_radius[:n]
+        ball_x += speed_x
+        ball_y += speed_y
+        speed_x /= BALL_FRICTION
+        speed_y /= BALL_FRICTION
+        for position, speed, high in ((ball_x, speed_x, self.width),
+                                      (ball_y, speed_y, self.height)):
+            low_hit = position - radius <= 0
+            high_hit = ~low_hit & (position + radius >= high)
+            bounced = low_hit | high_hit
+            speed[bounced] = -speed[bounced]
+            np.copyto(position, radius, where=low_hit)
+            np.copyto(position, high - radius, where=high_hit)
+
+    def _update_cooldown_times(self, n):
+        """Remaining cooldowns shown to the players."""
+        elapsed = self.elapsed[:n, None]
+        for shown, started, cooldown in ((self.dash_time, self.dash_cooldown_started, DASH_COOLDOWN),
+                                         (self.hook_time, self.hook_cooldown_started, HOOK_COOLDOWN)):
+            remaining = np.clip(cooldown - np.abs(elapsed - started[:n]), 0, cooldown)
+            remaining[started[:n] == 0] = 0
+            shown[:n] = remaining
+
+    # pylint: disable=too-many-locals
+    def _update_players(self, n, dt):
+        """The vectorized PlayerBody.update of the players with an input."""
+        active = self.has_input[:n]
+        if not active.any():
+            return
+        actions = self.actions[:n]
+        x, y, radius = self.x[:n], self.y[:n], self.radius[:n]
+        pull, hooking, end_hook = self.pull[:n], self.hooking[:n], self.end_hook[:n]
+        time = np.broadcast_to(self.elapsed[:n, None], x.shape)
+        mouse_x, mouse_y = self.mouse_x[:n], self.mouse_y[:n]
+
+        # movement, every direction clamps both axes like PlayerBody.move
+        moving = active & ~pull
+        for action, dx, dy in ((Action.UP, 0, -1), (Action.DOWN, 0, 1),
+                               (Action.LEFT, -1, 0), (Action.RIGHT, 1, 0)):
+            selected = moving & (actions & action != 0)
+            if selected.any():
+                x[selected] += dx * (MOVE_SPEED * dt)
+                y[selected] += dy * (MOVE_SPEED * dt)
+                self._clamp_move(x, radius, self.width, selected)
+                self._clamp_move(y, radius, self.height, selected)
+
+        # casting the hook
+        cast = (active & (actions & Action.HOOK != 0) & ~hooking & ~pull
+                & ~self.hook_on_cooldown[:n])
+        if cast.any():
+            np.copyto(self.hook_cooldown_started[:n], time, where=cast)
+            self.hook_on_cooldown[:n] |= cast
+            hooking |= cast
+            hook_x, hook_y = self.hook_x[:n], self.hook_y[:n]
+            np.copyto(hook_x, x, where=cast)
+            np.copyto(hook_y, y, where=cast)
+            self.hook_initial_x[:n][cast], self.hook_initial_y[:n][cast] = \
+                self._intersect_border(hook_x[cast], hook_y[cast],
+                                       mouse_x[cast], mouse_y[cast])
+            self._move_hook(n, dt, cast)
+        ended = active & end_hook
+        end_hook[ended] = False
+        hooking[ended] = False
+        self._move_hook(n, dt, active & hooking)
+
+        # pulling towards the hook
+        pulled = active & pull
+        if pulled.any():
+            current_x, current_y = self.current_x[:n], self.current_y[:n]
+            unit_x, unit_y = _normalized(self.hook_initial_x[:n] - current_x,
+                                         self.hook_initial_y[:n] - current_y)
+            current_x[pulled] += (HOOK_SPEED * dt) * unit_x[pulled]
+            current_y[pulled] += (HOOK_SPEED * dt) * unit_y[pulled]
+            np.copyto(x, current_x, where=pulled)
+            np.copyto(y, current_y, where=pulled)
+            pull[self._invariant(x, y, radius, pulled)] = False
+
+        # dash
+        dashing = active & (actions & Action.DASH != 0) & ~self.dash_on_cooldown[:n]
+        if dashing.any():
+            self._dash(n, dt, dashing, time)
+
+        # cooldowns
+        over = active & (time - self.dash_cooldown_started[:n] > DASH_COOLDOWN)
+        self.dash_on_cooldown[:n][over] = False
+        over = active & (time - self.hook_cooldown_started[:n] > HOOK_COOLDOWN)
+        self.hook_on_cooldown[:n][over] = False
+
+    def _dash(self, n, dt, dashing, time):
+        """The vectorized PlayerBody.dash of the players holding the dash key."""
+        x, y, radius = self.x[:n], self.y[:n], self.radius[:n]
+        current_x, current_y = self.current_x[:n], self.current_y[:n]
+        started_x, started_y = self.dash_started_x[:n], self.dash_started_y[:n]
+        dashed = self.dashed_already[:n]
+        np.copyto(self.dash_cooldown_started[:n], time, where=dashing)
+        np.copyto(self.dash_destination_x[:n], self.mouse_x[:n], where=dashing)
+        np.copyto(self.dash_destination_y[:n], self.mouse_y[:n], where=dashing)
+        first = dashing & (dashed == 0)
+        for target, source in ((started_x, x), (started_y, y),
+                               (current_x, x), (current_y, y)):
+            np.copyto(target, source, where=first)
+        going = dashing & (dashed < self.dash_length[:n])
+        unit_x, unit_y = _normalized(self.dash_destination_x[:n] - started_x,
+                                     self.dash_destination_y[:n] - started_y)
+        current_x[going] += (DASH_SPEED * dt) * unit_x[going]
+        current_y[going] += (DASH_SPEED * dt) * unit_y[going]
+        self.hooking[:n][going] = False
+        self.end_hook[:n][going] = False
+        self.pull[:n][going] = False
+        self.dashing[:n][going] = True
+        np.copyto(x, current_x, where=going)
+        np.copyto(y, current_y, where=going)
+        self.dashing[:n][self._invariant(x, y, radius, going)] = False
+        dashed += going
+        done = dashing & (dashed == self.dash_length[:n])
+        dashed[done] = 0
+        self.dash_on_cooldown[:n] |= done
+
+    def _move_hook(self, n, dt, mask):
+        """The vectorized PlayerBody.hook, starts pulling once the hook leaves the field."""
+        if not mask.any():
+            return
+        hook_x, hook_y = self.hook_x[:n], self.hook_y[:n]
+        unit_x, unit_y = _normalized(self.hook_initial_x[:n] - hook_x,
+                                     self.hook_initial_y[:n] - hook_y)
+        hook_x[mask] += (HOOK_SPEED * dt) * unit_x[mask]
+        hook_y[mask] += (HOOK_SPEED * dt) * unit_y[mask]
+        outside = mask & ((hook_x < 0) | (hook_x > self.width)
+                          | (hook_y < 0) | (hook_y > self.height))
+        self.end_hook[:n] |= outside
+        self.pull[:n] |= outside
+        np.copyto(self.current_x[:n], self.x[:n], where=outside)
+        np.copyto(self.current_y[:n], self.y[:n], where=outside)
+
+    @staticmethod
+    def _intersect_border(start_x, start_y, end_x, end_y):
+        """The vectorized PlayerBody.intersect_vector_rectangle."""
+        stability = 0.00000001
+        span_x = np.maximum(end_x - start_x, stability)
+        span_y = np.maximum(end_y - start_y, stability)
+        candidates = np.stack(((-start_x) / span_x, (HOOK_WIDTH - start_x) / span_x,
+                               (-start_y) / span_y, (HOOK_HEIGHT - start_y) / span_y))
+        final_t = np.where(candidates > 0, candidates, np.inf).min(axis=0)
+        return (start_x + final_t * (end_x - start_x),
+                start_y + final_t * (end_y - start_y))
+
+    @staticmethod
+    def _clamp_move(position, radius, high, mask):
+        """Push a coordinate back inside the field like PlayerBody.move."""
+        low_hit = mask & (position - radius < 0)
+        high_hit = mask & ~low_hit & (position + radius > high)
+        np.copyto(position, 5 + radius, where=low_hit)
+        np.copyto(position, high - radius - 5, where=high_hit)
+
+    def _invariant(self, x, y, radius, mask):
+        """The vectorized PlayerBody.invariant, returns where the player was outside."""
+        border = self.border_width
+        violated = np.zeros_like(mask)
+        for position, high in ((x, self.width), (y, self.height)):
+            low_hit = mask & ~violated & (position - radius < 0)
+            np.copyto(position, border + radius, where=low_hit)
+            violated |= low_hit
+            high_hit = mask & ~violated & (position + radius > high)
+            np.copyto(position, high - radius - border, where=high_hit)
+            violated |= high_hit
+        return violated
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
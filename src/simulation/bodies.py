@@ -0,0 +1,560 @@
+"""
+Bodies Module
+-------------
+
+Module for the headless physics of the match: the players with their
+movement, hook and dash, the ball and the rectangular areas of the field.
+Nothing here depends on pygame, the client classes in game_objects extend
+these bodies with their graphics.
+"""
+from enum import IntFlag
+from typing import Dict, Tuple, Union
+
+from simulation.vector import Vector2
+
+
+class Action(IntFlag):
+    """Actions a player can request in one input, sent as a bitmask."""
+    NONE = 0
+    UP = 1
+    DOWN = 2
+    LEFT = 4
+    RIGHT = 8
+    HOOK = 16
+    DASH = 32
+
+
+# pylint: disable=too-few-public-methods
+class Bounds:
+    """
+    An axis aligned rectangle of the field, like pygame.Rect without the graphics.
+
+    Attributes
+    ----------
+    left : float
+        The x-coordinate of the left side.
+    top : float
+        The y-coordinate of the top side.
+    right : float
+        The x-coordinate of the right side.
+    bottom : float
+        The y-coordinate of the bottom side.
+
+    Methods
+    -------
+    overlaps_circle(x: float, y: float, radius: float) -> bool
+        Whether the bounding box of a circle overlaps the rectangle.
+    """
+    __slots__ = ("left", "top", "right", "bottom")
+
+    def __init__(self, left, top, width, height):
+        self.left = left
+        self.top = top
+        self.right = left + width
+        self.bottom = top + height
+
+    def overlaps_circle(self, x, y, radius):
+        """
+        Whether the bounding box of a circle overlaps the rectangle.
+
+        Parameters
+        ----------
+        x : float
+            The x-coordinate of the circle's center.
+        y : float
+            The y-coordinate of the circle's center.
+        radius : float
+            The radius of the circle.
+
+        Returns
+        -------
+        bool
+            True if they overlap, touching edges do not count.
+        """
+        return (x - radius < self.right and x + radius > self.left
+                and y - radius < self.bottom and y + radius > self.top)
+
+
+def collide_circle(body_a, body_b):
+    """
+    Whether two round bodies overlap, like pygame.sprite.collide_circle.
+
+    Parameters
+    ----------
+    body_a, body_b : PlayerBody or BallBody
+        Bodies with x, y and radius attributes.
+
+    Returns
+    -------
+    bool
+        True if the circles touch or overlap.
+    """
+    dx = body_a.x - body_b.x
+    dy = body_a.y - body_b.y
+    reach = body_a.radius + body_b.radius
+    return dx * dx + dy * dy <= reach * reach
+
+
+# pylint: disable=too-many-instance-attributes
+class PlayerBody:
+    """
+    The headless physics of a player.
+
+    Attributes
+    ----------
+    name : str
+        The name of the player.
+    x : float
+        The x-coordinate of the player's center.
+    y : float
+        The y-coordinate of the player's center.
+    config : Dict
+        A dictionary containing configuration settings.
+    elo : int
+        The Elo rating of the player.
+    radius : int
+        The radius of the player.
+    coord_initial : Vector2
+        The initial coordinates of the player.
+    hook_coords : Vector2
+        The coordinates of the player's hook.
+    hook_initial : Vector2
+        The initial coordinates of the hook.
+    coords_current : Vector2
+        The current coordinates of the player.
+    dash_started : Vector2
+        The starting coordinates of a dash.
+    dash_coords : Vector2
+        The current coordinates during a dash.
+    dash_destination : Vector2
+        The destination coordinates of a dash.
+    hook_cooldown_started : float
+        The time when the hook cooldown started.
+    hook_on_cooldown : bool
+        A boolean indicating whether the hook is on cooldown.
+    dash_cooldown_started : float
+        The time when the dash cooldown started.
+    dash_on_cooldown : bool
+        A boolean indicating whether the dash is on cooldown.
+    dashed_already : int
+        The number of dashes performed.
+    dash_length : int
+        The maximum length of a dash.
+    hooking : bool
+        A boolean indicating whether the player is in the process of hooking.
+    end_hook : bool
+        A boolean indicating whether the hook has reached the border.
+    pull : bool
+        A boolean indicating whether the player is being pulled.
+    dashing : bool
+        A boolean indicating whether the player is in the process of dashing.
+
+    Methods
+    -------
+    update(dt: float, mouse_pos: Tuple[int, int], time: float, actions: int) -> None
+        Update the player's state based on input and game logic.
+    move(dx: Union[int, float], dy: Union[int, float]) -> None
+        Move the player by a specified amount.
+    hook(dt: float) -> None
+        Move the hook towards the border.
+    pull_player(dt: float) -> None
+        Pull the player towards the hook.
+    intersect_vector_rectangle(point_a: Vector2, point_b: Vector2) -> Vector2
+        Find the intersection point between a vector and the game border.
+    invariant() -> bool
+        Ensure that the player stays inside the game borders.
+    hook_invarint() -> bool
+        Determine whether the hook is within the game borders.
+    dash(dt: float) -> None
+        Perform the dash action.
+    check_cooldowns(time: float) -> None
+        Check and update cooldowns for hook and dash actions.
+
+    Raises
+    ------
+    TypeError
+        If the parameters are of incorrect type.
+    """
+    #pylint: disable=too-many-arguments
+    def __init__(self, name: str, x: int, y: int, config: Dict, elo: int = 0,
+                 radius: int = 40):
+        if not isinstance(name, str) or not isinstance(config, dict):
+            raise TypeError("Incorrect type of the parameters.")
+        for integer in (x, y, elo, radius):
+            if not isinstance(integer, int):
+                raise TypeError("Incorrect type of the parameters.")
+        self.config = config
+        self.radius = radius
+        self.x, self.y = x, y
+        self.coord_initial = Vector2(x, y)
+        self.hook_coords = Vector2(x, y)
+        self.hook_initial = Vector2(x, y)
+        self.coords_current = Vector2(x, y)
+        self.dash_started = Vector2(x, y)
+        self.dash_coords = Vector2(x, y)
+        self.dash_destination = Vector2(x, y)
+        self.hook_cooldown_started = 0
+        self.hook_on_cooldown = False
+        self.dash_cooldown_started = 0
+        self.dash_on_cooldown = False
+
+        self.dashed_already = 0
+        self.dash_length = 8
+        self.hooking = False
+        self.end_hook = False
+        self.pull = False
+        self.dashing = False
+
+        self.elo = elo
+        self.name = name
+
+    # pylint: disable=too-many-branches
+    def update(self, dt: float, mouse_pos: Tuple[int, int], time: float, actions: int):
+        """
+        Update the player's state based on input and game logic.
+
+        Parameters
+        ----------
+        dt : float
+            The time step.
+        mouse_pos : Tuple[int, int]
+            The mouse coordinates.
+        time : float
+            The current time.
+        actions : int
+            Bitmask of the requested Action values.
+
+        Raises
+        ------
+        TypeError
+            If the parameters are of incorrect type.
+        """
+        if not isinstance(dt, float):
+            raise TypeError("Incorrect type of the parameters.")
+        if not isinstance(mouse_pos, Tuple) or not isinstance(mouse_pos[0], int) or not isinstance(mouse_pos[1], int):
+            raise TypeError("Incorrect type of the parameters.")
+        if not isinstance(time, float) or not isinstance(actions, int):
+            raise TypeError("Incorrect type of the parameters.")
+        if not self.pull:
+            if actions & Action.UP:
+                self.move(0, -500*dt)
+            if actions & Action.DOWN:
+                self.move(0, 500*dt)
+            if actions & Action.LEFT:
+                self.move(-500*dt, 0)
+            if actions & Action.RIGHT:
+                self.move(500*dt, 0)
+
+        if (actions & Action.HOOK and self.hooking is False
+                and not self.pull and not self.hook_on_cooldown):
+            # runs in the first tick after presing backspace
+            self.hook_cooldown_started = time
+            self.hook_on_cooldown = True
+            self.hooking = True
+            self.hook_coords.x = self.x
+            self.hook_coords.y = self.y
+            self.hook_initial.x = mouse_pos[0]
+            self.hook_initial.y = mouse_pos[1]
+            hook_wall = self.intersect_vector_rectangle(self.hook_coords,
+                                                        self.hook_initial)
+            self.hook_initial.x = hook_wall.x
+            self.hook_initial.y = hook_wall.y
+            self.hook(dt)
+        if self.end_hook:
+            # runs after it reaches boarder
+            self.end_hook = False
+            self.hooking = False
+        if self.hooking:
+            # runs after casting until reaching border
+            self.hook(dt)
+        if self.pull:
+            self.pull_player(dt)
+        if actions & Action.DASH and not self.dash_on_cooldown:
+            self.dash_cooldown_started = time
+            self.dash_destination.x = mouse_pos[0]
+            self.dash_destination.y = mouse_pos[1]
+            self.dash(dt)
+        self.check_cooldowns(time)
+
+    def move(self, dx: Union[int, float], dy: Union[int, float]):
+        """
+        Move the player by a specified amount.
+
+        Parameters
+        ----------
+        dx : Union[int, float]
+            The change in the x-coordinate.
+        dy : Union[int, float]
+            The change in the y-coordinate.
+
+        Raises
+        ------
+        TypeError
+            If the parameters are of incorrect type.
+
+        """
+        for d in (dx, dy):
+            if not isinstance(d, (int, float)):
+                raise TypeError("Dx and dy must be numbers.")
+        self.x += dx
+        self.y += dy
+        if self.x - self.radius < 0:
+            self.x = 5 + self.radius
+        elif self.x + self.radius > self.config["resolution"]["width"]:
+            self.x = self.config["resolution"]["width"] - self.radius - 5
+        if self.y - self.radius < 0:
+            self.y = 5 + self.radius
+        elif self.y + self.radius > self.config["resolution"]["height"]:
+            self.y = self.config["resolution"]["height"] - self.radius - 5
+
+    def hook(self, dt: Union[float, int]):
+        """
+        Move the hook towards the border, start pulling once it gets there.
+
+        Parameters
+        ----------
+        dt : float
+            The time step.
+
+        """
+        if not isinstance(dt, (float, int)):
+            raise TypeError("Dt must be a float")
+        direction = self.hook_initial - self.hook_coords
+        self.hook_coords += 1200*dt*(direction.normalize())
+        if not self.hook_invarint():
+            # begin pulling after geting out of boundary
+            self.end_hook = True
+            self.pull = True
+            self.coords_current.x = self.x
+            self.coords_current.y = self.y
+
+    def pull_player(self, dt: Union[float, int]):
+        """
+        Pull the player towards the hook.
+
+        Parameters
+        ----------
+        dt : float
+            The time step.
+        """
+        if not isinstance(dt, (float, int)):
+            raise TypeError("Dt must be a float")
+        direction = self.hook_initial - self.coords_current
+        self.coords_current += 1200*dt*(direction.normalize())
+        self.x = self.coords_current.x
+        self.y = self.coords_current.y
+        # make a seperate method
+        if not self.invariant():
+            self.pull = False
+
+    @staticmethod
+    def intersect_vector_rectangle(point_a: Vector2, point_b: Vector2):
+        """
+        Find the intersection point between a vector and the game border.
+
+        Parameters
+        ----------
+        point_a : Vector2
+            The starting point of the vector.
+        point_b : Vector2
+            The ending point of the vector.
+
+        Returns
+        -------
+        Vector2
+            The intersection point.
+        """
+        if not isinstance(point_a, Vector2) or not isinstance(point_b, Vector2):
+            raise TypeError("Both points must be a Vector2.")
+        # this method finds the point where vector between two points
+        # intersects with the border
+        stability = 0.00000001
+        t_1 = (-point_a.x)/max(point_b.x - point_a.x, stability)
+        t_2 = (1280 - point_a.x)/max(point_b.x - point_a.x, stability)
+        t_3 = (-point_a.y)/max(point_b.y - point_a.y, stability)
+        t_4 = (720 - point_a.y)/max(point_b.y - point_a.y, stability)
+        positive_solution = []
+        for t in (t_1, t_2, t_3, t_4):
+            if t > 0:
+                positive_solution.append(t)
+        final_t = min(positive_solution)
+        return Vector2(point_a.x + final_t*(point_b.x - point_a.x),
+                       point_a.y + final_t*(point_b.y - point_a.y))
+
+    def invariant(self):
+        """
+        Ensure that the player stays inside the game borders.
+
+        Returns
+        -------
+        bool
+            True if the player is inside the game borders, False otherwise.
+        """
+        # ensures that the player stays inside the game
+        if self.x - self.radius < 0:
+            self.x = self.config["match"]["border_width"] + self.radius
+            return False
+        if self.x + self.radius > self.config["resolution"]["width"]:
+            self.x = (self.config["resolution"]["width"]
+                      - self.radius - self.config["match"]["border_width"])
+            return False
+        if self.y - self.radius < 0:
+            self.y = self.config["match"]["border_width"] + self.radius
+            return False
+        if self.y + self.radius > self.config["resolution"]["height"]:
+            self.y = (self.config["resolution"]["height"] -
+                      self.radius - self.config["match"]["border_width"])
+            return False
+        return True
+
+    def hook_invarint(self):
+        """
+        Determine whether the hook is out of bounds.
+
+        Returns
+        -------
+        bool
+            True if the hook is within the game borders, False otherwise.
+        """
+        # determines whether hook is out of bounds
+        if (self.hook_coords.x < 0 or
+                self.hook_coords.x > self.config["resolution"]["width"]
+                or self.hook_coords.y < 0 or
+                self.hook_coords.y > self.config["resolution"]["height"]):
+            return False
+        return True
+
+    def dash(self, dt: float):
+        """
+        Perform the dash action.
+
+        Parameters
+        ----------
+        dt : float
+            The time step.
+        """
+        if not isinstance(dt, float):
+            raise TypeError("Dt must be a float")
+        if self.dashed_already == 0:
+            self.dash_started.x = self.x
+            self.dash_started.y = self.y
+            self.coords_current.x = self.x
+            self.coords_current.y = self.y
+        if self.dashed_already < self.dash_length:
+            direction = self.dash_destination - self.dash_started
+            self.coords_current += 1600*dt*(direction.normalize())
+            self.hooking = False
+            self.end_hook = False
+            self.pull = False
+            self.dashing = True
+            self.x = self.coords_current.x
+            self.y = self.coords_current.y
+            # make a seperate method
+            if not self.invariant():
+                self.dashing = False
+            self.dashed_already += 1
+        if self.dashed_already == self.dash_length:
+            self.dashed_already = 0
+            self.dash_on_cooldown = True
+
+    def check_cooldowns(self, time: float):
+        """
+        Check and update cooldowns for hook and dash.
+
+        Parameters
+        ----------
+        time : float
+            The current time.
+        """
+        if not isinstance(time, float):
+            raise TypeError("Time must be a float")
+        if time - self.dash_cooldown_started > 10:
+            self.dash_on_cooldown = False
+        if time - self.hook_cooldown_started > 20:
+            self.hook_on_cooldown = False
+
+
+class BallBody:
+    """
+    The headless physics of the ball.
+
+    Attributes
+    ----------
+    config : Dict
+        A configuration of the game.
+    radius : int
+        The radius of the ball.
+    x : float
+        The x-coordinate of the ball's center.
+    y : float
+        The y-coordinate of the ball's center.
+    speed : Vector2
+        A vector representing the speed of the ball.
+
+    Methods
+    -------
+    update(borders: Bounds)
+        Update the position and speed of the ball.
+    checkAndHandleRebound(playfield_border: Bounds)
+        Check and handle rebound when the ball collides with the playfield borders.
+    """
+    def __init__(self, config: Dict):
+        self.config = config
+        # radius
+        self.radius = 20
+
+        # ball should spawn in a middle of a field
+        self.x, self.y = self.config["resolution"]["width"] / \
+            2, self.config["resolution"]["height"]/2
+
+        self.speed = Vector2(0, 0)
+
+    def update(self, borders: Bounds):
+        """
+        Update the position and speed of the ball.
+
+        Parameters
+        ----------
+        borders : Bounds
+            A rectangle representing the borders of the playfield.
+        """
+        # updating position based on speed
+        self.x += self.speed.x
+        self.y += self.speed.y
+        # slowing down the ball
+        self.speed.x /= 1.003
+        self.speed.y /= 1.003
+        self.checkAndHandleRebound(borders)
+
+    def checkAndHandleRebound(self, playfield_border: Bounds):
+        """
+        Check and handle rebound when the ball collides with the playfield borders.
+
+        Parameters
+        ----------
+        playfield_border : Bounds
+            A rectangle representing the borders of the playfield.
+        """
+        # Check collision with the left or right border
+        if self.x - self.radius <= playfield_border.left:
+            self.speed.x = -self.speed.x
+            # Adjust position to the border edge
+            self.x = playfield_border.left + self.radius
+        elif self.x + self.radius >= playfield_border.right:
+            self.speed.x = -self.speed.x
+            # Adjust position to the border edge
+            self.x = playfield_border.right - self.radius
+
+        # Check collision with the top or bottom border
+        if self.y - self.radius <= playfield_border.top:
+            self.speed.y = -self.speed.y
+            # Adjust position to the border edge
+            self.y = playfield_border.top + self.radius
+        elif self.y + self.radius >= playfield_border.bottom:
+            self.speed.y = -self.speed.y
+            # Adjust position to the border edge
+            self.y = playfield_border.bottom - self.radius
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
@@ -0,0 +1,108 @@
+"""
+Vector Module
+-------------
+
+Module for a minimal pure-Python 2D vector with the subset of the
+pygame.math.Vector2 interface used by the simulation, so the server can run
+matches without importing pygame.
+"""
+import math
+
+
+class Vector2:
+    """
+    A mutable 2D vector.
+
+    Attributes
+    ----------
+    x : float
+        The x component.
+    y : float
+        The y component.
+
+    Methods
+    -------
+    length() -> float
+        Euclidean length of the vector.
+    normalize() -> Vector2
+        Vector of length 1 in the same direction.
+    normalize_ip()
+        Normalizes the vector in place.
+    """
+    __slots__ = ("x", "y")
+
+    def __init__(self, x=0.0, y=0.0):
+        self.x = x
+        self.y = y
+
+    def __add__(self, other):
+        return Vector2(self.x + other[0], self.y + other[1])
+
+    def __sub__(self, other):
+        return Vector2(self.x - other[0], self.y - other[1])
+
+    def __rsub__(self, other):
+        return Vector2(other[0] - self.x, other[1] - self.y)
+
+    def __mul__(self, scalar):
+        return Vector2(self.x * scalar, self.y * scalar)
+
+    __rmul__ = __mul__
+
+    def __iadd__(self, other):
+        self.x += other[0]
+        self.y += other[1]
+        return self
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __len__(self):
+        return 2
+
+    def __eq__(self, other):
+        return self.x == other[0] and self.y == other[1]
+
+    def __repr__(self):
+        return f"Vector2({self.x}, {self.y})"
+
+    def length(self):
+        """
+        Euclidean length of the vector.
+
+        Returns
+        -------
+        float
+            The length.
+        """
+        return math.hypot(self.x, self.y)
+
+    def normalize(self):
+        """
+        Vector of length 1 in the same direction.
+
+        Unlike pygame, a zero vector stays zero instead of raising, a single
+        degenerate input must not stop the shared simulation loop.
+
+        Returns
+        -------
+        Vector2
+            The normalized copy.
+        """
+        length = math.hypot(self.x, self.y)
+        if length == 0:
+            return Vector2(0.0, 0.0)
+        return Vector2(self.x / length, self.y / length)
+
+    def normalize_ip(self):
+        """
+        Normalize the vector in place, a zero vector stays zero.
+        """
+        length = math.hypot(self.x, self.y)
+        if length != 0:
+            self.x /= length
+            self.y /= length
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module is designed for import only.")
@@ -4,6 +4,7 @@ import pygame
 from match.elo import Elo
 from match.match_stats import MatchStats
 from game_objects.player import Player
+from simulation.bodies import Action
 from menu_elements.table import Table
 from menu_elements.button import Button
 from menu_elements.input_box import InputBox
@@ -11,6 +12,13 @@ from configuration_mod import Config
 from custom_exceptions import InvalidColorString, OutOfBoundsError
 from unittest.mock import Mock
 import utilities
+from assets import AssetManager
+from renderer import MatchRenderer
+from networking.match_link import MatchLink
+from game_objects.prediction import LocalPrediction
+import time
+from game_objects.ball import Ball
+from types import SimpleNamespace
 pygame.init()
 screen = pygame.display.set_mode(
 [340,300], pygame.HWSURFACE, 32)
@@ -76,6 +84,18 @@ def test_set_add_stats(create_entities):
         assert 59 == match_stats.stats[entity.name]["elo"]
         assert 1 == match_stats.stats[entity.name]["goals"]
 
+
+def test_player_keys_to_actions():
+    keys = [False] * 512
+    keys[pygame.KSCAN_UP] = True
+    keys[pygame.KSCAN_W] = True
+    keys[pygame.KSCAN_SPACE] = True
+    pressed = pygame.key.ScancodeWrapper(keys)
+    assert Player.keys_to_actions(pressed, "arrows") == Action.UP | Action.HOOK
+    assert Player.keys_to_actions(pressed, "wsad") == Action.UP | Action.HOOK
+    with pytest.raises(TypeError):
+        Player.keys_to_actions(pressed, "mouse")
+
     
 @pytest.mark.parametrize("text, size, x, y, display, color",[("auto", "b",
                             40, 550, pygame.surface.Surface([1000,1000]),
@@ -126,6 +146,31 @@ def test_get_image_invalid_input():
 def test_get_image_all_images_exist(name):
     image = utilities.get_image(name)
     assert isinstance(image, pygame.Surface)
+
+def test_asset_manager_loads_each_image_once():
+    assets = AssetManager()
+    path = utilities.IMAGE_PATHS["WOODEN"]
+    image = assets.image(path)
+    assert assets.image(path) is image and assets.loads == 1
+    smaller = assets.variant(path, scale=0.4)
+    assert assets.variant(path, scale=0.4) is smaller and assets.loads == 1
+    assert smaller.get_width() == round(image.get_width() * 0.4)
+    assert assets.variant(path, angle=90).get_size() == image.get_size()[::-1]
+    assert assets.memory_usage() >= image.get_pitch() * image.get_height()
+    with pytest.raises(FileNotFoundError):
+        assets.image("./../resources/missing.png")
+
+def test_asset_manager_keeps_recent_texts():
+    assets = AssetManager(text_capacity=2)
+    font = assets.font(32)
+    assert assets.font(32) is font
+    text = assets.render(font, "Play 1v1", "aqua")
+    assert assets.render(font, "Play 1v1", "aqua") is text
+    assert assets.render(font, "Play 1v1", "white") is not text
+    assets.render(font, "Play 2v2", "aqua")
+    assert assets.render(font, "Play 1v1", "aqua") is not text
+    assert (assets.text_hits, assets.text_misses) == (1, 4)
+
 @pytest.mark.parametrize("volume, expected",[(0, "0 %"), (1, "10 %"), (2, "20 %"), (3, "30 %"), (4, "40 %"),
              (5, "50 %"), (6, "60 %"), (7, "70 %"), (8, "80 %"), (9, "90 %"),
              (10, "100 %")])
@@ -401,3 +446,92 @@ def test_input_box_invalid_init_text(valid_input_box, text):
 def test_input_box_invalid_draw_updated(valid_input_box, screen):
     with pytest.raises(RuntimeError):
         valid_input_box.draw_updated(screen)
+
+def test_match_renderer_updates_only_dirty_rects():
+    config = Config().config
+    game = SimpleNamespace(display=pygame.Surface((1280, 720)), screen=screen,
+                           bg=pygame.Surface((1280, 720)), font=utilities.get_font(32),
+                           goal_1=pygame.Rect(0, 300, 20, 120), goal_2=pygame.Rect(1260, 300, 20, 120),
+                           border=pygame.Rect(0, 0, 1280, 720), border_width=5,
+                           player_1=Player("a", 100, 360, config), player_2=Player("b", 1180, 360, config),
+                           ball=Ball(config))
+    renderer = MatchRenderer(game)
+    match_data = [1, 60, 0, 0, "a", "b", 100, 360, 1180, 360, 0, 0, 0, 0,
+                  0, 0, 0, 0, 640, 360, False, False, False]
+    assert renderer.draw(match_data) == [pygame.Rect(0, 0, 1280, 720)]
+    old_ball = game.ball.rect.copy()
+    game.ball.x = 650
+    dirty = renderer.draw(match_data)
+    assert old_ball in dirty and game.ball.rect in dirty
+    assert renderer.updated_pixels < 1280 * 720 // 20
+    match_data[1] = 59
+    assert renderer.hud["timer"][0] == "Time Left: 60s"
+    renderer.draw(match_data)
+    assert renderer.hud["timer"][0] == "Time Left: 59s"
+
+def test_match_link_pipelines_inputs():
+    class SlowNet:
+        def __init__(self):
+            self.sent = []
+            self.answered = 0
+
+        def post(self, packet):
+            self.sent.append(packet)
+
+        def receive(self):
+            time.sleep(0.05)
+            self.answered += 1
+            if self.answered > 3:
+                # the server no longer knows the match
+                return None
+            flag = "end_game_state_1" if self.answered == 3 else "game_state_1"
+            return {"flag": flag, "data": [self.answered]}
+
+    net = SlowNet()
+    link = MatchLink(net, max_in_flight=5)
+    link.start()
+    start = time.perf_counter()
+    sent = [link.send({"flag": "ingame", "data": [seq]}) for seq in range(6)]
+    assert time.perf_counter() - start < 0.05
+    assert sent == [True] * 5 + [False]
+    link.join(timeout=5)
+    assert not link.is_alive() and net.answered == 5
+    # the replies to the inputs sent after the end are drained, not published
+    assert link.replies.version == 3 and link.replies.get()["flag"] == "end_game_state_1"
+    assert not link.send({"flag": "ingame", "data": [6]})
+
+def test_local_prediction_replays_unacknowledged_inputs():
+    config = Config().config
+    snapshot = [1, 60, 0, 0, "a", "b", 100.0, 360.0, 1180.0, 360.0, 100.0, 360.0, 1180.0, 360.0,
+                0, 0, 0, 0, 640.0, 360.0, False, False, False, 0]
+    prediction = LocalPrediction(config, snapshot, frame_rate=60)
+    for _ in range(10):
+        prediction.step((640, 360), int(Action.RIGHT))
+    assert prediction.body.x == pytest.approx(100 + 10 * 500 / 60)
+    # the server simulated 4 inputs and ended 2 pixels further
+    snapshot[6], snapshot[23] = 100 + 4 * 500 / 60 + 2, 4
+    prediction.reconcile(snapshot)
+    assert [entry[0] for entry in prediction.pending] == list(range(5, 11))
+    assert prediction.body.x == pytest.approx(100 + 10 * 500 / 60 + 2)
+    # the correction is shown over the next frames
+    assert prediction.position()[0] == pytest.approx(100 + 10 * 500 / 60)
+    for _ in range(30):
+        prediction.step((640, 360), int(Action.NONE))
+    assert prediction.position()[0] == pytest.approx(prediction.body.x, abs=0.01)
+
+def test_local_prediction_rolls_back_unsent_input():
+    config = Config().config
+    snapshot = [1, 60, 0, 0, "a", "b", 100.0, 360.0, 1180.0, 360.0, 100.0, 360.0, 1180.0, 360.0,
+                0, 0, 0, 0, 640.0, 360.0, False, False, False, 0]
+    prediction = LocalPrediction(config, snapshot, frame_rate=60)
+    prediction.step((640, 360), int(Action.RIGHT))
+    assert prediction.step((640, 360), int(Action.RIGHT)) == 2
+    prediction.rollback()
+    assert [entry[0] for entry in prediction.pending] == [1]
+    assert prediction.body.x == pytest.approx(100 + 500 / 60)
+    assert prediction.step((640, 360), int(Action.NONE)) == 2
+    # without any kept input the acknowledged state is restored
+    first = LocalPrediction(config, snapshot, frame_rate=60)
+    first.step((640, 360), int(Action.RIGHT))
+    first.rollback()
+    assert (first.seq, first.body.x) == (0, 100.0) and not first.pending
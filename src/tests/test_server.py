@@ -1,7 +1,32 @@
-from unittest.mock import MagicMock
+import socket
+import pickle
+import random
+import subprocess
+import sys
+import threading
+import time
+import datetime
+from contextlib import contextmanager
 import pytest
-from database.database_query import DBQuery
+from database.database_query import DBQuery, create_db_query, PREPARED_STATE_ERRORS
 from configuration_mod import Config
+from custom_exceptions import InvalidFrameError, PoolTimeoutError, SnapshotReadError
+from database.connection_pool import ConnectionPool
+from database.result_writer import MatchResult, MatchResultWriter
+from database.migrations import MigrationRunner
+from database.leaderboard import Leaderboard
+from database.profile_cache import ProfileCache, UserProfile
+from database.prepared import PreparedStatements
+from networking.protocol import FrameReader, send_frame, encode_frame, HEADER
+from networking.codec import encode_packet, decode_packet, MessageType, PacketCodec
+from match.scheduler import MatchScheduler
+from match.match import Match1v1
+from simulation.bodies import Action, PlayerBody, BallBody
+from simulation.batch import BatchEngine
+from match.shards import ShardMemory, ShardPool
+from match.sessions import SessionRegistry
+from match.matchmaking import MatchmakingQueue
+from server import Server
 class MockMatch1v1:
     def __init__(self, p1, p2, score):
         self.p1 = p1
@@ -14,13 +39,16 @@ class MockPlayer:
         self.name = name
         self.elo = elo
 
-# Pytest fixtures for creating DBQuery instances with a mocked connection
+# Pytest fixtures for creating DBQuery instances on a scratch SQLite database
 @pytest.fixture
-def db_query_mocked_connection(monkeypatch):
-    config = Config()
-    mock_db = DBQuery(config=config.config)  # provide your configuration here
-    monkeypatch.setattr(mock_db, 'connection', MagicMock())
-    return mock_db
+def db_query_sqlite(tmp_path):
+    config = Config().config
+    config["database"].update(backend="sqlite", sqlite_path=str(tmp_path / "novaglide.sqlite3"))
+    db_query = create_db_query(config)
+    MigrationRunner(db_query.pool, db_query.migrations_path).migrate()
+    db_query.allow_user_credentials("User1", "password1")
+    yield db_query
+    db_query.close_connection_to_db()
 
 # Pytest fixtures for creating a Match1v1 instance for testing
 @pytest.fixture
@@ -32,29 +60,898 @@ def mock_match_1v1():
 def mock_player():
     return MockPlayer("User1", 1000)
 
-def test_get_user_games(db_query_mocked_connection, mock_player):
-    result = db_query_mocked_connection.get_user_games(mock_player.name)
+def test_get_user_games(db_query_sqlite, mock_player):
+    result = db_query_sqlite.get_user_games(mock_player.name)
     assert isinstance(result, tuple)
 
-def test_get_user_won_games(db_query_mocked_connection, mock_player):
-    result = db_query_mocked_connection.get_user_won_games(mock_player.name)
+def test_get_user_won_games(db_query_sqlite, mock_player):
+    result = db_query_sqlite.get_user_won_games(mock_player.name)
     assert isinstance(result, tuple)
 
-def test_get_user_id(db_query_mocked_connection, mock_player):
-    result = db_query_mocked_connection.get_user_id(mock_player.name)
+def test_get_user_id(db_query_sqlite, mock_player):
+    result = db_query_sqlite.get_user_id(mock_player.name)
     assert isinstance(result, tuple)
 
-def test_get_user_name(db_query_mocked_connection):
-    result = db_query_mocked_connection.get_user_name(1)
+def test_get_user_name(db_query_sqlite):
+    result = db_query_sqlite.get_user_name(1)
     assert isinstance(result, tuple)
 
-def test_get_user_elo(db_query_mocked_connection, mock_player):
-    result = db_query_mocked_connection.get_user_elo(mock_player.name)
+def test_get_user_elo(db_query_sqlite, mock_player):
+    result = db_query_sqlite.get_user_elo(mock_player.name)
     assert isinstance(result, tuple)
 
-def test_get_user_winrate(db_query_mocked_connection, mock_player):
-    result = db_query_mocked_connection.get_user_winrate(mock_player.name)
+def test_new_user_gets_default_elo(db_query_sqlite):
+    db_query_sqlite.config["elo"]["default_elo"] = 1200
+    assert db_query_sqlite.allow_user_credentials("User2", "password2") == "registering new user"
+    assert db_query_sqlite.get_user_elo("User2") == (1200,)
+
+def test_get_user_winrate(db_query_sqlite, mock_player):
+    result = db_query_sqlite.get_user_winrate(mock_player.name)
     assert isinstance(result, tuple)
 
-def test_insert_1v1_game(db_query_mocked_connection, mock_match_1v1):
-    db_query_mocked_connection.insert_1v1_game(mock_match_1v1)
+def test_insert_1v1_game(db_query_sqlite, mock_match_1v1):
+    db_query_sqlite.insert_1v1_game(mock_match_1v1)
+
+@pytest.fixture
+def socket_pair():
+    left, right = socket.socketpair()
+    yield left, right
+    left.close()
+    right.close()
+
+def test_frame_reader_coalesced_frames(socket_pair):
+    left, right = socket_pair
+    right.sendall(encode_frame(b"first") + encode_frame(b"") + encode_frame(b"third"))
+    right.close()
+    reader = FrameReader(left)
+    assert bytes(reader.read_frame()) == b"first"
+    assert bytes(reader.read_frame()) == b""
+    assert bytes(reader.read_frame()) == b"third"
+    assert reader.read_frame() is None
+
+def test_frame_reader_partial_frame(socket_pair):
+    left, right = socket_pair
+    frame = encode_frame(pickle.dumps({"flag": "get_elo"}))
+    right.sendall(frame[:3])
+    right.sendall(frame[3:])
+    reader = FrameReader(left)
+    assert pickle.loads(reader.read_frame()) == {"flag": "get_elo"}
+
+def test_frame_reader_grows_buffer(socket_pair):
+    left, right = socket_pair
+    payload = pickle.dumps([(f"User{i}", 50, 1000) for i in range(20000)])
+    sender = threading.Thread(target=send_frame, args=(right, payload))
+    sender.start()
+    reader = FrameReader(left, buffer_size=16)
+    assert bytes(reader.read_frame()) == payload
+    sender.join()
+
+def test_frame_reader_closed_inside_frame(socket_pair):
+    left, right = socket_pair
+    right.sendall(HEADER.pack(10) + b"abc")
+    right.close()
+    with pytest.raises(ConnectionAbortedError):
+        FrameReader(left).read_frame()
+
+def test_encode_frame_too_large(monkeypatch):
+    monkeypatch.setattr("networking.protocol.MAX_FRAME_SIZE", 4)
+    with pytest.raises(InvalidFrameError):
+        encode_frame(b"12345")
+
+GAME_STATE_DATA = [2, 120.5, 3, 1, "User1", "Uživatel2", 100.25, 360.0, 1180.0, 200.5,
+                   100.25, 360.0, 900.0, 10.0, 4.5, 0.0, 0.0, 19.75, 640.0, 360.0,
+                   True, False, True, 57]
+
+def test_codec_game_state_round_trip():
+    packet = {"time": None, "sender": "server", "flag": "game_state_1",
+              "data": GAME_STATE_DATA}
+    payload = encode_packet(packet)
+    assert payload[0] == MessageType.GAME_STATE
+    assert len(payload) < 100
+    decoded = decode_packet(payload)
+    assert decoded["flag"] == "game_state_1"
+    assert decoded["data"][:6] == GAME_STATE_DATA[:6]
+    assert decoded["data"][6:20] == pytest.approx(GAME_STATE_DATA[6:20])
+    assert decoded["data"][20:] == [True, False, True, 57]
+
+def test_codec_input_round_trip():
+    packet = {"time": None, "sender": 42, "flag": "ingame",
+              "data": [(640, 360), Action.RIGHT | Action.DASH, 1234]}
+    decoded = decode_packet(encode_packet(packet))
+    assert decoded["sender"] == 42
+    assert decoded["data"] == [(640, 360), Action.RIGHT | Action.DASH, 1234]
+
+def test_codec_pickle_fallback():
+    packet = {"time": None, "sender": "server", "flag": "challengers",
+              "data": [("User1", 50, 1200)]}
+    assert decode_packet(encode_packet(packet)) == packet
+    assert decode_packet(encode_packet(None)) is None
+
+@pytest.mark.parametrize("payload", [b"", bytes((99,)), bytes((MessageType.GAME_STATE, 1, 2)),
+                                     bytes((MessageType.INPUT,)) + b"\xff" * 11])
+def test_codec_malformed_payload(payload):
+    with pytest.raises(InvalidFrameError):
+        decode_packet(payload)
+
+def exchange(server_codec, client_codec, data):
+    """Send a snapshot to the client and acknowledge it with an input."""
+    payload = server_codec.encode({"time": None, "sender": "server",
+                                   "flag": "game_state_1", "data": list(data)})
+    decoded = client_codec.decode(payload)
+    server_codec.decode(client_codec.encode({"time": None, "sender": 1, "flag": "ingame",
+                                             "data": [(0, 0), Action.NONE, 1]}))
+    return payload, decoded
+
+def test_codec_delta_after_acknowledgement():
+    server_codec, client_codec = PacketCodec(), PacketCodec()
+    keyframe, _ = exchange(server_codec, client_codec, GAME_STATE_DATA)
+    assert keyframe[0] == MessageType.GAME_STATE
+    moved = list(GAME_STATE_DATA)
+    moved[1], moved[18], moved[19] = 119.5, 650.0, 370.0
+    delta, decoded = exchange(server_codec, client_codec, moved)
+    assert delta[0] == MessageType.GAME_STATE_DELTA
+    assert len(delta) < len(keyframe) // 2
+    assert decoded["data"][:6] == moved[:6]
+    assert decoded["data"][6:20] == pytest.approx(moved[6:20])
+    assert decoded["data"][20:] == moved[20:]
+
+def test_codec_delta_of_changed_name():
+    server_codec, client_codec = PacketCodec(), PacketCodec()
+    exchange(server_codec, client_codec, GAME_STATE_DATA)
+    renamed = list(GAME_STATE_DATA)
+    renamed[5] = "Hráč3"
+    delta, decoded = exchange(server_codec, client_codec, renamed)
+    assert delta[0] == MessageType.GAME_STATE_DELTA
+    assert decoded["data"][4:6] == ["User1", "Hráč3"]
+
+def test_codec_keyframe_without_acknowledgement():
+    server_codec, client_codec = PacketCodec(), PacketCodec()
+    exchange(server_codec, client_codec, GAME_STATE_DATA)
+    # the client reconnected and lost its history
+    server_codec.decode(PacketCodec().encode({"time": None, "sender": 1, "flag": "ingame",
+                                              "data": [(0, 0), Action.NONE, 1]}))
+    payload = server_codec.encode({"time": None, "sender": "server",
+                                   "flag": "game_state_1", "data": GAME_STATE_DATA})
+    assert payload[0] == MessageType.GAME_STATE
+
+def test_codec_recovers_from_dropped_snapshot():
+    server_codec, client_codec = PacketCodec(), PacketCodec()
+    exchange(server_codec, client_codec, GAME_STATE_DATA)
+    # the client drops the snapshot the next delta is based on
+    client_codec.received.clear()
+    moved = list(GAME_STATE_DATA)
+    moved[18] = 650.0
+    delta, decoded = exchange(server_codec, client_codec, moved)
+    assert delta[0] == MessageType.GAME_STATE_DELTA
+    assert decoded["flag"] == "stale_snapshot" and decoded["data"] is None
+    assert server_codec.acked == 0
+    keyframe, decoded = exchange(server_codec, client_codec, moved)
+    assert keyframe[0] == MessageType.GAME_STATE
+    assert decoded["data"][18] == pytest.approx(650.0)
+
+class CountingMatch:
+    def __init__(self, steps):
+        self.steps = steps
+        self.simulated = 0.0
+
+    def match_loop(self, dt):
+        self.simulated += dt
+        self.steps -= 1
+        return self.steps == 0
+
+@pytest.fixture
+def scheduler():
+    config = Config().config
+    config["server"]["tick_rate"] = 50
+    config["server"]["max_catch_up_ticks"] = 3
+    return MatchScheduler(config)
+
+def test_scheduler_fixed_timestep(scheduler):
+    match = CountingMatch(1000)
+    scheduler.add_match(match)
+    assert scheduler.advance(10.0) == 1
+    assert scheduler.advance(10.01) == 0
+    assert scheduler.advance(10.02) == 1
+    assert scheduler.advance(10.045) == 1
+    assert match.simulated == pytest.approx(3 * 0.02)
+
+def test_scheduler_catch_up_and_skip(scheduler):
+    scheduler.add_match(CountingMatch(1000))
+    scheduler.advance(10.0)
+    # two ticks late, caught up in one go
+    assert scheduler.advance(10.061) == 3
+    assert scheduler.skipped_ticks == 0
+    # ten ticks late, three run and the rest skipped
+    assert scheduler.advance(10.281) == 3
+    assert scheduler.skipped_ticks == 8
+    assert scheduler.next_tick == pytest.approx(10.3)
+
+def test_scheduler_removes_finished_matches(scheduler):
+    short, long = CountingMatch(2), CountingMatch(5)
+    scheduler.add_match(short)
+    scheduler.add_match(long)
+    for _ in range(3):
+        scheduler.tick()
+    assert scheduler.matches == [long]
+    assert scheduler.ticks == 3
+
+def test_match_advances_by_fixed_steps():
+    config = Config().config
+    match = Match1v1(config, PlayerBody("P1", 100, 360, config, elo=1000),
+                     PlayerBody("P2", 1180, 360, config, elo=1000),
+                     BallBody(config), 1, 2)
+    for _ in range(120):
+        assert not match.match_loop(1 / 60)
+    assert match.elapsed_time == pytest.approx(2)
+    assert match.remaining_time == pytest.approx(match.match_duration - 2)
+
+def test_server_runs_without_pygame():
+    code = "import sys, server; sys.exit('pygame' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], check=False).returncode == 0
+
+def test_player_body_moves_and_dashes():
+    config = Config().config
+    player = PlayerBody("P1", 640, 360, config)
+    player.update(0.1, (640, 0), 1.0, Action.UP | Action.RIGHT)
+    assert (player.x, player.y) == pytest.approx((690, 310))
+    player.update(0.01, (1280, 310), 2.0, Action.DASH)
+    assert player.x == pytest.approx(706)
+    assert player.dash_cooldown_started == 2.0
+
+def test_ball_goal_scored():
+    config = Config().config
+    match = Match1v1(config, PlayerBody("P1", 100, 360, config),
+                     PlayerBody("P2", 1180, 360, config), BallBody(config), 1, 2)
+    match.ball.x = 10
+    match.match_loop(1 / 60)
+    assert match.score == (0, 1)
+    assert (match.ball.x, match.ball.y) == (640, 360)
+
+def batch_test_match(config, seed):
+    generator = random.Random(seed)
+    match = Match1v1(config, PlayerBody(f"A{seed}", generator.randint(200, 600),
+                                        generator.randint(100, 600), config),
+                     PlayerBody(f"B{seed}", 1180, 360, config), BallBody(config), 1, 2)
+    match.match_duration = 3
+    match.ball.speed.x = generator.uniform(-25, 25)
+    match.ball.speed.y = generator.uniform(-25, 25)
+    return match
+
+def test_batch_engine_matches_scalar_path():
+    config = Config().config
+    scalar = [batch_test_match(config, seed) for seed in range(12)]
+    batched = [batch_test_match(config, seed) for seed in range(12)]
+    # a small capacity makes the engine grow while adding
+    engine = BatchEngine(config, capacity=4)
+    for match in batched:
+        engine.add_match(match)
+    generator = random.Random(0)
+    ended = []
+    for _ in range(600):
+        for scalar_match, batched_match in zip(scalar, batched):
+            for side in (1, 2):
+                if generator.random() < 0.3:
+                    inputs = [(generator.randint(0, 1280), generator.randint(0, 720)),
+                              generator.randint(0, 63)]
+                    scalar_match.set_input(side, inputs)
+                    batched_match.set_input(side, inputs)
+        for match in scalar:
+            if match.playing:
+                match.match_loop(1 / 60)
+        ended.extend(engine.step(1 / 60))
+        for scalar_match, batched_match in zip(scalar, batched):
+            expected, actual = scalar_match.share_state(), batched_match.share_state()
+            assert actual[3:5] == expected[3:5]
+            assert actual[:3] + actual[5:] == pytest.approx(expected[:3] + expected[5:])
+    assert ended and len(ended) + engine.count == len(batched)
+    for scalar_match, batched_match in zip(scalar, batched):
+        assert batched_match.playing == scalar_match.playing
+        if not batched_match.playing:
+            assert batched_match.get_match_stats() == scalar_match.get_match_stats()
+
+def test_batch_engine_remove_moves_last_row():
+    config = Config().config
+    engine = BatchEngine(config)
+    matches = [batch_test_match(config, seed) for seed in range(3)]
+    for match in matches:
+        engine.add_match(match)
+    expected = matches[2].share_state()
+    engine.remove_match(matches[0])
+    assert matches[0].engine is None
+    assert matches[2].slot == 0
+    assert matches[2].share_state() == expected
+    assert engine.matches == [matches[2], matches[1]]
+
+def test_shard_memory_state_and_inputs():
+    config = Config().config
+    memory = ShardMemory(2)
+    try:
+        state = batch_test_match(config, 0).share_state()
+        memory.write_state(1, state)
+        assert memory.versions[1] % 2 == 0
+        assert memory.read_state(1) == pytest.approx(state[:3] + state[5:])
+        assert memory.read_input(0, 2) == (0, [(0, 0), 0])
+        memory.write_input(0, 2, [(300, 200), int(Action.HOOK)])
+        assert memory.read_input(0, 2) == (1, [(300, 200), 16])
+    finally:
+        memory.close()
+        memory.unlink()
+
+def test_shard_memory_read_gives_up_on_stuck_writer():
+    config = Config().config
+    memory = ShardMemory(2)
+    try:
+        state = batch_test_match(config, 0).share_state()
+        memory.write_state(0, state)
+        # a worker stopped in the middle of a write leaves the version odd
+        memory.versions[0] += 1
+        memory.states[0] = 0
+        assert memory.read_state(0) == pytest.approx(state[:3] + state[5:])
+        memory.versions[1] += 1
+        with pytest.raises(SnapshotReadError):
+            memory.read_state(1)
+    finally:
+        memory.close()
+        memory.unlink()
+
+def test_shard_pool_runs_matches_in_workers():
+    config = Config().config
+    config["server"]["shards"] = 2
+    config["server"]["shard_capacity"] = 2
+    pool = ShardPool(config)
+    pool.start()
+    try:
+        remotes = []
+        for seed in range(3):
+            match = batch_test_match(config, seed)
+            match.match_duration = 0.5
+            match.score = (1, 0)
+            remotes.append(pool.add_match(match))
+        assert [remote.shard.index for remote in remotes] == [0, 1, 0]
+        remotes[0].set_input(1, [(1280, 360), int(Action.RIGHT)])
+        deadline = time.monotonic() + 10
+        while any(remote.playing for remote in remotes) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        for remote in remotes:
+            assert not remote.playing
+            assert remote.get_match_stats()[1] == remote.p1.name
+            state = remote.share_state()
+            assert state[3:5] == [remote.p1.name, remote.p2.name]
+            assert state[0] == 0
+        assert sum(len(shard.free_slots) for shard in pool.shards) == 4
+        assert all(stats["ticks"] > 0 for stats in pool.stats())
+    finally:
+        pool.stop()
+
+def test_session_registry_lookup_and_remove():
+    config = Config().config
+    registry = SessionRegistry()
+    first, second = batch_test_match(config, 0), batch_test_match(config, 1)
+    second.p1_id, second.p2_id = 3, 4
+    registry.add_match(first)
+    registry.add_match(second)
+    assert registry.lookup("4") == (second, 2)
+    assert registry.lookup(1) == (first, 1)
+    assert not registry.remove_player(1)
+    assert registry.remove_player(2)
+    assert registry.lookup(1) is None and len(registry) == 2
+
+def test_stream_match_routes_to_the_players_match():
+    config = Config().config
+    server = Server.__new__(Server)
+    server.sessions = SessionRegistry()
+    matches = [batch_test_match(config, seed) for seed in range(3)]
+    for index, match in enumerate(matches):
+        match.p1_id, match.p2_id = 2 * index, 2 * index + 1
+        server.sessions.add_match(match)
+    inputs = [(640, 360), int(Action.LEFT)]
+    reply = server.stream_match({"sender": 5, "flag": "ingame", "data": inputs + [7]})
+    assert reply["flag"] == "game_state_1"
+    assert reply["data"][:1] + reply["data"][4:6] == [2, "A2", "B2"]
+    assert matches[2].p_2_update == inputs
+    # the snapshot was simulated with the input before the one just received
+    assert reply["data"][23] == 0
+    assert server.stream_match({"sender": 5, "flag": "ingame", "data": inputs + [8]})["data"][23] == 7
+    assert server.stream_match({"sender": 9, "flag": "ingame", "data": inputs + [1]}) is None
+
+def test_players_leave_session_registry():
+    config = Config().config
+    server = Server.__new__(Server)
+    server.sessions = SessionRegistry()
+    server.matchmaking = MatchmakingQueue(config)
+    recorded = []
+    server.record_match = recorded.append
+    match = batch_test_match(config, 0)
+    match.p1_id, match.p2_id = 1, 2
+    server.sessions.add_match(match)
+    inputs = [(640, 360), int(Action.NONE), 1]
+    server.disconnect_client(2)
+    assert server.sessions.lookup(2) is None and server.sessions.lookup(1) == (match, 1)
+    # a reused id is no longer routed to the old match
+    assert server.stream_match({"sender": 2, "flag": "ingame", "data": inputs}) is None
+    match.playing = False
+    reply = server.stream_match({"sender": 1, "flag": "ingame", "data": inputs})
+    assert reply["flag"] == "end_game_state_1"
+    assert len(server.sessions) == 0 and recorded == [match]
+
+@pytest.fixture
+def matchmaking():
+    config = Config().config
+    config["matchmaking"].update(initial_window=50, window_growth=25, max_window=400,
+                                 bucket_width=50)
+    return MatchmakingQueue(config)
+
+def test_matchmaking_pairs_closest_elo(matchmaking):
+    for player_id, elo in ((1, 1000), (2, 1490), (3, 1030), (4, 1520), (5, 2500)):
+        assert matchmaking.join(player_id, f"P{player_id}", elo, now=0)
+    assert not matchmaking.join(1, "P1", 1000, now=0)
+    pairs = matchmaking.find_pairs(now=0)
+    assert [(first.player_id, second.player_id) for first, second in pairs] == [(1, 3), (2, 4)]
+    assert len(matchmaking) == 1 and 5 in matchmaking
+
+def test_matchmaking_window_widens_with_wait_time(matchmaking):
+    matchmaking.join(1, "P1", 1000, now=0)
+    matchmaking.join(2, "P2", 1200, now=4)
+    assert matchmaking.find_pairs(now=5) == []
+    # 50 + 25 * 6 reaches the difference of 200
+    pairs = matchmaking.find_pairs(now=6)
+    assert [(first.name, second.name) for first, second in pairs] == [("P1", "P2")]
+    assert matchmaking.wait_time_percentiles((50, 99)) == {50: 2, 99: 6}
+
+def test_matchmaking_leave(matchmaking):
+    matchmaking.join(1, "P1", 1000, now=0)
+    matchmaking.join(2, "P2", 1000, now=0)
+    assert matchmaking.leave(2)
+    assert not matchmaking.leave(2)
+    assert matchmaking.find_pairs(now=100) == []
+    assert len(matchmaking) == 1
+
+def test_paired_player_polling_is_not_queued_again():
+    config = Config().config
+    server = Server.__new__(Server)
+    server.config = config
+    server.sessions = SessionRegistry()
+    server.matchmaking = MatchmakingQueue(config)
+    server.scheduler = MatchScheduler(config)
+    server.shards = None
+    server.notify_playing = set()
+    server.player_names = {1: "A", 2: "B"}
+    server.leaderboard = Leaderboard(LeaderboardDatabase([(1, "A", 1000, 0, 0, 0),
+                                                          (2, "B", 1010, 0, 0, 0)]), config)
+    server.leaderboard.reload()
+    poll = {"flag": "queued_solo", "data": ["no_data"]}
+    for player_id in (1, 2):
+        server.handle_queued_solo(dict(poll, sender=player_id))
+
+    def start_match(first, second):
+        # the clients keep polling while their match is being created
+        server.handle_queued_solo(dict(poll, sender=1))
+        assert len(server.matchmaking) == 0
+        server.create_match(first, second)
+        server.handle_queued_solo(dict(poll, sender=2))
+
+    assert len(server.matchmaking.find_pairs(on_pair=start_match)) == 1
+    assert len(server.matchmaking) == 0
+    assert server.sessions.lookup(1)[1] == 1 and server.sessions.lookup(2)[1] == 2
+    server.handle_queued_solo(dict(poll, sender=1))
+    assert len(server.matchmaking) == 0
+
+class FakeConnection:
+    def __init__(self, fail_on=None):
+        self.closed = False
+        self.commits = 0
+        self.rollbacks = 0
+        self.executed = []
+        self.queries = []
+        self.rows = [(1,)]
+        self.fail_on = fail_on
+
+    def cursor(self):
+        if self.closed:
+            raise ConnectionError("closed")
+        return MockCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+class MockCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, query, params=()):
+        self.connection.executed.append(params)
+        self.connection.queries.append(query)
+        if len(self.connection.executed) == self.connection.fail_on:
+            raise RuntimeError("statement failed")
+
+    def fetchone(self):
+        return (1,)
+
+    def fetchall(self):
+        return self.connection.rows
+
+    def close(self):
+        pass
+
+def test_connection_pool_reuses_connections():
+    opened = []
+    pool = ConnectionPool(lambda: opened.append(FakeConnection()) or opened[-1],
+                          min_size=1, max_size=2, checkout_timeout=0.05, health_check_idle=60)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert len(opened) == 1 and first.commits == 2
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError
+    assert first.rollbacks == 1 and pool.idle == 1
+
+def test_connection_pool_checkout_timeout():
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=2,
+                          checkout_timeout=0.05, health_check_idle=60)
+    borrowed = [pool.getconn(), pool.getconn()]
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+    assert pool.waits == 1
+    pool.putconn(borrowed[0])
+    assert pool.getconn() is borrowed[0]
+
+def test_connection_pool_replaces_broken_connections():
+    pool = ConnectionPool(FakeConnection, min_size=1, max_size=1,
+                          checkout_timeout=0.05, health_check_idle=0)
+    stale = pool.getconn()
+    pool.putconn(stale)
+    # the health check of the idle connection fails, a new one is opened
+    stale.closed = True
+    fresh = pool.getconn()
+    assert fresh is not stale and pool.size == 1
+    pool.putconn(fresh, broken=True)
+    # a returned broken connection is replaced to keep min_size open
+    assert fresh.closed and pool.size == 1 and pool.idle == 1
+    replacement = pool.getconn()
+    assert replacement is not fresh
+
+    def refuse():
+        raise ConnectionError("database down")
+
+    pool.connect = refuse
+    pool.putconn(replacement, broken=True)
+    assert pool.size == 0 and pool.idle == 0
+
+def pooled_db_query(connection):
+    db_query = DBQuery.__new__(DBQuery)
+    db_query.pool = ConnectionPool(lambda: connection, min_size=1, max_size=1,
+                                   checkout_timeout=0.05, health_check_idle=60)
+    db_query.statements = PreparedStatements()
+    db_query.profiles = ProfileCache(db_query.get_user_profile, capacity=10)
+    return db_query
+
+def executed_statements(connection):
+    return [params for query, params in zip(connection.queries, connection.executed)
+            if not query.startswith("PREPARE")]
+
+@pytest.mark.parametrize("fail_on", [None, 4])
+def test_record_1v1_match_single_transaction(mock_match_1v1, fail_on):
+    connection = FakeConnection(fail_on)
+    db_query = pooled_db_query(connection)
+    mock_match_1v1.p1_id, mock_match_1v1.p2_id = 1, 2
+    if fail_on is None:
+        db_query.record_1v1_match(mock_match_1v1, 1240, 1060)
+        assert [params[-1] for params in executed_statements(connection)[1:]] == [1, 2]
+        assert (connection.commits, connection.rollbacks) == (1, 0)
+    else:
+        # the second rating update fails, nothing of the match is committed
+        with pytest.raises(RuntimeError):
+            db_query.record_1v1_match(mock_match_1v1, 1240, 1060)
+        assert (connection.commits, connection.rollbacks) == (0, 1)
+
+class FlakyDatabase:
+    def __init__(self, failures):
+        self.failures = failures
+        self.batches = []
+
+    def record_1v1_matches(self, results):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(results))
+
+@pytest.fixture
+def writer_config(tmp_path):
+    config = Config().config
+    config["database"].update(write_queue_size=100, write_batch_size=3, write_retry_delay=0.01,
+                              write_max_retry_delay=0.02,
+                              write_spill_path=str(tmp_path / "results.pending"))
+    return config
+
+def match_result(index):
+    return MatchResult(2 * index, 2 * index + 1, f"A{index}", f"B{index}", 1000, 1000, 2, 1,
+                       datetime.datetime(2024, 1, 1), 40, -40)
+
+def test_result_writer_batches_and_retries(writer_config):
+    database = FlakyDatabase(failures=2)
+    writer = MatchResultWriter(database, writer_config)
+    for index in range(5):
+        writer.submit(match_result(index))
+    assert writer.queue_depth == 5
+    writer.start()
+    deadline = time.monotonic() + 5
+    while writer.written < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.stop()
+    assert [len(batch) for batch in database.batches] == [3, 2]
+    assert writer.written == 5 and writer.failed_attempts == 2
+    assert writer.queue_depth == 0
+
+def test_result_writer_spills_on_shutdown(writer_config):
+    writer = MatchResultWriter(FlakyDatabase(failures=10 ** 6), writer_config)
+    writer.start()
+    for index in range(4):
+        writer.submit(match_result(index))
+    writer.stop()
+    assert writer.written == 0
+    # the next writer submits the spilled results again
+    database = FlakyDatabase(failures=0)
+    writer = MatchResultWriter(database, writer_config)
+    writer.start()
+    writer.stop()
+    assert sorted(result for batch in database.batches for result in batch) == \
+        [match_result(index) for index in range(4)]
+
+class PoisonDatabase(FlakyDatabase):
+    def __init__(self, poison):
+        super().__init__(failures=0)
+        self.poison = poison
+
+    def record_1v1_matches(self, results):
+        if self.poison in results:
+            raise RuntimeError("constraint violated")
+        super().record_1v1_matches(results)
+
+def test_result_writer_splits_failing_batch(writer_config):
+    writer_config["database"].update(write_batch_size=8, write_max_attempts=2)
+    database = PoisonDatabase(match_result(5))
+    writer = MatchResultWriter(database, writer_config)
+    for index in range(8):
+        writer.submit(match_result(index))
+    writer.start()
+    deadline = time.monotonic() + 5
+    while writer.written + writer.rejected < 8 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.stop()
+    assert writer.written == 7 and writer.rejected == 1
+    assert sorted(result for batch in database.batches for result in batch) == \
+        [match_result(index) for index in range(8) if index != 5]
+    with open(writer_config["database"]["write_spill_path"], encoding="utf-8") as spill:
+        assert [MatchResult.from_json(line) for line in spill] == [match_result(5)]
+
+def test_result_writer_loads_spill_larger_than_queue(writer_config):
+    writer_config["database"]["write_queue_size"] = 2
+    with open(writer_config["database"]["write_spill_path"], "w", encoding="utf-8") as spill:
+        spill.writelines(match_result(index).to_json() + "\n" for index in range(7))
+    database = FlakyDatabase(failures=0)
+    writer = MatchResultWriter(database, writer_config)
+    writer.start()
+    writer.stop()
+    assert writer.written == 7
+    assert [len(batch) for batch in database.batches] == [3, 3, 1]
+
+def test_record_1v1_matches_updates_counters_once_per_player():
+    connection = FakeConnection()
+    db_query = pooled_db_query(connection)
+    rematch = match_result(0)._replace(p2_id=5, p2_name="C", goals_p1=0, goals_p2=0,
+                                       p1_elo_change=-3, p2_elo_change=3)
+    db_query.record_1v1_matches([match_result(0), rematch])
+    insert, *updates = executed_statements(connection)
+    assert len(insert) == 14
+    # elo change, games played, games won twice for the win rate, id
+    assert updates == [(37, 2, 1, 1, 2, 0), (-40, 1, 0, 0, 1, 1), (3, 1, 0, 0, 1, 5)]
+    assert connection.commits == 1
+
+def test_profile_cache_lru_by_id_and_name():
+    users = {index: UserProfile(index, f"P{index}", 1000 + index, 50) for index in range(5)}
+    loads = []
+
+    def load(player_id=None, name=None):
+        loads.append(player_id if player_id is not None else name)
+        if player_id is None:
+            player_id = int(name[1:]) if name[1:].isdigit() else -1
+        return users.get(player_id)
+
+    cache = ProfileCache(load, capacity=2)
+    assert cache.by_name("P1").elo == 1001
+    assert cache.by_id(1).name == "P1" and cache.by_name("P1").player_id == 1
+    assert cache.by_name("nobody") is None and cache.by_name("nobody") is None
+    assert loads == ["P1", "nobody", "nobody"]
+    cache.by_id(2)
+    cache.by_id(1)
+    cache.by_id(3)
+    # P2 was the least recently used
+    assert len(cache) == 2 and cache.by_name("P2") is not None
+    assert loads[-1] == "P2"
+    cache.invalidate(2)
+    users[2] = users[2]._replace(elo=1100)
+    assert cache.by_id(2).elo == 1100
+    assert (cache.hits, cache.misses) == (3, 7)
+
+def test_rating_writes_invalidate_profiles():
+    connection = FakeConnection()
+    db_query = pooled_db_query(connection)
+    db_query.profiles.load = lambda player_id=None, name=None: UserProfile(0, "A0", 1000, 0)
+    assert db_query.get_user_elo("A0") == (1000,)
+    assert db_query.get_user_id("A0") == (0,)
+    db_query.record_1v1_matches([match_result(0)])
+    assert len(db_query.profiles) == 0
+
+def test_statements_prepared_once_per_connection():
+    statements = PreparedStatements()
+    first, second = FakeConnection(), FakeConnection()
+    query = "SELECT Elo FROM user_data WHERE Name = %s AND id = %s"
+    for connection in (first, first, second):
+        statements.run(MockCursor(connection), query, ("A", 1))
+    assert first.queries == ["PREPARE novaglide_1 AS SELECT Elo FROM user_data WHERE Name = $1 AND id = $2",
+                             "EXECUTE novaglide_1 (%s, %s)", "EXECUTE novaglide_1 (%s, %s)"]
+    assert second.queries[0] == first.queries[0] and statements.prepares == 2
+    # after a reset the connection drops its statements and prepares them again
+    statements.reset(first)
+    statements.run(MockCursor(first), query, ("A", 1))
+    assert first.queries[3:] == ["DEALLOCATE ALL"] + first.queries[:2]
+
+def test_record_1v1_matches_retries_lost_prepared_statements():
+    connection = FakeConnection()
+    db_query = pooled_db_query(connection)
+    run = db_query.statements.run
+    failures = [PREPARED_STATE_ERRORS[0]()]
+
+    def run_once_lost(cursor, query, params=()):
+        if failures:
+            raise failures.pop()
+        run(cursor, query, params)
+
+    db_query.statements.run = run_once_lost
+    db_query.record_1v1_matches([match_result(0)])
+    assert (connection.commits, connection.rollbacks) == (1, 1)
+    assert "DEALLOCATE ALL" in connection.queries
+
+def test_history_page_chains_keyset_cursors():
+    connection = FakeConnection()
+    db_query = pooled_db_query(connection)
+    db_query.config = Config().config
+    db_query.config["database"]["history_page_size"] = 3
+    games = [(index, "A", "B", 1000, 1000, 1, 0, datetime.datetime(2024, 1, 1 + index % 2))
+             for index in range(4, 0, -1)]
+    connection.rows = games
+    rows, before = db_query.get_history_page("A")
+    assert rows == games[:3] and before == (games[2][-1], games[2][0])
+    connection.rows = games[3:]
+    rows, before = db_query.get_history_page("A", before=before)
+    assert rows == games[3:] and before is None
+    query, params = connection.queries[-2], connection.executed[-1]
+    assert "OFFSET" not in query and "(Date, id) < ($2, $3)" in query
+    # name, cursor and one more row than the page for both player columns
+    assert params == ("A", games[2][-1], 2, 4) * 2 + (4,)
+
+def test_sqlite_backend_records_and_pages_history(db_query_sqlite):
+    db_query_sqlite.allow_user_credentials("User2", "password2")
+    results = [match_result(0)._replace(p1_id=1, p2_id=2, p1_name="User1", p2_name="User2",
+                                        date=datetime.datetime(2024, 1, 1, 12, index % 3),
+                                        p1_elo_change=10, p2_elo_change=-10)
+               for index in range(25)]
+    db_query_sqlite.record_1v1_matches(results)
+    assert db_query_sqlite.get_user_elo("User1") == (1250,)
+    assert db_query_sqlite.get_user_games("User2") == (25,)
+    assert db_query_sqlite.get_user_winrate("User1") == (100,)
+    assert db_query_sqlite.query_data("top_elo") == [(750,)]
+    assert db_query_sqlite.query_data("get_challengers")[0] == ("User1", 100, 1250)
+    pages, before = [], None
+    while True:
+        rows, before = db_query_sqlite.get_history_page("User2", before=before, page_size=10)
+        pages.append(rows)
+        if before is None:
+            break
+    assert [len(rows) for rows in pages] == [10, 10, 5]
+    # newest first, games of the same date by descending id, none repeated
+    keys = [(row[-1], row[0]) for rows in pages for row in rows]
+    assert keys == sorted(set(keys), reverse=True) and len(keys) == 25
+    assert isinstance(keys[0][0], datetime.datetime)
+    assert db_query_sqlite.get_history("User1", solo=False) == []
+
+def test_sqlite_win_counters_migration_backfills_counters(db_query_sqlite):
+    db_query_sqlite.allow_user_credentials("User2", "password2")
+    result = match_result(0)._replace(p1_id=1, p2_id=2, p1_name="User1", p2_name="User2")
+    db_query_sqlite.record_1v1_matches([result, result, result._replace(goals_p1=0)])
+    runner = MigrationRunner(db_query_sqlite.pool, db_query_sqlite.migrations_path)
+    _, _, file_path = runner.available()[1]
+    with open(file_path, encoding="utf-8") as migration:
+        backfill = migration.read()
+    with db_query_sqlite.pool.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE user_data SET Games_played = 0, Games_won = 0, Winrate = 0")
+            cursor.execute(backfill)
+    assert db_query_sqlite.get_user_games("User1") == (3,)
+    assert db_query_sqlite.get_user_won_games("User2") == (1,)
+    assert db_query_sqlite.get_user_winrate("User1") == (66,)
+
+def test_migration_runner_applies_pending_in_order(tmp_path):
+    for file_name in ("0002_second.sql", "0001_first.sql", "0010_tenth.sql", "notes.txt"):
+        (tmp_path / file_name).write_text(f"-- {file_name}")
+    connection = FakeConnection()
+    pool = ConnectionPool(lambda: connection, min_size=1, max_size=1,
+                          checkout_timeout=0.05, health_check_idle=60)
+    runner = MigrationRunner(pool, str(tmp_path))
+    assert [version for version, _, _ in runner.available()] == [1, 2, 10]
+    # the fake database reports version 1 as applied
+    assert runner.migrate() == [2, 10]
+    assert (2, "second") in connection.executed and (10, "tenth") in connection.executed
+
+def test_repository_migrations_are_well_formed():
+    runner = MigrationRunner(None, Config().config["database"]["migrations_path"])
+    versions = [version for version, _, _ in runner.available()]
+    assert versions == list(range(1, len(versions) + 1))
+
+class LeaderboardDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get_leaderboard_rows(self):
+        return list(self.rows)
+
+def test_leaderboard_matches_sorted_table():
+    rng = random.Random(3)
+    rows = [(index, f"P{index}", rng.randint(700, 1300), 50, 0, 0) for index in range(500)]
+    leaderboard = Leaderboard(LeaderboardDatabase(rows), Config().config)
+    leaderboard.reload()
+    ordered = sorted(rows, key=lambda row: (-row[2], row[1]))
+    assert leaderboard.top(100) == [(name, winrate, elo) for _, name, elo, winrate, _, _ in ordered[:100]]
+    assert leaderboard.top_elo() == [(ordered[99][2],), (ordered[-1][2],)]
+    for player_id, _, elo, _, _, _ in rows[:50]:
+        assert leaderboard.rank(player_id) == 1 + sum(row[2] > elo for row in rows)
+    assert leaderboard.elo_at(501) is None
+
+def test_leaderboard_keeps_unwritten_results_over_reload():
+    rows = [(0, "A0", 1000, 0, 0, 0), (1, "B0", 1000, 0, 0, 0)]
+    database = LeaderboardDatabase(rows)
+    leaderboard = Leaderboard(database, Config().config)
+    leaderboard.reload()
+    result = match_result(0)
+    leaderboard.record_result(result)
+    assert leaderboard.top(2) == [("A0", 100, 1040), ("B0", 0, 960)]
+    assert leaderboard.top_elo() == [(960,)]
+    # the database does not have the result yet, the reload replays it
+    leaderboard.reload()
+    assert leaderboard.profile("A0").elo == 1040
+    database.rows = [(0, "A0", 1040, 100, 1, 1), (1, "B0", 960, 0, 1, 0)]
+    leaderboard.confirm_written([result])
+    leaderboard.reload()
+    assert leaderboard.profile("A0").games_played == 1
+    assert leaderboard.rank(1) == 2
+
+def test_leaderboard_reload_waits_for_batch_being_written():
+    database = LeaderboardDatabase([(0, "A0", 1000, 0, 0, 0), (1, "B0", 1000, 0, 0, 0)])
+    leaderboard = Leaderboard(database, Config().config)
+    leaderboard.reload()
+    result = match_result(0)
+    leaderboard.record_result(result)
+    reloader = threading.Thread(target=leaderboard.reload)
+    with leaderboard.writing([result]):
+        reloader.start()
+        time.sleep(0.05)
+        assert reloader.is_alive()
+        # the batch commits, the rows now contain the result
+        database.rows = [(0, "A0", 1040, 100, 1, 1), (1, "B0", 960, 0, 1, 0)]
+    reloader.join(timeout=5)
+    assert leaderboard.profile("A0").elo == 1040
+    assert leaderboard.profile("A0").games_played == 1
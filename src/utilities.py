@@ -5,13 +5,16 @@
 Functions
 ---------
 get_font(size: int) -> pygame.font.Font:
-    Returns a Pygame font object with the specified size.
+    Returns the cached Pygame font object with the specified size.
 
 draw_text(text: str, size: int, x: int, y: int, display: pygame.Surface, color: str = "white") -> None:
     Renders text on the given Pygame surface at the specified position with the specified color.
 
-get_image(name: str) -> pygame.Surface:
-    Loads and returns a Pygame surface for the specified image resource name.
+get_image(name: str, scale: float = 1.0, angle: int = 0) -> pygame.Surface:
+    Returns the cached Pygame surface for the specified image resource name.
+
+preload_images() -> None:
+    Loads every image resource and map into the asset cache.
 
 get_settings() -> dict:
     Reads and returns a dictionary containing settings from the "settings.json" file.
@@ -47,9 +50,24 @@ Notes
 from typing import List, Dict, Union
 import json
 import pygame
+from assets import ASSETS
 from configuration_mod import Config
 from custom_exceptions import OutOfBoundsError, InvalidColorString
 
+IMAGE_PATHS = {"back_arrow": "./../resources/arrow-back.png",
+               "background_main": "./../resources/background.jpg",
+               "background_ranked": "./../resources/ranked_background.jpg",
+               "ranks": "./../resources/ranked_trophies_lowres.jpg",
+               "ranks_frames": "./../resources/icon_ranked_borders.jpg",
+               "left_arrow": "./../resources/left-arrow.png",
+               "right_arrow": "./../resources/right_arrow.png",
+               "WOODEN": "./../resources/icon_ranked_borders_smaller-1-1.png",
+               "IRON": "./../resources/icon_ranked_borders_smaller-2-1.png",
+               "BRONZE": "./../resources/icon_ranked_borders_smaller-3-1.png",
+               "SILVER": "./../resources/icon_ranked_borders_smaller-4-1.png",
+               "GOLD": "./../resources/icon_ranked_borders_smaller-5-1.png",
+               "CHALLENGER": "./../resources/icon_ranked_borders_smaller-6-1.png"}
+
 
 def get_font(size: int) -> pygame.font.Font:
     """
@@ -72,12 +90,10 @@ def get_font(size: int) -> pygame.font.Font:
 
     Notes
     -----
-    The font file is hardcoded and contain the main font four the game.
+    The font file is hardcoded and contain the main font four the game. It is
+    opened once per size, the font object is shared.
     """
-    try:
-        return pygame.font.Font("./../resources/ETHNOCEN.TTF", size)
-    except:
-        raise FileNotFoundError("Failed to load the font, check the paths")
+    return ASSETS.font(size)
 
 # pylint: disable=too-many-arguments
 
@@ -125,21 +141,24 @@ def draw_text(text: str, size: int, x: int, y: int, display: pygame.Surface,
         check_string_color_posibility(color)
     else:
         check_color_values(color[0], color[1], color[2])
-    font = get_font(size)
-    text_surface = font.render(text, True, color)
+    text_surface = ASSETS.render(get_font(size), text, color)
     text_rect = text_surface.get_rect()
     text_rect.center = (x, y)
     display.blit(text_surface, text_rect)
 
 
-def get_image(name: str) -> pygame.Surface:
+def get_image(name: str, scale: float = 1.0, angle: int = 0) -> pygame.Surface:
     """
-    Loads and returns a Pygame surface for the specified image resource name.
+    Returns the cached Pygame surface for the specified image resource name.
 
     Parameters
     ----------
     name : str
         The name of the image resource.
+    scale : float, optional
+        Scale factor of the returned variant, by default 1.0.
+    angle : int, optional
+        Counterclockwise rotation of the returned variant in degrees, by default 0.
 
     Returns
     -------
@@ -153,28 +172,26 @@ def get_image(name: str) -> pygame.Surface:
 
     Notes
     -----
-    Image file paths are hardcoded and map the names to the paths.
+    Image file paths are hardcoded and map the names to the paths. The image
+    is read from the disk once, the surface is shared and must not be drawn onto.
     """
-    paths = {"back_arrow": "./../resources/arrow-back.png",
-             "background_main": "./../resources/background.jpg",
-             "background_ranked": "./../resources/ranked_background.jpg",
-             "ranks": "./../resources/ranked_trophies_lowres.jpg",
-             "ranks_frames": "./../resources/icon_ranked_borders.jpg",
-             "left_arrow": "./../resources/left-arrow.png",
-             "right_arrow": "./../resources/right_arrow.png",
-             "WOODEN": "./../resources/icon_ranked_borders_smaller-1-1.png",
-             "IRON": "./../resources/icon_ranked_borders_smaller-2-1.png",
-             "BRONZE": "./../resources/icon_ranked_borders_smaller-3-1.png",
-             "SILVER": "./../resources/icon_ranked_borders_smaller-4-1.png",
-             "GOLD": "./../resources/icon_ranked_borders_smaller-5-1.png",
-             "CHALLENGER": "./../resources/icon_ranked_borders_smaller-6-1.png"}
-    return_value = paths.get(name)
+    return_value = IMAGE_PATHS.get(name)
     if return_value is not None:
-        return pygame.image.load(return_value).convert_alpha()
+        return ASSETS.variant(return_value, scale, angle)
 
     raise FileNotFoundError("No resources for the specified name")
 
 
+def preload_images() -> None:
+    """
+    Loads every image resource and map into the asset cache, so the first
+    frame of a menu does not wait for the disk.
+    """
+    ASSETS.preload(IMAGE_PATHS.values())
+    ASSETS.preload(get_ordered_maps())
+    ASSETS.preload(f"./../resources/rink_{index}.jpg" for index in range(1, 4))
+
+
 def get_settings() -> Dict:
     """
     Reads and returns a dictionary containing settings from the